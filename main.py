@@ -7,20 +7,58 @@ Pipeline completo que ejecuta todos los scrapers y procesamiento de datos
 para generar los CSVs finales utilizados por la aplicación Streamlit.
 
 PIPELINE:
-1. SCRAPERS → Datos raw individuales
-2. COMBINACIÓN → Datos unificados  
-3. FILTRADO → Datos procesados para Streamlit
-4. MÉTRICAS → Datos de visualizaciones procesados
+1. SCRAPERS → Datos raw individuales (hosts distintos en paralelo)
+2. PROCESAMIENTO (grafo de etapas, ramas independientes en paralelo):
+   - Comentarios: data-combiner → filter-basic → filter-advanced
+   - Métricas: filter-metrics
+3. VERIFICACIÓN → CSVs finales para Streamlit
+4. PUBLICACIÓN → instantánea versionada (data/processed/snapshots) que la app
+   carga sin reiniciar
+
+Cada etapa de procesamiento declara sus archivos de entrada y de salida. Las
+dependencias se deducen de ellos y una etapa se salta si el hash de su código
+y de sus entradas no ha cambiado desde la última ejecución correcta. Las etapas
+se ejecutan dentro de este proceso y se pasan los DataFrames en memoria
+(--subprocess vuelve a lanzar cada script por separado).
+
+Si una ejecución se interrumpe, --resume no repite los scrapers que ya
+terminaron y el grafo continúa desde la primera etapa incompleta (las que ya
+se completaron están al día y se saltan). Los scrapers largos guardan además
+cada artículo en su propio diario y continúan desde él (scrap_journal.py).
+
+Con --watch el pipeline no lanza los scrapers: queda vigilando data/raw y
+procesa cada archivo nuevo o modificado en cuanto aparece, reutilizando en
+memoria las fuentes que no cambiaron.
+
+Cada ejecución deja un informe (data/processed/pipeline-runs/) con el tiempo,
+la CPU, la memoria, las filas y los bytes de cada scraper y cada etapa, y
+añade sus filas al histórico runs_history.csv para seguir el rendimiento.
 """
 
 import os
 import sys
 import time
+import glob
+import json
+import fnmatch
+import hashlib
+import argparse
+import threading
+import importlib.util
 import subprocess
+import tempfile
 import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
 from pathlib import Path
 
+import pandas as pd
+
+try:
+    import resource  # uso de CPU y memoria (no existe en Windows)
+except ImportError:
+    resource = None
+
 # ========================
 # CONFIGURACIÓN PRINCIPAL
 # ========================
@@ -38,23 +76,35 @@ logger = logging.getLogger(__name__)
 
 # Paths del proyecto
 PROJECT_ROOT = Path(__file__).parent
-SCRAPING_DIR = PROJECT_ROOT / "src" / "scrapping" / "scrap-clean"
+# Este archivo: la configuración y la ejecución de cada etapa forman parte de su código
+PIPELINE_FILE = PROJECT_ROOT / Path(__file__).name
+SCRAPING_DIR = PROJECT_ROOT / "scrapping" / "scrap-clean"
 SRC_DIR = PROJECT_ROOT / "src"
 DATA_RAW_DIR = PROJECT_ROOT / "data" / "raw"
 DATA_PROCESSED_DIR = PROJECT_ROOT / "data" / "processed"
+# Bits de región e índice de texto compartidos con la app (lo importa filter-advanced)
+COMMENTS_INDEX_FILE = PROJECT_ROOT / "streamlit" / "utils" / "comments_index.py"
+# Esquema de columnas y tipos compartido con la app
+DATA_SCHEMA_FILE = PROJECT_ROOT / "streamlit" / "utils" / "data_schema.py"
+# Publicación de instantáneas versionadas de los datos que lee la app
+DATA_SNAPSHOTS_FILE = PROJECT_ROOT / "streamlit" / "utils" / "data_snapshots.py"
 
-# Configuración de scrapers
+# Configuración de scrapers. Los scrapers de hosts distintos se ejecutan a la
+# vez; delay_after es la pausa mínima antes de lanzar otro scraper contra el
+# mismo host (las pausas entre peticiones van dentro de cada scraper).
 SCRAPERS_CONFIG = [
     {
         "name": "Carriola de Marín",
         "script": "carriola-marin.py",
+        "host": "www.carriola.es",
         "output_dir": "clean-metrics",
         "output_file": "carriola-marin.csv",
-        "delay_after": 30  # Segundos de pausa después del scraper
+        "delay_after": 30  # Segundos de pausa antes de volver a visitar el mismo host
     },
     {
         "name": "Cousas de Carragal", 
         "script": "cousas-carragal.py",
+        "host": "cousasdecarragal.blogspot.com",
         "output_dir": "clean-csvs",
         "output_file": "cousas-carragal-limpio.csv",
         "delay_after": 30
@@ -62,6 +112,7 @@ SCRAPERS_CONFIG = [
     {
         "name": "Diario Marín",
         "script": "diario-marin.py", 
+        "host": "diariomarin.com",
         "output_dir": "clean-csvs",
         "output_file": "diario-marin-limpio.csv",
         "delay_after": 30
@@ -69,6 +120,7 @@ SCRAPERS_CONFIG = [
     {
         "name": "Diario Pontevedra",
         "script": "diario-pontevedra.py",
+        "host": "www.diariodepontevedra.es",
         "output_dir": "clean-csvs", 
         "output_file": "diario-pontevedra-limpio.csv",
         "delay_after": 60  # Más tiempo por el anti-detección
@@ -76,6 +128,7 @@ SCRAPERS_CONFIG = [
     {
         "name": "PSOE Marín",
         "script": "psdeg-marin.py",
+        "host": "psdegmarin.wordpress.com",
         "output_dir": "clean-csvs",
         "output_file": "psdeg-marin-limpio.csv", 
         "delay_after": 30
@@ -83,40 +136,90 @@ SCRAPERS_CONFIG = [
     {
         "name": "Voz de Galicia",
         "script": "voz-galicia.py",
+        "host": "www.lavozdegalicia.es",
         "output_dir": "clean-csvs",
         "output_file": "voz_galicia-limpio.csv",
         "delay_after": 45  # Selenium requiere más tiempo
     }
 ]
 
-# Configuración de procesadores
-PROCESSORS_CONFIG = [
+# Archivos que se pasan las etapas de procesamiento
+RAW_COMMENTS_CSVS = DATA_RAW_DIR / "clean-csvs" / "*.csv"
+RAW_METRICS_CSVS = DATA_RAW_DIR / "clean-metrics" / "*.csv"
+COMBINED_DATA_FILE = DATA_PROCESSED_DIR / "combined-data" / "combined_data.csv"
+FILTERED_DATA_FILE = DATA_PROCESSED_DIR / "filtered-data" / "filtered_data.csv"
+ARTICLES_FILE = DATA_PROCESSED_DIR / "filtered-data" / "articles.csv"
+COMMENTS_FILE = DATA_PROCESSED_DIR / "filtered-data" / "comments.csv"
+DATABASE_FILE = DATA_PROCESSED_DIR / "filtered-data" / "horizontai.db"
+VISUALIZATIONS_FILE = DATA_PROCESSED_DIR / "metrics-data" / "visualizaciones_totales.csv"
+POLITICIANS_FILE = DATA_PROCESSED_DIR / "metrics-advanced" / "politicos_totales.csv"
+LOCATION_RULES_FILE = SRC_DIR / "comments" / "reglas-localizacion.json"
+
+# Etapas de procesamiento. Cada una declara sus entradas (rutas o globs) y sus
+# salidas; una etapa depende de las que producen alguna de sus entradas.
+# working_dir es el directorio desde el que se lanza el script en modo --subprocess;
+# code, los módulos que importa el script (cuentan como código de la etapa).
+PIPELINE_STAGES = [
     {
-        "name": "Combinador de Datos",
-        "script": "data-combiner.py",
-        "directory": "comments",
-        "description": "Combina todos los CSVs individuales en combined_data.csv"
+        "name": "data-combiner",
+        "script": SRC_DIR / "comments" / "data-combiner.py",
+        "working_dir": SRC_DIR,
+        "description": "Combina todos los CSVs individuales en combined_data.csv",
+        "inputs": [RAW_COMMENTS_CSVS],
+        "outputs": [COMBINED_DATA_FILE]
     },
     {
-        "name": "Filtro Avanzado",
-        "script": "filter-advanced.py", 
-        "directory": "comments",
-        "description": "Genera filtered_data.csv y filtros específicos"
+        "name": "filter-basic",
+        "script": SRC_DIR / "comments" / "filter-basic.py",
+        "working_dir": SRC_DIR,
+        "description": "Conserva los artículos con comentarios (filtered_data.csv)",
+        "inputs": [COMBINED_DATA_FILE],
+        "outputs": [FILTERED_DATA_FILE]
     },
     {
-        "name": "Procesador Métricas Avanzadas",
-        "script": "filter-advanced-m.py",
-        "directory": "metrics", 
-        "description": "Procesa métricas políticas (politicos_totales.csv)"
+        "name": "filter-advanced",
+        "script": SRC_DIR / "comments" / "filter-advanced.py",
+        "working_dir": SRC_DIR,
+        "description": "Genera tablas normalizadas de artículos y comentarios",
+        "inputs": [FILTERED_DATA_FILE, LOCATION_RULES_FILE],
+        "code": [COMMENTS_INDEX_FILE],
+        "outputs": [ARTICLES_FILE, COMMENTS_FILE, DATABASE_FILE]
     },
     {
-        "name": "Procesador Métricas Básicas", 
-        "script": "filter-basic-m.py",
-        "directory": "metrics",
-        "description": "Procesa métricas de visualizaciones (visualizaciones_totales.csv)"
+        "name": "filter-metrics",
+        "script": SRC_DIR / "metrics" / "filter-metrics.py",
+        "working_dir": SRC_DIR / "metrics",
+        "description": "Procesa métricas de visualizaciones y políticas (visualizaciones_totales.csv, politicos_totales.csv)",
+        "inputs": [RAW_METRICS_CSVS],
+        "outputs": [VISUALIZATIONS_FILE, POLITICIANS_FILE]
     }
 ]
 
+# Hashes de código, entradas y salidas de la última ejecución correcta de cada etapa
+PIPELINE_STATE_FILE = DATA_PROCESSED_DIR / "pipeline_state.json"
+
+# Scrapers terminados en la ejecución en curso (para --resume tras un fallo)
+SCRAPERS_CHECKPOINT_FILE = DATA_PROCESSED_DIR / "scrapers_checkpoint.json"
+
+# Etapas de procesamiento ejecutándose a la vez (las dos ramas son independientes)
+MAX_PARALLEL_STAGES = 2
+
+# Segundos entre comprobaciones de data/raw en modo vigilancia (--watch)
+WATCH_INTERVAL = 30
+
+# Scrapers ejecutándose a la vez (cada uno contra un host distinto; dos usan Chrome)
+MAX_PARALLEL_SCRAPERS = 3
+
+# Informes de ejecución: un JSON por ejecución y un histórico con una fila por
+# scraper o etapa y ejecución
+RUN_REPORTS_DIR = DATA_PROCESSED_DIR / "pipeline-runs"
+RUN_HISTORY_FILE = RUN_REPORTS_DIR / "runs_history.csv"
+RUN_REPORT_COLUMNS = [
+    "run_id", "started_at", "kind", "name", "status",
+    "wall_seconds", "cpu_seconds", "peak_rss_mb",
+    "rows_in", "rows_out", "bytes_read", "bytes_written"
+]
+
 # ========================
 # FUNCIONES AUXILIARES
 # ========================
@@ -161,8 +264,60 @@ def check_file_exists(file_path, description="archivo"):
         logger.error(f"❌ {description} NO encontrado: {file_path}")
         return False
 
-def run_script(script_path, description, working_dir=None):
-    """Ejecuta un script Python y maneja errores"""
+def peak_rss_mb(maxrss):
+    """Convierte ru_maxrss a MB (Linux lo da en KB y macOS en bytes)"""
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+def run_child(command, working_dir=None, timeout=3600):
+    """
+    Ejecuta un proceso hijo y mide su CPU y su memoria máxima
+    
+    Returns:
+        tuple: (código de salida, stdout, stderr, dict con cpu_seconds y
+            peak_rss_mb, o None si el sistema no permite medirlos)
+    """
+    if not hasattr(os, "wait4"):
+        result = subprocess.run(command, capture_output=True, text=True, cwd=working_dir, timeout=timeout)
+        return result.returncode, result.stdout, result.stderr, None
+    
+    # wait4 devuelve el uso de recursos del propio hijo (no el acumulado de
+    # todos los hijos), así que es válido aunque haya varios a la vez. En Linux
+    # la memoria máxima no baja al hacer exec: es como mínimo la de main.py al
+    # lanzar el hijo, así que sirve para comparar ejecuciones, no como valor absoluto
+    with tempfile.TemporaryFile() as stdout, tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(command, stdout=stdout, stderr=stderr, cwd=working_dir)
+        timed_out = threading.Event()
+        
+        def kill():
+            timed_out.set()
+            process.kill()
+        
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+        try:
+            _, status, usage = os.wait4(process.pid, 0)
+        finally:
+            timer.cancel()
+        process.returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(command, timeout)
+        
+        stdout.seek(0)
+        stderr.seek(0)
+        output = stdout.read().decode("utf-8", errors="replace")
+        errors = stderr.read().decode("utf-8", errors="replace")
+    
+    return process.returncode, output, errors, {
+        "cpu_seconds": usage.ru_utime + usage.ru_stime,
+        "peak_rss_mb": peak_rss_mb(usage.ru_maxrss)
+    }
+
+def run_script(script_path, description, working_dir=None, metrics=None):
+    """
+    Ejecuta un script Python y maneja errores
+    
+    Si se pasa metrics (dict), se rellena con la CPU y la memoria máxima del script.
+    """
     logger.info(f"🔄 Ejecutando: {description}")
     logger.info(f"   Script: {script_path}")
     
@@ -170,33 +325,27 @@ def run_script(script_path, description, working_dir=None):
         logger.info(f"   Directorio: {working_dir}")
     
     try:
-        # Cambiar al directorio de trabajo si se especifica
-        original_cwd = os.getcwd()
-        if working_dir:
-            os.chdir(working_dir)
-        
-        # Ejecutar script
-        result = subprocess.run(
+        # Ejecutar script (cwd en el propio proceso hijo: no cambia el directorio
+        # de main.py, así que varias etapas pueden ejecutarse a la vez)
+        returncode, stdout, stderr, usage = run_child(
             [sys.executable, str(script_path)],
-            capture_output=True,
-            text=True,
+            working_dir=working_dir,
             timeout=3600  # 1 hora máximo por script
         )
+        if metrics is not None and usage:
+            metrics.update(usage)
         
-        # Restaurar directorio original
-        os.chdir(original_cwd)
-        
-        if result.returncode == 0:
+        if returncode == 0:
             logger.info(f"✅ {description} completado exitosamente")
-            if result.stdout:
-                logger.info(f"   Output: {result.stdout[-200:]}")  # Últimas 200 chars
+            if stdout:
+                logger.info(f"   Output: {stdout[-200:]}")  # Últimas 200 chars
             return True
         else:
-            logger.error(f"❌ {description} falló (código: {result.returncode})")
-            if result.stderr:
-                logger.error(f"   Error: {result.stderr}")
-            if result.stdout:
-                logger.error(f"   Output: {result.stdout}")
+            logger.error(f"❌ {description} falló (código: {returncode})")
+            if stderr:
+                logger.error(f"   Error: {stderr}")
+            if stdout:
+                logger.error(f"   Output: {stdout}")
             return False
             
     except subprocess.TimeoutExpired:
@@ -205,72 +354,624 @@ def run_script(script_path, description, working_dir=None):
     except Exception as e:
         logger.error(f"💥 Error ejecutando {description}: {e}")
         return False
-    finally:
-        # Asegurar que volvemos al directorio original
-        os.chdir(original_cwd)
 
-def countdown_delay(seconds, message):
-    """Cuenta regresiva visual"""
-    logger.info(f"⏳ {message}")
-    for i in range(seconds, 0, -1):
-        print(f"   ⏱️  Esperando {i} segundos...", end='\r', flush=True)
-        time.sleep(1)
-    print("   ✅ Pausa completada" + " " * 20)  # Limpiar línea
+# Un cerrojo por host (solo un scraper a la vez contra cada host) y el instante
+# a partir del cual se puede volver a visitar
+_host_locks = {}
+_host_available_at = {}
+_host_registry_lock = threading.Lock()
+
+def host_lock(host):
+    """Cerrojo de un host (se crea la primera vez)"""
+    with _host_registry_lock:
+        return _host_locks.setdefault(host, threading.Lock())
+
+def run_with_host_politeness(host, cooldown, func, *args):
+    """
+    Ejecuta func(*args) respetando la cortesía con el host: espera a que termine
+    cualquier otro scraper contra el mismo host y a que pase su pausa
+    
+    Args:
+        host: dominio al que accede func
+        cooldown: segundos de pausa que deja func antes de la siguiente visita al host
+        func: función a ejecutar
+    """
+    with host_lock(host):
+        wait_seconds = _host_available_at.get(host, 0) - time.monotonic()
+        if wait_seconds > 0:
+            logger.info(f"⏳ Esperando {wait_seconds:.0f}s antes de volver a {host}")
+            time.sleep(wait_seconds)
+        try:
+            return func(*args)
+        finally:
+            _host_available_at[host] = time.monotonic() + cooldown
 
 # ========================
-# FUNCIONES PRINCIPALES  
+# INFORME DE EJECUCIÓN
 # ========================
+# Cada scraper y cada etapa deja una fila con su estado ('ok', 'skipped' si se
+# reutilizaron sus salidas, 'failed' o 'blocked'), tiempo real, CPU, memoria
+# máxima, filas leídas/escritas y bytes leídos/escritos. En las etapas en proceso
+# la CPU es la del hilo de la etapa y la memoria es el máximo del proceso hasta
+# ese momento; en subprocesos y scrapers, las del propio proceso hijo.
 
-def step_1_run_scrapers():
-    """PASO 1: Ejecutar todos los scrapers"""
-    logger.info("=" * 60)
-    logger.info("📡 PASO 1: EJECUTANDO SCRAPERS")
-    logger.info("=" * 60)
+_run_records = []
+_run_records_lock = threading.Lock()
+
+def reset_run_report():
+    """Vacía las mediciones antes de una nueva ejecución"""
+    with _run_records_lock:
+        _run_records.clear()
+
+def record_run_metrics(kind, name, status, **metrics):
+    """Añade al informe la medición de un scraper ('scraper') o una etapa ('stage')"""
+    record = {column: None for column in RUN_REPORT_COLUMNS[2:]}
+    record.update(kind=kind, name=name, status=status)
+    for key, value in metrics.items():
+        record[key] = round(value, 3) if isinstance(value, float) else value
+    with _run_records_lock:
+        _run_records.append(record)
+
+def files_size(paths):
+    """Bytes totales de los archivos existentes de una lista"""
+    return sum(Path(path).stat().st_size for path in paths if Path(path).is_file())
+
+def process_peak_rss_mb():
+    """Memoria máxima de este proceso hasta ahora (None si no se puede medir)"""
+    if resource is None:
+        return None
+    return peak_rss_mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+def write_run_report(run_id, started_at, success, wall_seconds, options):
+    """
+    Guarda el informe de la ejecución como JSON y añade sus filas al histórico CSV
+    
+    Returns:
+        Path: ruta del JSON
+    """
+    with _run_records_lock:
+        records = [dict(record) for record in _run_records]
+    
+    RUN_REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+    report = {
+        "run_id": run_id,
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "finished_at": datetime.now().isoformat(timespec="seconds"),
+        "success": success,
+        "wall_seconds": round(wall_seconds, 3),
+        "options": options,
+        "entries": records
+    }
+    report_path = RUN_REPORTS_DIR / f"run_{run_id}.json"
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    
+    history = pd.DataFrame(records, columns=RUN_REPORT_COLUMNS[2:])
+    history.insert(0, "started_at", report["started_at"])
+    history.insert(0, "run_id", run_id)
+    history.to_csv(RUN_HISTORY_FILE, mode="a", header=not RUN_HISTORY_FILE.exists(), index=False)
+    
+    logger.info("\n📈 INFORME DE EJECUCIÓN:")
+    for record in records:
+        rows = f"{record['rows_in'] or 0} → {record['rows_out'] or 0} filas"
+        cpu = f"{record['cpu_seconds']:.1f}s CPU" if record["cpu_seconds"] is not None else "CPU n/d"
+        memory = f"{record['peak_rss_mb']:.0f} MB" if record["peak_rss_mb"] is not None else "memoria n/d"
+        logger.info(f"   {record['kind']:<7} {record['name']:<20} {record['status']:<8} "
+                    f"{record['wall_seconds'] or 0:.1f}s, {cpu}, {memory}, {rows}")
+    logger.info(f"   📄 Informe: {report_path}")
+    logger.info(f"   🗂️ Histórico: {RUN_HISTORY_FILE}")
+    return report_path
+
+# ========================
+# GRAFO DE ETAPAS
+# ========================
+
+def resolve_stage_files(patterns):
+    """Rutas existentes de una lista de rutas o globs, ordenadas"""
+    files = set()
+    for pattern in patterns:
+        files.update(Path(path) for path in glob.glob(str(pattern)))
+    return sorted(path for path in files if path.is_file())
+
+def hash_files(paths):
+    """Hash SHA-256 del nombre y el contenido de una lista de archivos"""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(str(Path(path).relative_to(PROJECT_ROOT)).encode("utf-8"))
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+def stage_dependencies(stages):
+    """
+    Deduce las dependencias de cada etapa: B depende de A si alguna salida de A
+    coincide con alguna entrada (ruta o glob) de B. Falla si hay ciclos.
+    
+    Returns:
+        dict {nombre_etapa: set(nombres de las etapas de las que depende)}
+    """
+    dependencies = {stage["name"]: set() for stage in stages}
+    for stage in stages:
+        for other in stages:
+            if other is stage:
+                continue
+            if any(fnmatch.fnmatch(str(output), str(pattern)) for output in other["outputs"] for pattern in stage["inputs"]):
+                dependencies[stage["name"]].add(other["name"])
+    
+    # Comprobar que hay un orden topológico
+    resolved = set()
+    while len(resolved) < len(dependencies):
+        ready = {name for name, deps in dependencies.items() if name not in resolved and deps <= resolved}
+        if not ready:
+            raise ValueError(f"Ciclo en las etapas del pipeline: {sorted(set(dependencies) - resolved)}")
+        resolved |= ready
+    
+    return dependencies
+
+def load_json_state(path):
+    """Lee un archivo de estado JSON ({} si no existe o está dañado)"""
+    if path.exists():
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Estado ilegible ({path.name}), se ejecutará todo: {e}")
+    return {}
+
+def save_json_state(path, state):
+    """Guarda un archivo de estado JSON (archivo temporal + reemplazo atómico)"""
+    temporary = path.with_suffix(".json.tmp")
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    os.replace(temporary, path)
+
+def load_pipeline_state():
+    """Estado guardado de la última ejecución correcta de cada etapa"""
+    return load_json_state(PIPELINE_STATE_FILE)
+
+def save_pipeline_state(state):
+    """Guarda el estado del pipeline"""
+    save_json_state(PIPELINE_STATE_FILE, state)
+
+def stage_fingerprint(stage):
+    """Hash del código (script, módulos que importa, esquema de tipos y main.py) y de las entradas actuales de una etapa"""
+    return {
+        "code": hash_files([stage["script"], *stage.get("code", []), DATA_SCHEMA_FILE, PIPELINE_FILE]),
+        "inputs": hash_files(resolve_stage_files(stage["inputs"]))
+    }
+
+def stage_is_up_to_date(stage, fingerprint, saved):
+    """Una etapa está al día si código y entradas no cambiaron y sus salidas siguen intactas"""
+    if not saved or saved.get("code") != fingerprint["code"] or saved.get("inputs") != fingerprint["inputs"]:
+        return False
+    if not all(Path(output).exists() for output in stage["outputs"]):
+        return False
+    return saved.get("outputs") == hash_files(stage["outputs"])
+
+# ========================
+# ETAPAS EN PROCESO
+# ========================
+# Por defecto cada etapa se ejecuta dentro de este mismo proceso: los scripts se
+# importan una vez como módulos y los DataFrames pasan de una etapa a la
+# siguiente en memoria, sin relanzar Python ni volver a parsear los CSVs
+# intermedios. Cada etapa escribe sus archivos al terminar (escritura atómica),
+# porque son los que se hashean para saltar etapas en la siguiente ejecución.
+# La excepción es data-combiner: combina las fuentes por bloques directamente
+# en combined_data.csv para no tener todos los CSVs raw en memoria, y
+# filter-basic lee ese archivo del disco.
+
+_processor_modules = {}
+_processor_lock = threading.Lock()
+
+def load_processor(script_path):
+    """Importa (una sola vez) un script de procesamiento como módulo"""
+    script_path = Path(script_path)
+    with _processor_lock:
+        if script_path not in _processor_modules:
+            module_name = script_path.stem.replace("-", "_")
+            spec = importlib.util.spec_from_file_location(module_name, script_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _processor_modules[script_path] = module
+        return _processor_modules[script_path]
+
+def file_signature(path):
+    """Fecha de modificación y tamaño de un archivo (detecta cambios sin leerlo)"""
+    stat = Path(path).stat()
+    return (stat.st_mtime_ns, stat.st_size)
+
+# CSVs ya leídos en modo vigilancia, por ruta, con la firma del archivo: en cada
+# ciclo solo se vuelven a parsear las fuentes que cambiaron (None: sin caché)
+_csv_cache = None
+_csv_cache_lock = threading.Lock()
+
+def enable_csv_cache():
+    """Conserva entre ejecuciones los CSVs leídos por las etapas en proceso"""
+    global _csv_cache
+    _csv_cache = {}
+
+def read_stage_csv(path):
+    """
+    Lee un CSV de entrada de una etapa con los tipos del esquema, o lo toma de
+    la caché si está activada y el archivo no cambió
+
+    Returns:
+        tuple: (DataFrame, True si se leyó del disco)
+    """
+    path = Path(path)
+    signature = file_signature(path)
+    with _csv_cache_lock:
+        cached = _csv_cache.get(path) if _csv_cache is not None else None
+    if cached is not None and cached[0] == signature:
+        return cached[1], False
+    frame = load_processor(DATA_SCHEMA_FILE).leer_csv(path)
+    with _csv_cache_lock:
+        if _csv_cache is not None:
+            _csv_cache[path] = (signature, frame)
+    return frame, True
+
+def write_artifact(path, value):
+    """
+    Escribe una salida de etapa: un DataFrame como CSV (archivo temporal +
+    reemplazo) o una función que escribe ella misma el archivo de forma atómica
+
+    Returns:
+        int: filas escritas, o None si no se conocen
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(value, pd.DataFrame):
+        temporary = path.with_name(path.name + ".tmp")
+        value.to_csv(temporary, index=False)
+        os.replace(temporary, path)
+        return len(value)
+    written = value(path)
+    # Las funciones que escriben por bloques devuelven sus filas
+    return written if isinstance(written, int) and not isinstance(written, bool) else None
+
+def run_data_combiner(read_input):
+    combiner = load_processor(SRC_DIR / "comments" / "data-combiner.py")
+    paths = [read_input(path, stream=True) for path in resolve_stage_files([RAW_COMMENTS_CSVS])]
+    if not paths:
+        raise FileNotFoundError(f"No se encontraron CSVs en {RAW_COMMENTS_CSVS.parent}")
+
+    def combine(path):
+        # Las fuentes se leen por bloques y se añaden directamente al CSV combinado
+        columns, stats = combiner.combinar_csvs_por_bloques([str(p) for p in paths], str(path), columna_texto="title")
+        total_rows = sum(stat["filas"] for stat in stats)
+        combiner.mostrar_resumen_columnas(total_rows, columns, stats, path)
+        return total_rows
+
+    return {COMBINED_DATA_FILE: combine}
+
+def run_filter_basic(read_input):
+    basic = load_processor(SRC_DIR / "comments" / "filter-basic.py")
+    combined = read_input(COMBINED_DATA_FILE)
+    filtered = basic.filtrar_dataframe_por_comentarios(combined, columna_comentarios="n_comments", minimo_comentarios=1)
+    basic.mostrar_resumen_filtro(len(combined), filtered, FILTERED_DATA_FILE)
+    return {FILTERED_DATA_FILE: filtered}
+
+def run_filter_advanced(read_input):
+    advanced = load_processor(SRC_DIR / "comments" / "filter-advanced.py")
+    filtered = read_input(FILTERED_DATA_FILE)
+    articles, comments = advanced.normalizar_y_calcular_regiones(filtered)
+    advanced.mostrar_resumen_regiones(len(filtered), articles, comments)
+    return {
+        ARTICLES_FILE: articles,
+        COMMENTS_FILE: comments,
+        DATABASE_FILE: lambda path: advanced.exportar_base_datos({'articles': articles, 'comments': comments}, str(path))
+    }
+
+def run_filter_metrics(read_input):
+    metrics_processor = load_processor(SRC_DIR / "metrics" / "filter-metrics.py")
+    paths = resolve_stage_files([RAW_METRICS_CSVS])
+    if not paths:
+        raise FileNotFoundError("No se encontraron archivos CSV en la carpeta")
+    visualizations, politicians = metrics_processor.procesar_metricas(read_input(paths[0]))
+    stats = metrics_processor.resumir_filtrado(len(visualizations), len(politicians))
+    metrics_processor.mostrar_resumen_visualizaciones(visualizations)
+    logger.info(f"   ✅ {stats['original']} → {stats['filtrado']} artículos políticos ({stats['porcentaje']:.1f}%)")
+    return {VISUALIZATIONS_FILE: visualizations, POLITICIANS_FILE: politicians}
+
+# Función en proceso de cada etapa de PIPELINE_STAGES
+IN_PROCESS_RUNNERS = {
+    "data-combiner": run_data_combiner,
+    "filter-basic": run_filter_basic,
+    "filter-advanced": run_filter_advanced,
+    "filter-metrics": run_filter_metrics
+}
+
+def run_stage_in_process(stage, frames, frames_lock, metrics=None):
+    """
+    Ejecuta una etapa dentro del proceso
+
+    Sus entradas se toman de frames (DataFrames producidos en esta ejecución)
+    o, si no están, se leen del disco; las etapas que leen por bloques piden
+    solo la ruta (stream=True). Sus salidas se escriben y los DataFrames se
+    añaden a frames.
+    Si se pasa metrics (dict), se rellena con las filas leídas y escritas y los
+    bytes leídos del disco.
+
+    Returns:
+        bool: True si la etapa terminó bien
+    """
+    if metrics is None:
+        metrics = {}
+    metrics.update(rows_in=0, rows_out=0, bytes_read=0)
+
+    def read_input(path, stream=False):
+        if stream:
+            metrics["bytes_read"] += Path(path).stat().st_size
+            return Path(path)
+        with frames_lock:
+            frame = frames.get(Path(path))
+        if frame is None:
+            frame, parsed = read_stage_csv(path)
+            if parsed:
+                metrics["bytes_read"] += Path(path).stat().st_size
+        metrics["rows_in"] += len(frame)
+        return frame
+
+    logger.info(f"🔄 Ejecutando en proceso: {stage['name']}")
+    try:
+        outputs = IN_PROCESS_RUNNERS[stage["name"]](read_input)
+        for path, value in outputs.items():
+            metrics["rows_out"] += write_artifact(path, value) or 0
+    except Exception as e:
+        logger.error(f"❌ {stage['name']} falló: {e}")
+        return False
+
+    with frames_lock:
+        frames.update({Path(path): value for path, value in outputs.items() if isinstance(value, pd.DataFrame)})
+    logger.info(f"✅ {stage['name']} completado exitosamente")
+    return True
+
+def run_stage(stage, state, state_lock, force=False, frames=None, frames_lock=None):
+    """
+    Ejecuta una etapa si sus entradas o su código cambiaron y anota sus
+    mediciones en el informe de la ejecución
     
-    successful_scrapers = 0
-    failed_scrapers = 0
+    Con frames (dict compartido de DataFrames) la etapa se ejecuta en proceso;
+    sin él, como subproceso.
     
-    for i, scraper in enumerate(SCRAPERS_CONFIG, 1):
-        logger.info(f"\n🎯 SCRAPER {i}/{len(SCRAPERS_CONFIG)}: {scraper['name']}")
-        logger.info("-" * 50)
+    Returns:
+        str: 'ok', 'skipped' o 'failed'
+    """
+    name = stage["name"]
+    started = time.perf_counter()
+    cpu_started = time.thread_time()
+    metrics = {}
+    status = "failed"
+    try:
+        fingerprint = stage_fingerprint(stage)
         
-        # Path del script
-        script_path = SCRAPING_DIR / scraper['script']
+        with state_lock:
+            saved = state.get(name)
+        if not force and stage_is_up_to_date(stage, fingerprint, saved):
+            logger.info(f"⏭️ {name}: entradas y código sin cambios, se reutilizan sus salidas")
+            status = "skipped"
+            return status
         
+        logger.info(f"📝 {name}: {stage['description']}")
+        cpu_started = time.thread_time()
+        if frames is not None:
+            success = run_stage_in_process(stage, frames, frames_lock, metrics)
+            metrics.update(cpu_seconds=time.thread_time() - cpu_started, peak_rss_mb=process_peak_rss_mb())
+        else:
+            success = run_script(stage["script"], name, working_dir=stage["working_dir"], metrics=metrics)
+            metrics["bytes_read"] = files_size(resolve_stage_files(stage["inputs"]))
+        metrics["bytes_written"] = files_size(stage["outputs"])
+        if not success:
+            return status
+        
+        if not all(check_file_exists(Path(output), f"Salida de {name}") for output in stage["outputs"]):
+            return status
+        
+        fingerprint["outputs"] = hash_files(stage["outputs"])
+        fingerprint["completed_at"] = datetime.now().isoformat(timespec="seconds")
+        with state_lock:
+            state[name] = fingerprint
+            save_pipeline_state(state)
+        status = "ok"
+        return status
+    finally:
+        if status == "skipped":
+            metrics["cpu_seconds"] = time.thread_time() - cpu_started
+        record_run_metrics("stage", name, status, wall_seconds=time.perf_counter() - started, **metrics)
+
+def run_pipeline_dag(stages, max_workers=MAX_PARALLEL_STAGES, force=False, in_process=True):
+    """
+    Ejecuta las etapas respetando sus dependencias y en paralelo cuando son independientes
+    
+    Una etapa arranca en cuanto todas aquellas de las que depende terminaron bien
+    (o se saltaron por estar al día). Si una falla, las que dependen de ella no se
+    ejecutan.
+    
+    Args:
+        stages: lista de etapas (ver PIPELINE_STAGES)
+        max_workers: etapas ejecutándose a la vez como máximo
+        force: ejecutar todas las etapas aunque estén al día
+        in_process: ejecutar las etapas en este proceso pasando DataFrames en
+            memoria (False: un subproceso por script, como antes)
+        
+    Returns:
+        dict {nombre_etapa: 'ok' | 'skipped' | 'failed' | 'blocked'}
+    """
+    dependencies = stage_dependencies(stages)
+    state = load_pipeline_state()
+    state_lock = threading.Lock()
+    frames = {} if in_process else None
+    frames_lock = threading.Lock()
+    
+    pending = {stage["name"]: stage for stage in stages}
+    status = {}
+    running = {}
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            # Lanzar las etapas listas y bloquear las que dependen de una etapa fallida
+            changed = True
+            while changed:
+                changed = False
+                for name in list(pending):
+                    deps_status = [status.get(dep) for dep in dependencies[name]]
+                    if any(result in ("failed", "blocked") for result in deps_status):
+                        logger.error(f"⛔ {name} no se ejecuta: falló una etapa de la que depende")
+                        status[name] = "blocked"
+                        record_run_metrics("stage", name, "blocked")
+                        del pending[name]
+                        changed = True
+                    elif all(result in ("ok", "skipped") for result in deps_status):
+                        running[pool.submit(run_stage, pending.pop(name), state, state_lock, force, frames, frames_lock)] = name
+                        changed = True
+            
+            if not running:
+                break
+            
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    status[name] = future.result()
+                except Exception as e:
+                    logger.error(f"💥 Error inesperado en la etapa {name}: {e}")
+                    status[name] = "failed"
+    
+    return status
+
+# ========================
+# FUNCIONES PRINCIPALES  
+# ========================
+
+def scraper_output_path(scraper):
+    """CSV que genera un scraper"""
+    return DATA_RAW_DIR / scraper['output_dir'] / scraper['output_file']
+
+def start_scrapers_checkpoint(resume=False):
+    """
+    Punto de control de los scrapers de la ejecución en curso
+    
+    Con resume, si la ejecución anterior no terminó, se continúa su punto de
+    control (los scrapers que ya terminaron no se repiten); si no, se empieza uno nuevo.
+    """
+    checkpoint = load_json_state(SCRAPERS_CHECKPOINT_FILE) if resume else {}
+    if not checkpoint or checkpoint.get("finished", True):
+        checkpoint = {"started_at": datetime.now().isoformat(timespec="seconds"), "finished": False, "completed": {}}
+        save_json_state(SCRAPERS_CHECKPOINT_FILE, checkpoint)
+    else:
+        logger.info(f"♻️ Reanudando la ejecución del {checkpoint['started_at']}")
+    return checkpoint
+
+def scraper_is_checkpointed(scraper, checkpoint):
+    """Un scraper ya terminó en esta ejecución si su CSV sigue siendo el que generó"""
+    saved = checkpoint["completed"].get(scraper['name'])
+    output_path = scraper_output_path(scraper)
+    return bool(saved) and output_path.exists() and saved.get("output") == hash_files([output_path])
+
+def finish_scrapers_checkpoint():
+    """Marca la ejecución como terminada: el siguiente --resume empezará de cero"""
+    checkpoint = load_json_state(SCRAPERS_CHECKPOINT_FILE)
+    if checkpoint:
+        checkpoint["finished"] = True
+        save_json_state(SCRAPERS_CHECKPOINT_FILE, checkpoint)
+
+def run_scraper(scraper):
+    """
+    Ejecuta un scraper, comprueba que generó su CSV y anota sus mediciones en
+    el informe de la ejecución
+    
+    Returns:
+        bool: True si el scraper terminó bien y el CSV existe
+    """
+    script_path = SCRAPING_DIR / scraper['script']
+    output_path = scraper_output_path(scraper)
+    started = time.perf_counter()
+    metrics = {}
+    success = False
+    
+    try:
         # Verificar que el script existe
         if not script_path.exists():
             logger.error(f"❌ Script no encontrado: {script_path}")
-            failed_scrapers += 1
-            continue
+            return False
         
-        # Ejecutar scraper
-        success = run_script(
+        if not run_script(
             script_path, 
             f"Scraper {scraper['name']}", 
-            working_dir=SCRAPING_DIR
-        )
+            working_dir=SCRAPING_DIR,
+            metrics=metrics
+        ):
+            return False
         
+        # Verificar que se generó el archivo
+        if check_file_exists(output_path, f"CSV de {scraper['name']}"):
+            metrics.update(rows_out=len(pd.read_csv(output_path)), bytes_written=output_path.stat().st_size)
+            success = True
+            return True
+        logger.warning(f"⚠️ {scraper['name']} ejecutó pero no generó archivo esperado")
+        return False
+    finally:
+        record_run_metrics("scraper", scraper['name'], "ok" if success else "failed",
+                           wall_seconds=time.perf_counter() - started, **metrics)
+
+def step_1_run_scrapers(max_workers=MAX_PARALLEL_SCRAPERS, resume=False):
+    """
+    PASO 1: Ejecutar todos los scrapers (hosts distintos en paralelo)
+    
+    Cada scraper que termina bien queda anotado en el punto de control; con
+    resume no se repiten los que ya terminaron en la ejecución interrumpida.
+    """
+    logger.info("=" * 60)
+    logger.info("📡 PASO 1: EJECUTANDO SCRAPERS")
+    logger.info("=" * 60)
+    logger.info(f"🎯 {len(SCRAPERS_CONFIG)} scrapers, hasta {max_workers} a la vez")
+    
+    checkpoint = start_scrapers_checkpoint(resume)
+    checkpoint_lock = threading.Lock()
+    
+    def run_and_checkpoint(scraper):
+        success = run_scraper(scraper)
         if success:
-            # Verificar que se generó el archivo
-            output_path = DATA_RAW_DIR / scraper['output_dir'] / scraper['output_file']
-            if check_file_exists(output_path, f"CSV de {scraper['name']}"):
-                successful_scrapers += 1
-            else:
-                logger.warning(f"⚠️ {scraper['name']} ejecutó pero no generó archivo esperado")
-                failed_scrapers += 1
+            with checkpoint_lock:
+                checkpoint["completed"][scraper['name']] = {
+                    "output": hash_files([scraper_output_path(scraper)]),
+                    "completed_at": datetime.now().isoformat(timespec="seconds")
+                }
+                save_json_state(SCRAPERS_CHECKPOINT_FILE, checkpoint)
+        return success
+    
+    results = {}
+    pending = []
+    for scraper in SCRAPERS_CONFIG:
+        if scraper_is_checkpointed(scraper, checkpoint):
+            logger.info(f"⏭️ {scraper['name']}: ya terminó en la ejecución interrumpida, se reutiliza su CSV")
+            record_run_metrics("scraper", scraper['name'], "skipped")
+            results[scraper['name']] = True
         else:
-            failed_scrapers += 1
-        
-        # Pausa entre scrapers (excepto el último)
-        if i < len(SCRAPERS_CONFIG):
-            countdown_delay(
-                scraper['delay_after'], 
-                f"Pausa anti-sobrecarga entre scrapers ({scraper['delay_after']}s)"
-            )
+            pending.append(scraper)
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(run_with_host_politeness, scraper['host'], scraper['delay_after'], run_and_checkpoint, scraper): scraper
+            for scraper in pending
+        }
+        for future in futures:
+            scraper = futures[future]
+            try:
+                results[scraper['name']] = future.result()
+            except Exception as e:
+                logger.error(f"💥 Error inesperado en el scraper {scraper['name']}: {e}")
+                results[scraper['name']] = False
+    
+    successful_scrapers = sum(results.values())
+    failed_scrapers = len(results) - successful_scrapers
     
     # Resumen del paso
     logger.info("\n" + "=" * 60)
     logger.info(f"📊 RESUMEN PASO 1 - SCRAPERS:")
+    for scraper in SCRAPERS_CONFIG:
+        logger.info(f"   {'✅' if results[scraper['name']] else '❌'} {scraper['name']} ({scraper['host']})")
     logger.info(f"   ✅ Exitosos: {successful_scrapers}")
     logger.info(f"   ❌ Fallidos: {failed_scrapers}")
     logger.info(f"   📈 Tasa éxito: {(successful_scrapers/len(SCRAPERS_CONFIG)*100):.1f}%")
@@ -278,121 +979,45 @@ def step_1_run_scrapers():
     
     return successful_scrapers > 0  # Al menos uno debe funcionar
 
-def step_2_combine_data():
-    """PASO 2: Combinar datos de todos los scrapers"""
+def step_2_process_data(max_workers=MAX_PARALLEL_STAGES, force=False, in_process=True):
+    """PASO 2: Procesar comentarios y métricas (grafo de etapas incremental)"""
     logger.info("\n" + "=" * 60)
-    logger.info("🔗 PASO 2: COMBINANDO DATOS")
+    logger.info("🔗 PASO 2: PROCESANDO DATOS (COMENTARIOS Y MÉTRICAS)")
     logger.info("=" * 60)
     
-    processor = PROCESSORS_CONFIG[0]  # data-combiner.py
-    script_path = SRC_DIR / processor['directory'] / processor['script']
-    
-    logger.info(f"📝 {processor['description']}")
-    
-    success = run_script(
-        script_path,
-        processor['name'],
-        working_dir=SRC_DIR / processor['directory']
-    )
+    status = run_pipeline_dag(PIPELINE_STAGES, max_workers=max_workers, force=force, in_process=in_process)
     
-    if success:
-        # Verificar que se generó combined_data.csv
-        combined_path = DATA_PROCESSED_DIR / "combined-data" / "combined_data.csv"
-        if check_file_exists(combined_path, "Datos combinados"):
-            logger.info("✅ PASO 2 completado exitosamente")
-            return True
-    
-    logger.error("❌ PASO 2 falló")
-    return False
-
-def step_3_filter_data():
-    """PASO 3: Filtrar y procesar datos de comentarios"""
     logger.info("\n" + "=" * 60)
-    logger.info("🔍 PASO 3: FILTRANDO DATOS DE COMENTARIOS")
+    logger.info("📊 RESUMEN PASO 2 - ETAPAS:")
+    icons = {"ok": "✅", "skipped": "⏭️", "failed": "❌", "blocked": "⛔"}
+    for stage in PIPELINE_STAGES:
+        result = status.get(stage["name"], "blocked")
+        logger.info(f"   {icons[result]} {stage['name']}: {result}")
     logger.info("=" * 60)
     
-    processor = PROCESSORS_CONFIG[1]  # filter-advanced.py
-    script_path = SRC_DIR / processor['directory'] / processor['script']
-    
-    logger.info(f"📝 {processor['description']}")
-    
-    success = run_script(
-        script_path,
-        processor['name'], 
-        working_dir=SRC_DIR / processor['directory']
-    )
-    
-    if success:
-        # Verificar archivos generados
-        files_to_check = [
-            (DATA_PROCESSED_DIR / "filtered-data" / "filtered_data.csv", "Datos filtrados generales"),
-            (DATA_PROCESSED_DIR / "filtered-data" / "filtro1_localizacion.csv", "Filtro localización"),
-            (DATA_PROCESSED_DIR / "filtered-data" / "filtro6_marin.csv", "Filtro Marín")
-        ]
-        
-        all_files_ok = True
-        for file_path, description in files_to_check:
-            if not check_file_exists(file_path, description):
-                all_files_ok = False
-        
-        if all_files_ok:
-            logger.info("✅ PASO 3 completado exitosamente")
-            return True
-    
-    logger.error("❌ PASO 3 falló")
-    return False
+    return all(status.get(stage["name"]) in ("ok", "skipped") for stage in PIPELINE_STAGES)
 
-def step_4_process_metrics():
-    """PASO 4: Procesar métricas de visualizaciones"""
-    logger.info("\n" + "=" * 60)
-    logger.info("📊 PASO 4: PROCESANDO MÉTRICAS")
-    logger.info("=" * 60)
-    
-    # Procesar métricas avanzadas (políticas)
-    logger.info("🏛️ Procesando métricas políticas...")
-    metrics_advanced = PROCESSORS_CONFIG[2]  # filter-advanced-m.py
-    script_path_advanced = SRC_DIR / metrics_advanced['directory'] / metrics_advanced['script']
-    
-    success_advanced = run_script(
-        script_path_advanced,
-        metrics_advanced['name'],
-        working_dir=SRC_DIR / metrics_advanced['directory']
-    )
-    
-    # Procesar métricas básicas (visualizaciones)
-    logger.info("📈 Procesando métricas de visualizaciones...")
-    metrics_basic = PROCESSORS_CONFIG[3]  # filter-basic-m.py  
-    script_path_basic = SRC_DIR / metrics_basic['directory'] / metrics_basic['script']
-    
-    success_basic = run_script(
-        script_path_basic,
-        metrics_basic['name'],
-        working_dir=SRC_DIR / metrics_basic['directory']
-    )
-    
-    # Verificar archivos generados
-    if success_advanced and success_basic:
-        files_to_check = [
-            (DATA_PROCESSED_DIR / "metrics-advanced" / "politicos_totales.csv", "Métricas políticas"),
-            (DATA_PROCESSED_DIR / "metrics-data" / "visualizaciones_totales.csv", "Métricas visualizaciones")
-        ]
-        
-        all_files_ok = True
-        for file_path, description in files_to_check:
-            if not check_file_exists(file_path, description):
-                all_files_ok = False
-        
-        if all_files_ok:
-            logger.info("✅ PASO 4 completado exitosamente") 
-            return True
-    
-    logger.error("❌ PASO 4 falló")
-    return False
+def publish_snapshot():
+    """
+    Publica las salidas como instantánea nueva de los datos de la app
+    (data/processed/snapshots), solo si cambiaron respecto a la publicada
+    """
+    snapshots = load_processor(DATA_SNAPSHOTS_FILE)
+    try:
+        version, published = snapshots.publicar_instantanea()
+    except Exception as e:
+        logger.error(f"❌ No se pudo publicar la instantánea de datos: {e}")
+        return False
+    if published:
+        logger.info(f"📦 Instantánea publicada: {version} (la app la carga en su siguiente ejecución)")
+    else:
+        logger.info(f"📦 Datos sin cambios: la app sigue con la instantánea {version}")
+    return True
 
-def step_5_final_verification():
-    """PASO 5: Verificación final de todos los CSVs necesarios"""
+def step_3_final_verification():
+    """PASO 3: Verificación final de todos los CSVs necesarios"""
     logger.info("\n" + "=" * 60)
-    logger.info("🔍 PASO 5: VERIFICACIÓN FINAL")
+    logger.info("🔍 PASO 3: VERIFICACIÓN FINAL")
     logger.info("=" * 60)
     
     # CSVs críticos que debe usar la aplicación Streamlit
@@ -403,8 +1028,8 @@ def step_5_final_verification():
         
         # Comentarios
         (DATA_PROCESSED_DIR / "filtered-data" / "filtered_data.csv", "Datos filtrados principales"),
-        (DATA_PROCESSED_DIR / "filtered-data" / "filtro1_localizacion.csv", "Filtro localización (O Morrazo/Pontevedra)"),
-        (DATA_PROCESSED_DIR / "filtered-data" / "filtro6_marin.csv", "Filtro Marín específico")
+        (DATA_PROCESSED_DIR / "filtered-data" / "articles.csv", "Tabla de artículos"),
+        (DATA_PROCESSED_DIR / "filtered-data" / "comments.csv", "Tabla de comentarios (con regiones)")
     ]
     
     logger.info("📋 Verificando CSVs críticos para Streamlit:")
@@ -414,7 +1039,6 @@ def step_5_final_verification():
         if check_file_exists(file_path, description):
             # Verificar que el archivo no esté vacío
             try:
-                import pandas as pd
                 df = pd.read_csv(file_path)
                 logger.info(f"   📊 {file_path.name}: {len(df)} filas")
             except Exception as e:
@@ -466,14 +1090,138 @@ def print_summary():
     print(summary)
     logger.info("Pipeline HorizontAI completado exitosamente")
 
+# ========================
+# MODO VIGILANCIA
+# ========================
+# Con --watch el pipeline queda en marcha comprobando los archivos de entrada
+# (los CSVs que dejan los scrapers en data/raw y las reglas de localización).
+# Cuando alguno aparece o cambia, y deja de cambiar entre dos comprobaciones,
+# se vuelve a ejecutar el grafo de etapas: solo las etapas cuyas entradas
+# cambiaron, y dentro de ellas solo se vuelven a leer las fuentes modificadas
+# (caché de CSVs). Si algo cambió se publica una instantánea nueva para la app.
+
+def watched_files(stages=PIPELINE_STAGES):
+    """Entradas del pipeline que no genera ninguna etapa, ordenadas"""
+    outputs = {Path(output) for stage in stages for output in stage["outputs"]}
+    inputs = resolve_stage_files([pattern for stage in stages for pattern in stage["inputs"]])
+    return [path for path in inputs if path not in outputs]
+
+def files_signatures(paths):
+    """{ruta: firma} de los archivos que siguen existiendo"""
+    signatures = {}
+    for path in paths:
+        try:
+            signatures[path] = file_signature(path)
+        except FileNotFoundError:
+            continue
+    return signatures
+
+def changed_files(before, after):
+    """Archivos nuevos, modificados o borrados entre dos comprobaciones"""
+    return sorted(path for path in set(before) | set(after) if before.get(path) != after.get(path))
+
+def process_raw_changes(args, start_time):
+    """Ejecuta las etapas afectadas por los cambios en los datos raw y publica el resultado"""
+    try:
+        return (step_2_process_data(max_workers=max(1, args.jobs), force=args.force, in_process=not args.subprocess)
+                and publish_snapshot())
+    except Exception as e:
+        logger.error(f"💥 Error inesperado procesando los cambios: {e}")
+        return False
+
+def watch_raw_data(args):
+    """
+    Vigila los datos raw y procesa cada cambio en cuanto el archivo deja de
+    cambiar (un scraper puede estar escribiéndolo). Termina con Ctrl+C.
+
+    Returns:
+        bool: True si la última ejecución terminó bien
+    """
+    interval = max(1, args.watch_interval)
+    logger.info(f"👀 Modo vigilancia: comprobando {DATA_RAW_DIR} cada {interval}s (Ctrl+C para salir)")
+    create_directories()
+    enable_csv_cache()
+
+    # Primera ejecución con el estado actual (las etapas al día se saltan)
+    processed = files_signatures(watched_files())
+    success = run_with_report(process_raw_changes, args)
+    previous = processed
+    try:
+        while True:
+            time.sleep(interval)
+            current = files_signatures(watched_files())
+            if current != processed and current == previous:
+                changes = changed_files(processed, current)
+                logger.info(f"🔔 Cambios en {len(changes)} archivo(s): {', '.join(path.name for path in changes)}")
+                # Se marcan como procesados aunque falle: las etapas fallidas no
+                # guardan su estado y se repiten con el siguiente cambio
+                processed = current
+                success = run_with_report(process_raw_changes, args)
+                logger.info(f"👀 Esperando cambios en {DATA_RAW_DIR}...")
+            previous = current
+    except KeyboardInterrupt:
+        logger.info("👋 Modo vigilancia detenido por el usuario")
+    return success
+
 # ========================
 # FUNCIÓN PRINCIPAL
 # ========================
 
-def main():
-    """Función principal del pipeline"""
+def parse_args(argv=None):
+    """Argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Pipeline completo de HorizontAI")
+    parser.add_argument("--skip-scrapers", action="store_true",
+                        help="No ejecutar los scrapers; procesar los CSVs raw existentes")
+    parser.add_argument("--force", action="store_true",
+                        help="Ejecutar todas las etapas de procesamiento aunque estén al día")
+    parser.add_argument("--scraper-jobs", type=int, default=MAX_PARALLEL_SCRAPERS,
+                        help=f"Scrapers en paralelo, cada uno contra su host (por defecto {MAX_PARALLEL_SCRAPERS})")
+    parser.add_argument("--jobs", type=int, default=MAX_PARALLEL_STAGES,
+                        help=f"Etapas de procesamiento en paralelo (por defecto {MAX_PARALLEL_STAGES})")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continuar una ejecución interrumpida sin repetir los scrapers que ya terminaron")
+    parser.add_argument("--subprocess", action="store_true",
+                        help="Ejecutar cada etapa de procesamiento como un script aparte (modo anterior)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Sin scrapers: vigilar data/raw y procesar cada archivo nuevo o modificado")
+    parser.add_argument("--watch-interval", type=int, default=WATCH_INTERVAL,
+                        help=f"Segundos entre comprobaciones en modo vigilancia (por defecto {WATCH_INTERVAL})")
+    return parser.parse_args(argv)
+
+def run_with_report(run, args):
+    """Ejecuta run(args, start_time) y guarda el informe de la ejecución"""
     start_time = datetime.now()
+    started = time.perf_counter()
+    reset_run_report()
     
+    success = False
+    try:
+        success = run(args, start_time)
+        return success
+    finally:
+        try:
+            # Con microsegundos: dos ejecuciones en el mismo segundo no comparten informe
+            write_run_report(start_time.strftime("%Y%m%d-%H%M%S-%f"), start_time, success,
+                             time.perf_counter() - started, vars(args))
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo guardar el informe de la ejecución: {e}")
+
+def main(args=None):
+    """Función principal del pipeline: lo ejecuta (o vigila data/raw con --watch) y guarda el informe"""
+    if args is None:
+        args = parse_args([])
+    if args.watch:
+        return watch_raw_data(args)
+    
+    success = run_with_report(run_pipeline, args)
+    if success:
+        finish_scrapers_checkpoint()
+    else:
+        logger.info("💡 Relanza con --resume para continuar desde el primer paso incompleto")
+    return success
+
+def run_pipeline(args, start_time):
+    """Ejecuta los pasos del pipeline"""
     try:
         # Banner inicial
         print_banner()
@@ -483,28 +1231,26 @@ def main():
         create_directories()
         
         # PASO 1: Scrapers
-        if not step_1_run_scrapers():
+        if args.skip_scrapers:
+            logger.info("⏭️ PASO 1 omitido (--skip-scrapers): se usan los CSVs raw existentes")
+            for scraper in SCRAPERS_CONFIG:
+                record_run_metrics("scraper", scraper['name'], "skipped")
+        elif not step_1_run_scrapers(max_workers=max(1, args.scraper_jobs), resume=args.resume):
             logger.error("💥 FALLO CRÍTICO: Ningún scraper funcionó")
             return False
         
-        # PASO 2: Combinación 
-        if not step_2_combine_data():
-            logger.error("💥 FALLO CRÍTICO: No se pudieron combinar datos")
-            return False
-        
-        # PASO 3: Filtrado
-        if not step_3_filter_data():
-            logger.error("💥 FALLO CRÍTICO: No se pudieron filtrar datos")
+        # PASO 2: Combinación, filtrado y métricas
+        if not step_2_process_data(max_workers=max(1, args.jobs), force=args.force, in_process=not args.subprocess):
+            logger.error("💥 FALLO CRÍTICO: No se pudieron procesar los datos")
             return False
         
-        # PASO 4: Métricas
-        if not step_4_process_metrics():
-            logger.error("💥 FALLO CRÍTICO: No se pudieron procesar métricas")
+        # PASO 3: Verificación final
+        if not step_3_final_verification():
+            logger.error("💥 FALLO CRÍTICO: Verificación final falló")
             return False
         
-        # PASO 5: Verificación final
-        if not step_5_final_verification():
-            logger.error("💥 FALLO CRÍTICO: Verificación final falló")
+        # Publicación para la app
+        if not publish_snapshot():
             return False
         
         # Resumen exitoso
@@ -530,7 +1276,7 @@ if __name__ == "__main__":
         sys.exit(1)
     
     # Ejecutar pipeline
-    success = main()
+    success = main(parse_args())
     
     # Código de salida
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    sys.exit(0 if success else 1)
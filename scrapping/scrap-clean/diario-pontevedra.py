@@ -6,13 +6,14 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.action_chains import ActionChains
 from bs4 import BeautifulSoup
-import pandas as pd
 from datetime import datetime, date
 import os
 import time
 import random
 import re
 
+from scrap_journal import open_journal, save_article, saved_links, save_checkpoint, load_checkpoint, report_resume, export_journal
+
 # Intentar importar undetected-chromedriver
 try:
     import undetected_chromedriver as uc
@@ -25,6 +26,7 @@ except ImportError:
 OUTPUT_DIR = os.path.join("..", "..", "data", "raw", "clean-csvs")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 OUTPUT_PATH = os.path.join(OUTPUT_DIR, "diario-pontevedra-limpio.csv")
+JOURNAL_NAME = "diario-pontevedra"  # Diario con los artículos ya procesados (ver scrap_journal.py)
 
 # CONFIGURACIÓN PRINCIPAL
 DATE_THRESHOLD = datetime(2024, 5, 28)  # Fecha umbral - procesar artículos >= esta fecha
@@ -301,19 +303,26 @@ def scrape_multiple_articles_stealth(base_url="https://www.diariodepontevedra.es
     print(f"🚫 Máximo artículos viejos consecutivos: {max_old_articles}")
     print("🕰️ MODO ULTRA-LENTO ACTIVADO (pausas 5-15s)")
     
+    # Recuperar lo guardado por una ejecución anterior interrumpida
+    journal = open_journal(JOURNAL_NAME)
+    report_resume(journal)
+    start_page = load_checkpoint(journal, "page", 1)
+
     driver = setup_stealth_driver()
     all_rows = []
-    seen_links = set()
+    seen_links = saved_links(journal)
     old_articles = 0
     total_processed = 0
+    finished = False
 
     try:
-        for page in range(1, max_pages + 1):
+        for page in range(start_page, max_pages + 1):
             url = base_url if page == 1 else f"{base_url}?page={page}"
             print(f"\n🔄 Página {page}: {url}")
+            save_checkpoint(journal, "page", page)
     
             # Renovar sesión en cada página (excepto la primera)
-            if page > 1:
+            if page > start_page:
                 print("🔄 Nueva sesión para nueva página...")
                 driver.quit()
                 time.sleep(random.uniform(5, 10))
@@ -377,15 +386,8 @@ def scrape_multiple_articles_stealth(base_url="https://www.diariodepontevedra.es
                     old_articles += 1
                     if old_articles >= max_old_articles:
                         print(f"🏁 Límite de artículos antiguos consecutivos alcanzado: {max_old_articles}. Finalizando.")
-                        
-                        # Guardar antes de salir
-                        if all_rows:
-                            df = pd.DataFrame(all_rows)
-                            df.to_csv(OUTPUT_PATH, index=False, encoding="utf-8")
-                            print(f"✅ Guardado CSV final: {OUTPUT_PATH} con {len(df)} artículos")
-                        
-                        driver.quit()
-                        return
+                        finished = True
+                        break
                     continue
                 else:
                     old_articles = 0
@@ -430,6 +432,7 @@ def scrape_multiple_articles_stealth(base_url="https://www.diariodepontevedra.es
                         row[f"comment_{i+1}_dislikes"] = comment["dislikes"]
 
                     all_rows.append(row)
+                    save_article(journal, row)
                     print(f"✅ Artículo #{total_processed} procesado: {len(comments)} comentarios")
                     
                     # OPCIÓN 1: Pausas más largas entre artículos (5-15 segundos)
@@ -460,18 +463,19 @@ def scrape_multiple_articles_stealth(base_url="https://www.diariodepontevedra.es
                 except Exception as e:
                     print(f"⚠️ Error procesando artículo: {e}")
                     continue
+
+            if finished:
+                break
                     
     finally:
         driver.quit()
 
-    # Guardar resultados finales
-    if all_rows:
-        df = pd.DataFrame(all_rows)
-        df.to_csv(OUTPUT_PATH, index=False, encoding="utf-8")
-        
+    # Guardar resultados finales (incluye los artículos de ejecuciones interrumpidas)
+    total_saved = export_journal(journal, JOURNAL_NAME, OUTPUT_PATH)
+    if total_saved:
         print(f"\n🎉 SCRAPING COMPLETADO:")
         print(f"   📊 Total artículos procesados: {total_processed}")
-        print(f"   ✅ Artículos con datos: {len(df)}")
+        print(f"   ✅ Artículos con datos: {total_saved}")
         print(f"   💬 Total comentarios extraídos: {sum(row['n_comments'] for row in all_rows)}")
         print(f"   💾 Archivo guardado: {OUTPUT_PATH}")
     else:
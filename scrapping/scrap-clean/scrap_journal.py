@@ -0,0 +1,92 @@
+"""
+Diario de scraping con puntos de control
+
+Los scrapers largos (Diario de Pontevedra, La Voz de Galicia) guardan cada
+artículo terminado en una base SQLite en cuanto lo procesan, junto con la
+página por la que iban. Si el scraper se cae, la siguiente ejecución recupera
+los artículos ya guardados, no los vuelve a visitar y sigue desde esa página.
+Al terminar se escribe el CSV con todos los artículos y se borra el diario.
+"""
+
+import os
+import json
+import sqlite3
+import pandas as pd
+from datetime import datetime
+
+JOURNAL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "raw", "journal")
+
+def open_journal(name):
+    """
+    Abre (o crea) el diario de un scraper
+
+    Cada artículo se confirma en su propia transacción, así que lo guardado
+    sobrevive a una caída del proceso.
+    """
+    os.makedirs(JOURNAL_DIR, exist_ok=True)
+    connection = sqlite3.connect(os.path.join(JOURNAL_DIR, f"{name}.db"))
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS articles (
+            position INTEGER PRIMARY KEY AUTOINCREMENT,
+            link TEXT UNIQUE NOT NULL,
+            row TEXT NOT NULL,
+            saved_at TEXT NOT NULL
+        )
+    """)
+    connection.execute("CREATE TABLE IF NOT EXISTS checkpoints (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    connection.commit()
+    return connection
+
+def save_article(connection, row):
+    """Guarda un artículo terminado (fila del CSV final) en el diario"""
+    with connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO articles (link, row, saved_at) VALUES (?, ?, ?)",
+            (row["link"], json.dumps(row, ensure_ascii=False), datetime.now().isoformat(timespec="seconds"))
+        )
+
+def saved_rows(connection):
+    """Artículos del diario, en el orden en que se guardaron"""
+    return [json.loads(row) for (row,) in connection.execute("SELECT row FROM articles ORDER BY position")]
+
+def saved_links(connection):
+    """Enlaces de los artículos ya guardados (para no volver a visitarlos)"""
+    return {link for (link,) in connection.execute("SELECT link FROM articles")}
+
+def save_checkpoint(connection, key, value):
+    """Guarda un punto de control (p. ej. la página por la que va el scraper)"""
+    with connection:
+        connection.execute("INSERT OR REPLACE INTO checkpoints (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+def load_checkpoint(connection, key, default=None):
+    """Lee un punto de control; default si no existe"""
+    found = connection.execute("SELECT value FROM checkpoints WHERE key = ?", (key,)).fetchone()
+    return json.loads(found[0]) if found else default
+
+def report_resume(connection, key="page"):
+    """Muestra qué se recupera de una ejecución anterior interrumpida"""
+    rows = connection.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+    if rows:
+        print(f"♻️ Reanudando ejecución anterior: {rows} artículos ya guardados, página {load_checkpoint(connection, key, 1)}")
+    return rows
+
+def export_journal(connection, name, output_path):
+    """
+    Escribe todos los artículos del diario en el CSV de salida (archivo
+    temporal + reemplazo) y borra el diario: la ejecución ha terminado
+
+    Returns:
+        int: número de artículos escritos
+    """
+    rows = saved_rows(connection)
+    if rows:
+        temporary = output_path + ".tmp"
+        pd.DataFrame(rows).to_csv(temporary, index=False, encoding="utf-8")
+        os.replace(temporary, output_path)
+    connection.close()
+    for suffix in ("", "-wal", "-shm"):
+        path = os.path.join(JOURNAL_DIR, f"{name}.db{suffix}")
+        if os.path.exists(path):
+            os.remove(path)
+    return len(rows)
@@ -13,10 +13,13 @@ import os
 import time
 import re
 
+from scrap_journal import open_journal, save_article, saved_links, save_checkpoint, load_checkpoint, report_resume, export_journal
+
 # Configuración
 OUTPUT_DIR = os.path.join("..", "..", "data", "raw", "clean-csvs")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 OUTPUT_PATH = os.path.join(OUTPUT_DIR, "voz_galicia-limpio.csv")
+JOURNAL_NAME = "voz-galicia"  # Diario con los artículos ya procesados (ver scrap_journal.py)
 DATE_THRESHOLD = datetime(2025, 5, 15)
 
 def setup_driver():
@@ -395,11 +398,14 @@ def scrape_multiple_articles(base_url="https://www.lavozdegalicia.es/pontevedra/
                             max_articles=10000,
                             max_old_articles=3): 
     """Función para scraper múltiples artículos"""
+    # Recuperar lo guardado por una ejecución anterior interrumpida
+    journal = open_journal(JOURNAL_NAME)
+    article_count = report_resume(journal)
+    done_links = saved_links(journal)
+    page = load_checkpoint(journal, "page", 1)
+
     driver = setup_driver()
-    article_count = 0
     old_articles_seen = 0
-    page = 1
-    all_rows = []
 
     print(f"🎯 Scrapeando artículos posteriores a: {date_threshold.date()}")
     print(f"📊 Máximo de artículos antiguos consecutivos antes de parar: {max_old_articles}")
@@ -408,6 +414,7 @@ def scrape_multiple_articles(base_url="https://www.lavozdegalicia.es/pontevedra/
         while article_count < max_articles and old_articles_seen < max_old_articles:
             page_url = base_url if page == 1 else f"{base_url}{page}"
             print(f"\n🌐 Cargando página {page}: {page_url}")
+            save_checkpoint(journal, "page", page)
             driver.get(page_url)
             WebDriverWait(driver, 10).until(
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
@@ -438,6 +445,10 @@ def scrape_multiple_articles(base_url="https://www.lavozdegalicia.es/pontevedra/
                     print(f"🛑 Encontrados {max_old_articles} artículos antiguos consecutivos, parando...")
                     break
 
+                if article_url in done_links:
+                    print(f"⏭️ Ya guardado: {article_url}")
+                    continue
+
                 print(f"\n📝 Procesando artículo: {article_url}")
                 try:
                     driver.get(article_url)
@@ -537,7 +548,8 @@ def scrape_multiple_articles(base_url="https://www.lavozdegalicia.es/pontevedra/
                         row[f"comment_{i+1}_likes"] = comment["likes"]
                         row[f"comment_{i+1}_dislikes"] = comment["dislikes"]
 
-                    all_rows.append(row)
+                    save_article(journal, row)
+                    done_links.add(article_url)
                     article_count += 1
 
                 except Exception as e:
@@ -549,11 +561,10 @@ def scrape_multiple_articles(base_url="https://www.lavozdegalicia.es/pontevedra/
     finally:
         driver.quit()
 
-    # Guardar resultados
-    if all_rows:
-        df = pd.DataFrame(all_rows)
-        df.to_csv(OUTPUT_PATH, index=False, encoding='utf-8')
-        print(f"\n✅ Guardado CSV con {len(df)} artículos en {OUTPUT_PATH}")
+    # Guardar resultados (incluye los artículos de ejecuciones interrumpidas)
+    total_saved = export_journal(journal, JOURNAL_NAME, OUTPUT_PATH)
+    if total_saved:
+        print(f"\n✅ Guardado CSV con {total_saved} artículos en {OUTPUT_PATH}")
     else:
         print(f"\n⚠️ No se encontraron artículos válidos para guardar")
     
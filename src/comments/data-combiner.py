@@ -1,23 +1,38 @@
 import os
+import queue
+import threading
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-# Rutas internas basadas en tu estructura
-RUTA_BASE = os.path.abspath(os.path.join("..", "data"))
+# Rutas internas basadas en tu estructura (relativas a este archivo, para poder
+# importarlo desde main.py sin depender del directorio de trabajo)
+RUTA_BASE = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data"))
 CARPETA_ENTRADA = os.path.join(RUTA_BASE, "raw", "clean-csvs")
 CARPETA_SALIDA = os.path.join(RUTA_BASE, "processed", "combined-data")
 os.makedirs(CARPETA_SALIDA, exist_ok=True)
 
+# Lectura por bloques: filas por bloque, bloques leídos por adelantado de cada
+# fuente y fuentes leyendo a la vez. La memoria máxima depende de estos valores,
+# no del tamaño total de los CSVs.
+FILAS_POR_BLOQUE = 2000
+BLOQUES_EN_COLA = 2
+FUENTES_EN_PARALELO = 4
+
 def reordenar_columnas_comentarios(df):
     """
     Reordena las columnas para mantener agrupados los datos de cada comentario.
     Patrón: comment_X_author, comment_X_location, comment_X_date, comment_X_text, comment_X_likes, comment_X_dislikes
     """
+    return df[ordenar_columnas(df.columns)]
+
+def ordenar_columnas(columnas):
+    """Orden de columnas de reordenar_columnas_comentarios, a partir solo de sus nombres"""
     # Identificar columnas base (no de comentarios)
     base_columns = []
     comment_columns = []
     
-    for col in df.columns:
+    for col in columnas:
         if col.startswith('comment_') and '_' in col:
             comment_columns.append(col)
         else:
@@ -71,85 +86,127 @@ def reordenar_columnas_comentarios(df):
     # Combinar: columnas base + columnas de comentarios ordenadas
     final_order = base_columns + ordered_comment_columns
     
-    # Filtrar solo columnas que existen en el DataFrame
-    final_order = [col for col in final_order if col in df.columns]
-    
-    return df[final_order]
+    # Filtrar solo columnas que existen
+    return [col for col in final_order if col in columnas]
 
-def mixer_csvs(columna_texto="title", archivo_salida="combined_data.csv"):
-    """
-    Combina múltiples CSV desde clean-csvs/ en un solo archivo gigante.
+def es_columna_votos(columna):
+    """Columnas de likes/dislikes (se guardan como enteros, 0 si faltan)"""
+    return columna.endswith(('_likes', '_dislikes'))
 
-    Args:
-        columna_texto (str): Columna principal sobre la que se hará análisis.
-        archivo_salida (str): Nombre del archivo CSV combinado.
+def esquema_unificado(rutas, columna_texto="title"):
+    """
+    Esquema común de varias fuentes leyendo solo sus cabeceras
     
     Returns:
-        str: Ruta del archivo generado
+        tuple: (columnas ordenadas, dtypes de lectura, rutas válidas). Las
+            fuentes ilegibles o sin columna_texto se descartan.
     """
-    archivos = [f for f in os.listdir(CARPETA_ENTRADA) if f.endswith(".csv")]
-
-    if not archivos:
-        raise FileNotFoundError(f"No se encontraron CSVs en {CARPETA_ENTRADA}")
+    columnas = []
+    validas = []
+    for ruta in rutas:
+        try:
+            cabecera = pd.read_csv(ruta, nrows=0).columns
+        except Exception as e:
+            print(f"❌ Error procesando {os.path.basename(ruta)}: {str(e)}")
+            continue
+        if columna_texto not in cabecera:
+            print(f"⚠️  {os.path.basename(ruta)} no contiene la columna '{columna_texto}'. Saltado.")
+            continue
+        validas.append(ruta)
+        columnas.extend(col for col in cabecera if col not in columnas)
 
-    print(f"📁 Encontrados {len(archivos)} archivos CSV")
-    
-    dataframes = []
-    estadisticas = []
+    columnas = ordenar_columnas(columnas)
+    # Texto como str (sin inferir tipos bloque a bloque), votos como float
+    # porque pueden faltar y se convierten a enteros al escribir
+    dtypes = {col: "float64" if es_columna_votos(col) else ("Int64" if col == "n_comments" else str) for col in columnas}
+    return columnas, dtypes, validas
 
-    for archivo in archivos:
-        print(f"📖 Procesando: {archivo}")
-        ruta_archivo = os.path.join(CARPETA_ENTRADA, archivo)
-        
+def poner_en_cola(cola, elemento, cancelado):
+    """Deja elemento en cola esperando a que haya hueco; False si se canceló la combinación"""
+    while not cancelado.is_set():
         try:
-            df = pd.read_csv(ruta_archivo)
-            filas_originales = len(df)
-            
-            # Verificar que existe la columna principal
-            if columna_texto not in df.columns:
-                print(f"⚠️  {archivo} no contiene la columna '{columna_texto}'. Saltado.")
-                continue
-
-            # Limpiar columna principal
-            df[columna_texto] = df[columna_texto].fillna("")
-            
-            dataframes.append(df)
-            estadisticas.append({
-                "archivo": archivo,
-                "filas": filas_originales
-            })
-            
-            print(f"✅ {archivo}: {filas_originales} filas")
-            
-        except Exception as e:
-            print(f"❌ Error procesando {archivo}: {str(e)}")
+            cola.put(elemento, timeout=0.1)
+            return True
+        except queue.Full:
             continue
+    return False
 
-    if not dataframes:
-        raise ValueError("No se pudo procesar ningún archivo CSV válido")
+def leer_por_bloques(ruta, columnas, dtypes, columna_texto, cola, cancelado, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Lee una fuente por bloques ajustados al esquema común y los deja en cola
+    (None al terminar). Devuelve el número de filas leídas.
+    """
+    filas = 0
+    try:
+        cabecera = set(pd.read_csv(ruta, nrows=0).columns)
+        dtypes_fuente = {col: tipo for col, tipo in dtypes.items() if col in cabecera}
+        for bloque in pd.read_csv(ruta, dtype=dtypes_fuente, chunksize=filas_por_bloque):
+            bloque = bloque.reindex(columns=columnas)
+            bloque[columna_texto] = bloque[columna_texto].fillna("")
+            for col in columnas:
+                if es_columna_votos(col):
+                    bloque[col] = bloque[col].fillna(0).astype("int64")
+            filas += len(bloque)
+            if not poner_en_cola(cola, bloque, cancelado):
+                break
+    finally:
+        poner_en_cola(cola, None, cancelado)
+    return filas
 
-    # Combinar todos los DataFrames
-    print(f"\n🔄 Combinando {len(dataframes)} DataFrames...")
-    df_combinado = pd.concat(dataframes, ignore_index=True, sort=False)
-    
-    # Reordenar columnas para mantener estructura lógica de comentarios
-    print("🔄 Reordenando columnas...")
-    df_combinado = reordenar_columnas_comentarios(df_combinado)
-    
-    # Convertir likes y dislikes a enteros
-    print("🔄 Convirtiendo likes/dislikes a enteros...")
-    likes_dislikes_columns = [col for col in df_combinado.columns if col.endswith(('_likes', '_dislikes'))]
-    for col in likes_dislikes_columns:
-        df_combinado[col] = df_combinado[col].fillna(0).astype(int)
+def combinar_csvs_por_bloques(rutas, ruta_salida, columna_texto="title",
+                              filas_por_bloque=FILAS_POR_BLOQUE, fuentes_en_paralelo=FUENTES_EN_PARALELO):
+    """
+    Combina varios CSVs en uno sin cargarlos enteros en memoria.
     
-    # Guardar el archivo combinado
-    ruta_salida = os.path.join(CARPETA_SALIDA, archivo_salida)
-    df_combinado.to_csv(ruta_salida, index=False)
+    El esquema se unifica primero con las cabeceras; después cada fuente se lee
+    por bloques en su propio hilo y los bloques se añaden al CSV de salida en el
+    orden de las fuentes (archivo temporal + reemplazo al terminar).
     
-    # Mostrar estadísticas finales
+    Returns:
+        tuple: (columnas del CSV, lista de estadísticas por archivo)
+    """
+    columnas, dtypes, rutas = esquema_unificado(rutas, columna_texto)
+    if not rutas:
+        raise ValueError("No se pudo procesar ningún archivo CSV válido")
+
+    colas = [queue.Queue(maxsize=BLOQUES_EN_COLA) for _ in rutas]
+    cancelado = threading.Event()
+    ruta_temporal = ruta_salida + ".tmp"
+    pd.DataFrame(columns=columnas).to_csv(ruta_temporal, index=False)
+
+    print(f"\n🔄 Combinando {len(rutas)} archivos por bloques de {filas_por_bloque} filas...")
+    estadisticas = []
+    with ThreadPoolExecutor(max_workers=fuentes_en_paralelo) as pool:
+        lecturas = [
+            pool.submit(leer_por_bloques, ruta, columnas, dtypes, columna_texto, cola, cancelado, filas_por_bloque)
+            for ruta, cola in zip(rutas, colas)
+        ]
+        try:
+            for ruta, cola, lectura in zip(rutas, colas, lecturas):
+                archivo = os.path.basename(ruta)
+                print(f"📖 Procesando: {archivo}")
+                bloque = cola.get()
+                while bloque is not None:
+                    bloque.to_csv(ruta_temporal, mode="a", header=False, index=False)
+                    bloque = cola.get()
+                filas = lectura.result()
+                estadisticas.append({"archivo": archivo, "filas": filas})
+                print(f"✅ {archivo}: {filas} filas")
+        except BaseException:
+            # Parar los lectores que esperan hueco en su cola
+            cancelado.set()
+            if os.path.exists(ruta_temporal):
+                os.remove(ruta_temporal)
+            raise
+
+    os.replace(ruta_temporal, ruta_salida)
+    return columnas, estadisticas
+
+def mostrar_resumen_columnas(total_filas, columnas, estadisticas, ruta_salida):
+    """Muestra el resumen del archivo combinado a partir de su número de filas y sus columnas"""
     print(f"\n📊 RESUMEN:")
-    print(f"   • Total de filas: {len(df_combinado):,}")
-    print(f"   • Total de columnas: {len(df_combinado.columns)}")
+    print(f"   • Total de filas: {total_filas:,}")
+    print(f"   • Total de columnas: {len(columnas)}")
     print(f"   • Archivos procesados: {len(estadisticas)}")
     print(f"   • Archivo guardado en: {ruta_salida}")
     
@@ -159,8 +216,33 @@ def mixer_csvs(columna_texto="title", archivo_salida="combined_data.csv"):
     
     # Mostrar info de las columnas
     print(f"\n🏷️  COLUMNAS EN EL DATASET FINAL:")
-    for col in df_combinado.columns:
+    for col in columnas:
         print(f"   • {col}")
+
+def mixer_csvs(columna_texto="title", archivo_salida="combined_data.csv"):
+    """
+    Combina múltiples CSV desde clean-csvs/ en un solo archivo gigante,
+    leyéndolos por bloques (ver combinar_csvs_por_bloques).
+
+    Args:
+        columna_texto (str): Columna principal sobre la que se hará análisis.
+        archivo_salida (str): Nombre del archivo CSV combinado.
+    
+    Returns:
+        str: Ruta del archivo generado
+    """
+    archivos = sorted(f for f in os.listdir(CARPETA_ENTRADA) if f.endswith(".csv"))
+    if not archivos:
+        raise FileNotFoundError(f"No se encontraron CSVs en {CARPETA_ENTRADA}")
+    print(f"📁 Encontrados {len(archivos)} archivos CSV")
+    
+    # Combinar y guardar el archivo combinado
+    ruta_salida = os.path.join(CARPETA_SALIDA, archivo_salida)
+    columnas, estadisticas = combinar_csvs_por_bloques(
+        [os.path.join(CARPETA_ENTRADA, archivo) for archivo in archivos], ruta_salida, columna_texto
+    )
+    
+    mostrar_resumen_columnas(sum(stat["filas"] for stat in estadisticas), columnas, estadisticas, ruta_salida)
     
     return ruta_salida
 
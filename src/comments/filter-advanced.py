@@ -1,14 +1,58 @@
 import os
+import json
+import sqlite3
+import importlib.util
 import pandas as pd
+from contextlib import closing
 from datetime import datetime
 import re
 
-# Rutas basadas en tu estructura
-RUTA_BASE = os.path.abspath(os.path.join("..", "data"))
+# Rutas basadas en tu estructura (relativas a este archivo, para poder
+# importarlo desde main.py sin depender del directorio de trabajo)
+RUTA_BASE = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data"))
 CARPETA_ENTRADA = os.path.join(RUTA_BASE, "processed", "filtered-data")
 CARPETA_SALIDA = os.path.join(RUTA_BASE, "processed", "filtered-data")
 os.makedirs(CARPETA_SALIDA, exist_ok=True)
 
+# Base SQLite que lee el motor de consultas de Streamlit (utils/query_engine.py)
+ARCHIVO_BASE_DATOS = "horizontai.db"
+
+# Bits de región e índice de texto compartidos con la app: un único módulo
+# (streamlit/utils/comments_index.py) que se importa por ruta
+ARCHIVO_INDICE_COMENTARIOS = os.path.abspath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "streamlit", "utils", "comments_index.py"
+))
+
+def cargar_indice_comentarios(ruta=ARCHIVO_INDICE_COMENTARIOS):
+    """Importa el módulo compartido con la app sin depender de Streamlit"""
+    spec = importlib.util.spec_from_file_location("comments_index", ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+indice_comentarios = cargar_indice_comentarios()
+crear_indice_texto = indice_comentarios.crear_indice_texto
+
+# Reglas declarativas de localización por región (localizaciones permitidas y
+# patrones "desde ..." excluidos). Para añadir un municipio basta con añadir una
+# región con el siguiente bit libre.
+ARCHIVO_REGLAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reglas-localizacion.json")
+
+def cargar_reglas_localizacion(ruta_reglas=ARCHIVO_REGLAS):
+    """Lee el archivo de reglas de localización"""
+    with open(ruta_reglas, encoding='utf-8') as f:
+        return json.load(f)
+
+REGLAS_LOCALIZACION = cargar_reglas_localizacion()
+
+# Bit de cada región en la columna comments.regiones (la app lee los mismos bits
+# de este archivo de reglas)
+BITS_REGION = indice_comentarios.cargar_bits_region(ARCHIVO_REGLAS)
+
+# Campos de cada comentario en el formato ancho de los scrapers (comment_N_<campo>)
+CAMPOS_COMENTARIO = ['author', 'location', 'date', 'text', 'likes', 'dislikes']
+PATRON_COLUMNA_COMENTARIO = re.compile(r'^comment_(\d+)_(' + '|'.join(CAMPOS_COMENTARIO) + r')$')
+
 def tiene_texto_valido(texto):
     """Verifica si un comentario tiene texto válido (no solo espacios o nulo)"""
     if pd.isna(texto) or texto is None:
@@ -16,208 +60,158 @@ def tiene_texto_valido(texto):
     texto_limpio = str(texto).strip()
     return len(texto_limpio) > 0
 
-def primer_filtro_localizacion_voz_galicia(df):
+def normalizar_comentarios(df):
     """
-    Filtro 1: Para "La Voz de Galicia", LIMPIAR comentarios individuales que:
-    1. Su location NO sea MARIN, BUEU, PONTEVEDRA, MOAÑA o nulo
-    2. Su texto contenga "desde A CORUÑA"
-    Eliminar líneas si no quedan comentarios válidos.
+    Convierte el formato ancho de los scrapers (comment_1_author ... comment_N_dislikes)
+    en dos tablas normalizadas:
+    - articles: una fila por artículo, sin columnas de comentarios, con article_id
+    - comments: una fila por comentario con article_id (FK), comment_index, author,
+      location, date, text, likes y dislikes
+
+    El número de comentarios por artículo se detecta a partir de las columnas,
+    así que no hay límite fijo de 15 comentarios.
+    Los comentarios sin texto válido se descartan.
     """
-    print("🔍 Aplicando filtro de localización para La Voz de Galicia...")
+    columnas_comentarios = [col for col in df.columns if PATRON_COLUMNA_COMENTARIO.match(col)]
+    indices_comentario = sorted({int(PATRON_COLUMNA_COMENTARIO.match(col).group(1)) for col in columnas_comentarios})
     
-    df_filtrado = df.copy()
-    localizaciones_permitidas_a = {'MARIN', 'BUEU', 'PONTEVEDRA', 'MOAÑA', '', 'NAN'}
-    filas_eliminadas = []
-    comentarios_limpiados_location_a = 0
-    comentarios_limpiados_coruna_a = 0
+    articles = df.drop(columns=columnas_comentarios).reset_index(drop=True)
+    articles.insert(0, 'article_id', range(len(articles)))
     
-    for idx, row in df_filtrado.iterrows():
-        if row['source'] == "La Voz de Galicia":
-            comentarios_validos = False
-            
-            # Revisar cada comentario
-            for i in range(1, 16):  # comment_1 a comment_15
-                texto_col = f'comment_{i}_text'
-                location_col = f'comment_{i}_location'
-                author_col = f'comment_{i}_author'
-                date_col = f'comment_{i}_date'
-                likes_col = f'comment_{i}_likes'
-                dislikes_col = f'comment_{i}_dislikes'
-                
-                if texto_col in df_filtrado.columns and location_col in df_filtrado.columns:
-                    texto = row[texto_col]
-                    location = row[location_col]
-                    
-                    # Si tiene texto válido, verificar condiciones
-                    if tiene_texto_valido(texto):
-                        texto_str = str(texto)
-                        location_limpia = str(location).strip().upper() if pd.notna(location) else ''
-                        
-                        # Condición 1: Verificar si contiene "desde A CORUÑA" y similares
-                        if (
-                            "desde A CORUÑA" in texto_str 
-                            or "desde A Coruña" in texto_str 
-                            or "desde La Coruña" in texto_str 
-                            or "desde UK" in texto_str 
-                            or "desde EE.UU." in texto_str
-                            or "desde A Gudiña" in texto_str
-                            or "desde O PORRIÑO" in texto_str
-                            or "desde O GROVE" in texto_str
-                            or "desde As Neves" in texto_str
-                            or "desde A ESTRADA" in texto_str
-                        ):
-                            df_filtrado.at[idx, texto_col] = ''
-                            df_filtrado.at[idx, author_col] = ''
-                            df_filtrado.at[idx, location_col] = ''
-                            df_filtrado.at[idx, date_col] = ''
-                            if likes_col in df_filtrado.columns:
-                                df_filtrado.at[idx, likes_col] = 0
-                            if dislikes_col in df_filtrado.columns:
-                                df_filtrado.at[idx, dislikes_col] = 0
-                            comentarios_limpiados_coruna_a += 1
-                            continue  # Ya limpiado, pasar al siguiente
-                        
-                        # Condición 2: Verificar location si NO contiene "desde A CORUÑA" y similares
-                        if location_limpia not in localizaciones_permitidas_a and location_limpia != '':
-                            df_filtrado.at[idx, texto_col] = ''
-                            df_filtrado.at[idx, author_col] = ''
-                            df_filtrado.at[idx, location_col] = ''
-                            df_filtrado.at[idx, date_col] = ''
-                            if likes_col in df_filtrado.columns:
-                                df_filtrado.at[idx, likes_col] = 0
-                            if dislikes_col in df_filtrado.columns:
-                                df_filtrado.at[idx, dislikes_col] = 0
-                            comentarios_limpiados_location_a += 1
-                        
-                        # Si pasa ambas condiciones, marcar como comentario válido
-                        elif location_limpia in localizaciones_permitidas_a or location_limpia == '':
-                            comentarios_validos = True
-            
-            # Si no quedan comentarios válidos para La Voz, eliminar la línea
-            if not comentarios_validos:
-                filas_eliminadas.append(idx)
+    # Apilar cada bloque comment_N_* como filas de la tabla larga
+    partes = []
+    for n in indices_comentario:
+        parte = pd.DataFrame({
+            'article_id': articles['article_id'].values,
+            'comment_index': n
+        })
+        for campo in CAMPOS_COMENTARIO:
+            columna = f'comment_{n}_{campo}'
+            parte[campo] = df[columna].to_numpy(dtype=object) if columna in df.columns else None
+        partes.append(parte)
+    
+    if partes:
+        comments = pd.concat(partes, ignore_index=True)
+    else:
+        comments = pd.DataFrame(columns=['article_id', 'comment_index'] + CAMPOS_COMENTARIO)
+    
+    # Quedarse solo con comentarios con texto
+    texto = comments['text']
+    comments = comments[texto.notna() & texto.astype(str).str.strip().ne('')].copy()
     
-    # Eliminar filas marcadas
-    df_filtrado = df_filtrado.drop(filas_eliminadas)
+    # Limpiar tipos
+    for campo in ['author', 'location', 'date']:
+        comments[campo] = comments[campo].fillna('').astype(str)
+    comments['text'] = comments['text'].astype(str).str.strip()
+    for campo in ['likes', 'dislikes']:
+        comments[campo] = pd.to_numeric(comments[campo], errors='coerce').fillna(0).astype(int)
     
-    print(f"   📊 Comentarios limpiados por location no válida: {comentarios_limpiados_location_a}")
-    print(f"   📊 Comentarios limpiados por 'desde A CORUÑA y similares': {comentarios_limpiados_coruna_a}")
-    print(f"   📊 Filas eliminadas por no tener comentarios válidos: {len(filas_eliminadas)}")
-    return df_filtrado.reset_index(drop=True)
+    comments = comments.sort_values(['article_id', 'comment_index']).reset_index(drop=True)
+    return articles, comments
 
-def segundo_filtro_localizacion_voz_galicia(df):
+def _articulos_sin_comentarios_validos(articles, comments_filtrados, fuente):
+    """Devuelve los article_id de la fuente indicada que se quedan sin comentarios"""
+    ids_fuente = articles.loc[articles['source'] == fuente, 'article_id']
+    return ids_fuente[~ids_fuente.isin(comments_filtrados['article_id'])]
+
+def compilar_patrones_excluidos(patrones):
+    """Compila la lista de patrones literales en una sola expresión regular (o None si está vacía)"""
+    if not patrones:
+        return None
+    return re.compile('|'.join(map(re.escape, patrones)))
+
+def calcular_regiones(articles, comments, reglas=REGLAS_LOCALIZACION):
     """
-    Filtro 6: Para "La Voz de Galicia", LIMPIAR comentarios individuales que:
-    1. Su location NO sea MARIN
-    Eliminar líneas si no quedan comentarios válidos.
+    Calcula en una sola pasada la máscara de bits de región de cada comentario.
+    
+    Todos los comentarios pertenecen a la región general. Para la fuente de las
+    reglas (La Voz de Galicia), un comentario queda FUERA de una región si:
+    1. Su texto contiene alguno de los patrones "desde ..." excluidos
+    2. Su location no está entre las localizaciones permitidas de la región
+    El resto de fuentes pertenece a todas las regiones.
+    
+    Returns:
+        Serie de enteros alineada con comments
     """
-    print("🔍 Aplicando filtro de localización para La Voz de Galicia...")
+    print(f"🔍 Aplicando reglas de localización para {reglas['fuente']}...")
     
-    df_filtrado = df.copy()
-    localizaciones_permitidas_b = {'MARIN'}
-    filas_eliminadas = []
-    comentarios_limpiados_location_b = 0
-    comentarios_limpiados_coruna_b = 0
+    # Columnas derivadas comunes a todas las regiones (se calculan una sola vez)
+    es_fuente = comments['article_id'].map(articles.set_index('article_id')['source']) == reglas['fuente']
+    location_limpia = comments['location'].fillna('').astype(str).str.strip().str.upper()
+    textos = comments['text'].fillna('').astype(str)
     
-    for idx, row in df_filtrado.iterrows():
-        if row['source'] == "La Voz de Galicia":
-            comentarios_validos = False
-            
-            # Revisar cada comentario
-            for i in range(1, 16):  # comment_1 a comment_15
-                texto_col = f'comment_{i}_text'
-                location_col = f'comment_{i}_location'
-                author_col = f'comment_{i}_author'
-                date_col = f'comment_{i}_date'
-                likes_col = f'comment_{i}_likes'
-                dislikes_col = f'comment_{i}_dislikes'
-                
-                if texto_col in df_filtrado.columns and location_col in df_filtrado.columns:
-                    texto = row[texto_col]
-                    location = row[location_col]
-                    
-                    # Si tiene texto válido, verificar condiciones
-                    if tiene_texto_valido(texto):
-                        texto_str = str(texto)
-                        location_limpia = str(location).strip().upper() if pd.notna(location) else ''
-                        
-                        # Condición 1: Verificar si contiene "desde A CORUÑA" y similares
-                        if (
-                            "desde A CORUÑA" in texto_str 
-                            or "desde A Coruña" in texto_str 
-                            or "desde La Coruña" in texto_str 
-                            or "desde UK" in texto_str 
-                            or "desde EE.UU." in texto_str
-                            or "desde A Gudiña" in texto_str
-                            or "desde O PORRIÑO" in texto_str
-                            or "desde O GROVE" in texto_str
-                            or "desde As Neves" in texto_str
-                            or "desde A ESTRADA" in texto_str
-                            or "desde el mundo" in texto_str
-                            or "desde La federación del Jura" in texto_str
-                            or "desde la más baja de las Rías Bajas" in texto_str
-                            or "desde O mundo" in texto_str
-                        ):
-                            df_filtrado.at[idx, texto_col] = ''
-                            df_filtrado.at[idx, author_col] = ''
-                            df_filtrado.at[idx, location_col] = ''
-                            df_filtrado.at[idx, date_col] = ''
-                            if likes_col in df_filtrado.columns:
-                                df_filtrado.at[idx, likes_col] = 0
-                            if dislikes_col in df_filtrado.columns:
-                                df_filtrado.at[idx, dislikes_col] = 0
-                            comentarios_limpiados_coruna_b += 1
-                            continue  # Ya limpiado, pasar al siguiente
-                        
-                        # Condición 2: Verificar location si NO contiene "desde A CORUÑA" y similares
-                        if location_limpia not in localizaciones_permitidas_b:
-                            df_filtrado.at[idx, texto_col] = ''
-                            df_filtrado.at[idx, author_col] = ''
-                            df_filtrado.at[idx, location_col] = ''
-                            df_filtrado.at[idx, date_col] = ''
-                            if likes_col in df_filtrado.columns:
-                                df_filtrado.at[idx, likes_col] = 0
-                            if dislikes_col in df_filtrado.columns:
-                                df_filtrado.at[idx, dislikes_col] = 0
-                            comentarios_limpiados_location_b += 1                        
-                        
-                        # Si pasa ambas condiciones, marcar como comentario válido
-                        elif location_limpia in localizaciones_permitidas_b or location_limpia == '':
-                            comentarios_validos = True
-            
-            # Si no quedan comentarios válidos para La Voz, eliminar la línea
-            if not comentarios_validos:
-                filas_eliminadas.append(idx)
+    patron_comun = compilar_patrones_excluidos(reglas['patrones_excluidos_comunes'])
+    mascara_comun = textos.str.contains(patron_comun) if patron_comun else pd.Series(False, index=comments.index)
+    
+    regiones = pd.Series(BITS_REGION['general'], index=comments.index, dtype='int64')
     
-    # Eliminar filas marcadas
-    df_filtrado = df_filtrado.drop(filas_eliminadas)
+    for region, regla in reglas['regiones'].items():
+        # Condición 1: contiene "desde A CORUÑA" y similares
+        mascara_patron = mascara_comun.copy()
+        patron_region = compilar_patrones_excluidos(regla['patrones_excluidos'])
+        if patron_region:
+            mascara_patron |= textos.str.contains(patron_region)
+        mascara_patron &= es_fuente
+        # Condición 2: location no permitida (solo si no se descartó ya por la condición 1)
+        mascara_location = es_fuente & ~mascara_patron & ~location_limpia.isin(regla['localizaciones_permitidas'])
+        
+        pertenece = ~(mascara_patron | mascara_location)
+        regiones |= pertenece.astype('int64') * regla['bit']
+        
+        filas_eliminadas = _articulos_sin_comentarios_validos(articles, comments[pertenece], reglas['fuente'])
+        print(f"   📍 {regla['descripcion']}:")
+        print(f"      📊 Comentarios descartados por location no válida: {int(mascara_location.sum())}")
+        print(f"      📊 Comentarios descartados por 'desde A CORUÑA y similares': {int(mascara_patron.sum())}")
+        print(f"      📊 Artículos eliminados por no tener comentarios válidos: {len(filas_eliminadas)}")
     
-    print(f"   📊 Comentarios limpiados por location no válida: {comentarios_limpiados_location_b}")
-    print(f"   📊 Comentarios limpiados por 'desde A CORUÑA y similares': {comentarios_limpiados_coruna_b}")
-    print(f"   📊 Filas eliminadas por no tener comentarios válidos: {len(filas_eliminadas)}")
-    return df_filtrado.reset_index(drop=True)
+    return regiones
 
-def aplicar_filtros_esenciales(archivo_entrada="filtered_data.csv"):
-    """
-    Aplica SOLO los filtros esenciales que usa la aplicación Streamlit.
-    Genera únicamente filtro1_localizacion.csv y filtro6_marin.csv
+def comentarios_de_region(comments, region):
+    """Comentarios cuyo bit de región está activo"""
+    return comments[(comments['regiones'] & BITS_REGION[region]) != 0]
+
+def articulos_de_region(articles, comments_region, fuente=REGLAS_LOCALIZACION['fuente']):
+    """Artículos visibles en una región: los que no son de la fuente filtrada o conservan algún comentario"""
+    mascara = (articles['source'] != fuente) | articles['article_id'].isin(comments_region['article_id'])
+    return articles[mascara]
+
+def exportar_base_datos(tablas, archivo_salida=ARCHIVO_BASE_DATOS):
     """
-    ruta_entrada = os.path.join(CARPETA_ENTRADA, archivo_entrada)
-    
-    print(f"🚀 FILTRADOR ESENCIAL - SOLO CSVs UTILIZADOS")
-    print(f"   • Archivo entrada: {ruta_entrada}")
-    print(f"   • Carpeta salida: {CARPETA_SALIDA}")
+    Guarda las tablas de artículos y comentarios en una base SQLite embebida que
+    usa el motor de consultas de la app, con su índice de texto completo.
+    Se escribe en un archivo temporal y se sustituye al final para no dejar
+    nunca una base a medias.
     
-    # Verificar que existe el archivo de entrada
-    if not os.path.exists(ruta_entrada):
-        raise FileNotFoundError(f"❌ No se encontró el archivo: {ruta_entrada}")
+    Args:
+        tablas: dict {nombre_tabla: DataFrame}
+        archivo_salida: nombre del archivo .db dentro de CARPETA_SALIDA (o ruta absoluta)
+        
+    Returns:
+        str: ruta de la base de datos generada
+    """
+    ruta_bd = os.path.join(CARPETA_SALIDA, archivo_salida)
+    ruta_temporal = ruta_bd + ".tmp"
+    if os.path.exists(ruta_temporal):
+        os.remove(ruta_temporal)
     
-    print(f"\n📖 Cargando datos...")
-    df_original = pd.read_csv(ruta_entrada)
-    filas_originales = len(df_original)
+    with closing(sqlite3.connect(ruta_temporal)) as conexion:
+        for nombre, df in tablas.items():
+            df.to_sql(nombre, conexion, index=False)
+            conexion.execute(f"CREATE INDEX idx_{nombre}_article_id ON {nombre} (article_id)")
+        conexion.execute("CREATE INDEX idx_articles_date ON articles (date)")
+        crear_indice_texto(conexion)
     
-    print(f"✅ Archivo cargado: {filas_originales:,} filas, {len(df_original.columns)} columnas")
+    os.replace(ruta_temporal, ruta_bd)
+    return ruta_bd
+
+def normalizar_y_calcular_regiones(df_original):
+    """
+    Normaliza los datos filtrados en las tablas articles y comments y calcula la
+    máscara de regiones de cada comentario, sin leer ni escribir archivos.
     
+    Returns:
+        tuple: (articles, comments)
+    """
     # Mostrar distribución inicial por fuente
     if 'source' in df_original.columns:
         print(f"\n📰 DISTRIBUCIÓN INICIAL POR FUENTE:")
@@ -225,63 +219,100 @@ def aplicar_filtros_esenciales(archivo_entrada="filtered_data.csv"):
         for fuente, cantidad in distribucion_inicial.items():
             print(f"   • {fuente}: {cantidad:,} filas")
     
-    # =================== FILTRO 1: LOCALIZACIÓN VOZ GALICIA ===================
+    # =================== NORMALIZACIÓN: ARTICLES + COMMENTS ===================
     print(f"\n" + "="*60)
-    print("FILTRO 1: LOCALIZACIÓN PARA LA VOZ DE GALICIA (O Morrazo/Pontevedra)")
+    print("NORMALIZACIÓN: TABLA DE ARTÍCULOS + TABLA LARGA DE COMENTARIOS")
     print("="*60)
     
-    df_filtro1 = primer_filtro_localizacion_voz_galicia(df_original)
-    archivo_filtro1 = "filtro1_localizacion.csv"
-    ruta_filtro1 = os.path.join(CARPETA_SALIDA, archivo_filtro1)
-    df_filtro1.to_csv(ruta_filtro1, index=False)
+    articles, comments = normalizar_comentarios(df_original)
     
-    print(f"✅ Filtro 1 completado:")
-    print(f"   • Filas originales: {filas_originales:,}")
-    print(f"   • Filas después del filtro: {len(df_filtro1):,}")
-    print(f"   • Filas eliminadas: {filas_originales - len(df_filtro1):,}")
-    print(f"   • Archivo guardado: {archivo_filtro1}")
+    print(f"✅ Normalización completada:")
+    print(f"   • Artículos: {len(articles):,} ({len(articles.columns)} columnas)")
+    print(f"   • Comentarios: {len(comments):,}")
     
-    # =================== FILTRO 6: LOCALIZACIÓN: SOLO MARIN ===================
+    # =================== REGIONES: MÁSCARA DE BITS POR COMENTARIO ===================
     print(f"\n" + "="*60)
-    print("FILTRO 6: LOCALIZACIÓN ESPECÍFICA DE MARÍN")
+    print("REGIONES: FILTROS DE LOCALIZACIÓN PARA LA VOZ DE GALICIA")
     print("="*60)
     
-    df_filtro6 = segundo_filtro_localizacion_voz_galicia(df_original)
-    archivo_filtro6 = "filtro6_marin.csv"
-    ruta_filtro6 = os.path.join(CARPETA_SALIDA, archivo_filtro6)
-    df_filtro6.to_csv(ruta_filtro6, index=False)
+    comments['regiones'] = calcular_regiones(articles, comments)
     
-    print(f"✅ Filtro 6 completado:")
-    print(f"   • Filas originales: {filas_originales:,}")
-    print(f"   • Filas después del filtro: {len(df_filtro6):,}")
-    print(f"   • Filas eliminadas: {filas_originales - len(df_filtro6):,}")
-    print(f"   • Archivo guardado: {archivo_filtro6}")
+    print(f"✅ Regiones calculadas:")
+    for region in BITS_REGION:
+        print(f"   • {region}: {len(comentarios_de_region(comments, region)):,} comentarios de {len(comments):,}")
+    
+    return articles, comments
+
+def mostrar_resumen_regiones(filas_originales, articles, comments):
+    """Muestra las estadísticas finales por región y fuente"""
+    articles_por_region = {
+        regla['descripcion']: articulos_de_region(articles, comentarios_de_region(comments, region))
+        for region, regla in REGLAS_LOCALIZACION['regiones'].items()
+    }
     
-    # =================== RESUMEN FINAL ===================
     print(f"\n" + "="*60)
     print("RESUMEN FINAL")
     print("="*60)
     
     print(f"📊 ESTADÍSTICAS FINALES:")
-    print(f"   • Archivo original: {filas_originales:,} filas")
-    print(f"   • Filtro 1 (O Morrazo/Pontevedra): {len(df_filtro1):,} filas ({len(df_filtro1)/filas_originales*100:.1f}%)")
-    print(f"   • Filtro 6 (Solo Marín): {len(df_filtro6):,} filas ({len(df_filtro6)/filas_originales*100:.1f}%)")
-    
-    # Mostrar distribución final por fuente para cada filtro
-    for i, (df_filtrado, nombre_filtro) in enumerate([
-        (df_filtro1, "Filtro 1 (O Morrazo/Pontevedra)"),
-        (df_filtro6, "Filtro 6 (Solo Marín)")
-    ], 1):
+    print(f"   • Archivo original: {filas_originales:,} artículos, {len(comments):,} comentarios")
+    for nombre_filtro, df_filtrado in articles_por_region.items():
+        print(f"   • {nombre_filtro}: {len(df_filtrado):,} artículos ({len(df_filtrado)/filas_originales*100:.1f}%)")
+    
+    # Mostrar distribución final por fuente para cada región
+    for nombre_filtro, df_filtrado in articles_por_region.items():
         if 'source' in df_filtrado.columns and len(df_filtrado) > 0:
             print(f"\n📰 DISTRIBUCIÓN {nombre_filtro.upper()}:")
             distribucion = df_filtrado['source'].value_counts()
             for fuente, cantidad in distribucion.items():
                 porcentaje = cantidad/len(df_filtrado)*100
-                print(f"   • {fuente}: {cantidad:,} filas ({porcentaje:.1f}%)")
+                print(f"   • {fuente}: {cantidad:,} artículos ({porcentaje:.1f}%)")
+
+def aplicar_filtros_esenciales(archivo_entrada="filtered_data.csv"):
+    """
+    Aplica SOLO los filtros esenciales que usa la aplicación Streamlit.
+    Normaliza filtered_data.csv en articles.csv + comments.csv. Las regiones
+    (O Morrazo/Pontevedra, Marín) no se guardan como copias: cada comentario lleva
+    su máscara de bits en la columna regiones.
+    """
+    ruta_entrada = os.path.join(CARPETA_ENTRADA, archivo_entrada)
+    
+    print(f"🚀 FILTRADOR ESENCIAL - SOLO CSVs UTILIZADOS")
+    print(f"   • Archivo entrada: {ruta_entrada}")
+    print(f"   • Carpeta salida: {CARPETA_SALIDA}")
+    
+    # Verificar que existe el archivo de entrada
+    if not os.path.exists(ruta_entrada):
+        raise FileNotFoundError(f"❌ No se encontró el archivo: {ruta_entrada}")
+    
+    print(f"\n📖 Cargando datos...")
+    df_original = pd.read_csv(ruta_entrada)
+    filas_originales = len(df_original)
+    
+    print(f"✅ Archivo cargado: {filas_originales:,} filas, {len(df_original.columns)} columnas")
+    
+    articles, comments = normalizar_y_calcular_regiones(df_original)
+    
+    ruta_articles = os.path.join(CARPETA_SALIDA, "articles.csv")
+    ruta_comments = os.path.join(CARPETA_SALIDA, "comments.csv")
+    articles.to_csv(ruta_articles, index=False)
+    comments.to_csv(ruta_comments, index=False)
+    print(f"   • Archivos guardados: articles.csv, comments.csv")
+    
+    # =================== BASE DE DATOS EMBEBIDA ===================
+    ruta_bd = exportar_base_datos({
+        'articles': articles,
+        'comments': comments
+    })
+    print(f"\n🗄️ Base de datos de consultas guardada: {os.path.basename(ruta_bd)}")
+    
+    # =================== RESUMEN FINAL ===================
+    mostrar_resumen_regiones(filas_originales, articles, comments)
     
     return {
-        'filtro1': ruta_filtro1,
-        'filtro6': ruta_filtro6
+        'articles': ruta_articles,
+        'comments': ruta_comments,
+        'base_datos': ruta_bd
     }
 
 def verificar_filtros():
@@ -289,8 +320,8 @@ def verificar_filtros():
     Función auxiliar para verificar los resultados de los filtros esenciales.
     """
     archivos_verificar = [
-        "filtro1_localizacion.csv",
-        "filtro6_marin.csv"
+        "articles.csv",
+        "comments.csv"
     ]
     
     print(f"\n🔍 VERIFICACIÓN DE FILTROS ESENCIALES:")
@@ -307,8 +338,13 @@ def verificar_filtros():
             if 'source' in df.columns:
                 print(f"   • Fuentes: {df['source'].value_counts().to_dict()}")
                 
-            if 'n_comments' in df.columns:
-                print(f"   • Comentarios (min/max/media): {df['n_comments'].min()}/{df['n_comments'].max()}/{df['n_comments'].mean():.1f}")
+            if 'article_id' in df.columns and 'text' in df.columns:
+                por_articulo = df.groupby('article_id').size()
+                print(f"   • Comentarios por artículo (min/max/media): {por_articulo.min()}/{por_articulo.max()}/{por_articulo.mean():.1f}")
+            
+            if 'regiones' in df.columns:
+                for region, bit in BITS_REGION.items():
+                    print(f"   • Comentarios en {region}: {int(((df['regiones'] & bit) != 0).sum()):,}")
         else:
             print(f"❌ {archivo}: No encontrado")
 
@@ -326,8 +362,9 @@ if __name__ == "__main__":
         print(f"\n🎉 ¡PROCESO COMPLETADO!")
         print(f"📁 Archivos generados en: {CARPETA_SALIDA}")
         print(f"📋 Archivos creados (solo los que usa Streamlit):")
-        print(f"   • filtro1_localizacion.csv")
-        print(f"   • filtro6_marin.csv")
+        print(f"   • articles.csv")
+        print(f"   • comments.csv")
+        print(f"   • {ARCHIVO_BASE_DATOS}")
         
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
\ No newline at end of file
+        print(f"❌ Error: {str(e)}")
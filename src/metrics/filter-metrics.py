@@ -0,0 +1,160 @@
+import pandas as pd
+import os
+import re
+import glob
+
+# Definir rutas (relativas a este archivo, para poder importarlo desde main.py
+# sin depender del directorio de trabajo)
+ruta_base = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data"))
+carpeta_entrada = os.path.join(ruta_base, "raw", "clean-metrics")
+carpeta_totales = os.path.join(ruta_base, "processed", "metrics-data")
+carpeta_politicos = os.path.join(ruta_base, "processed", "metrics-advanced")
+
+# Columnas del archivo de visualizaciones totales
+columnas_importantes = ["source", "title", "link", "date", "n_visualizations", "summary", "year_month", "year"]
+
+# Términos de filtrado político
+terminos_politicos = [
+    "PP", "PSOE", "BNG",
+    "Manuel Pazos",
+    "Ramallo", "María Ramallo",
+    "Lucía Santos"
+]
+
+def _patron_palabras(palabras):
+    """Alternativa sin distinguir mayúsculas con las palabras clave escapadas"""
+    return '(?i:' + '|'.join(map(re.escape, palabras)) + ')'
+
+# Una sola expresión para todos los términos (búsqueda case-insensitive). Los
+# patrones van como texto con las opciones en línea: str.contains no acepta
+# patrones compilados sobre columnas de texto pyarrow (ver data_schema.py)
+patron_politico = _patron_palabras(terminos_politicos)
+
+# Menciones por entidad de las páginas de métricas de la app. Los bits son los
+# de ENTIDADES en streamlit/utils/political_comment_processors.py, para que la
+# app filtre con las mismas claves; los patrones son los de las métricas.
+ENTIDADES_METRICAS = {
+    'partidos_general': {'bit': 1, 'patron': _patron_palabras(["pp", "psoe", "bng"])},
+    'psoe': {'bit': 2, 'patron': _patron_palabras(["psoe", "partido socialista"])},
+    'pp': {'bit': 4, 'patron': 'PP|' + _patron_palabras(["partido popular"])},
+    'bng': {'bit': 8, 'patron': _patron_palabras(["bng"]) + '|Bloque '},
+    'politicos_general': {'bit': 16, 'patron': _patron_palabras(["pazos", "ramallo", "santos"])},
+    'manuel_pazos': {'bit': 32, 'patron': 'Manuel Pazos'},
+    'maria_ramallo': {'bit': 64, 'patron': 'Ramallo'},
+    'lucia_santos': {'bit': 128, 'patron': 'Lucía Santos'}
+}
+
+def menciona(df, patron):
+    """Máscara de las filas cuyo título o summary contienen el patrón"""
+    return df['title'].str.contains(patron, na=False) | df['summary'].str.contains(patron, na=False)
+
+def procesar_visualizaciones(df):
+    """
+    Ordena todos los artículos por visualizaciones y añade las columnas de tiempo,
+    sin leer ni escribir archivos
+    """
+    # Validar columnas necesarias
+    if "date" not in df.columns or "n_visualizations" not in df.columns:
+        raise ValueError("Faltan columnas requeridas: 'date' o 'n_visualizations'")
+
+    df = df.copy()
+
+    # Convertir fecha
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+
+    # Crear columnas de tiempo
+    df["year_month"] = df["date"].dt.to_period("M").astype(str)
+    df["year"] = df["date"].dt.year
+
+    # Ordenar todos los artículos por visualizaciones descendente
+    df_totales = df.sort_values("n_visualizations", ascending=False)
+
+    # Seleccionar columnas relevantes
+    return df_totales[columnas_importantes]
+
+def procesar_metricas(df):
+    """
+    Procesa las métricas en una sola pasada, sin leer ni escribir archivos:
+    columnas de tiempo y orden por visualizaciones, filtro político y columna
+    entidades (máscara de bits de ENTIDADES_METRICAS) de los artículos políticos
+
+    Returns:
+        tuple: (DataFrame de visualizaciones totales, DataFrame de artículos políticos)
+    """
+    df_totales = procesar_visualizaciones(df)
+
+    df_politicos = df_totales[menciona(df_totales, patron_politico)].copy()
+    entidades = pd.Series(0, index=df_politicos.index, dtype='int64')
+    for entidad in ENTIDADES_METRICAS.values():
+        entidades |= menciona(df_politicos, entidad['patron']).astype('int64') * entidad['bit']
+    df_politicos['entidades'] = entidades
+
+    return df_totales, df_politicos
+
+def resumir_filtrado(total_original, total_filtrado):
+    """Estadísticas del filtro político"""
+    return {
+        'original': total_original,
+        'filtrado': total_filtrado,
+        'porcentaje': (total_filtrado / total_original * 100) if total_original > 0 else 0
+    }
+
+def mostrar_resumen_visualizaciones(df_totales):
+    """Muestra el resumen del archivo de totales y el artículo más visto de cada año"""
+    print(f"\n📊 RESUMEN DE ARCHIVO GENERADO:")
+    print(f"📁 Carpeta: {carpeta_totales}")
+    print(f"📄 visualizaciones_totales.csv - {len(df_totales)} artículos ordenados por popularidad")
+
+    # Mostrar preview de artículos más vistos por año
+    print(f"\n🔥 TOP ARTÍCULOS POR AÑO:")
+    for year in sorted(df_totales['year'].dropna().unique(), reverse=True):
+        top_article = df_totales[df_totales['year'] == year].nlargest(1, 'n_visualizations').iloc[0]
+        print(f"   {int(year)}: {top_article['n_visualizations']:,} visualizaciones - {top_article['title'][:50]}...")
+
+def mostrar_resumen_politico(df_politicos, stats):
+    """Muestra el resumen del filtro político y los artículos políticos más vistos"""
+    print(f"\n🎯 FILTRO POLÍTICO APLICADO")
+    print(f"📁 Carpeta: {carpeta_politicos}")
+    print(f"🔍 Términos buscados: {', '.join(terminos_politicos)}")
+    print(f"📄 politicos_totales.csv - {stats['original']:,} → {stats['filtrado']:,} artículos ({stats['porcentaje']:.1f}%)")
+
+    if len(df_politicos):
+        print(f"\n🔥 MUESTRA DE ARTÍCULOS POLÍTICOS ENCONTRADOS:")
+        for i, (_, row) in enumerate(df_politicos.head(5).iterrows()):
+            print(f"   {i+1}. {row['n_visualizations']:,} visualizaciones")
+            print(f"      📰 {row['title']}")
+            print(f"      📅 {row['date']} | 🏛️ {row['source']}")
+
+            # Mostrar qué términos encontró
+            texto = f"{row['title']} {row['summary']}".lower()
+            terminos_encontrados = [termino for termino in terminos_politicos if termino.lower() in texto]
+            print(f"      🎯 Términos: {', '.join(terminos_encontrados)}")
+            print()
+
+def generar_metricas():
+    """
+    Lee una vez el CSV de métricas de clean-metrics/ y genera
+    visualizaciones_totales.csv y politicos_totales.csv
+    """
+    # Buscar archivos CSV
+    archivos_csv = sorted(glob.glob(os.path.join(carpeta_entrada, "*.csv")))
+    if not archivos_csv:
+        raise FileNotFoundError("No se encontraron archivos CSV en la carpeta")
+
+    df_totales, df_politicos = procesar_metricas(pd.read_csv(archivos_csv[0]))
+
+    # Guardar
+    for carpeta, archivo, df in [
+        (carpeta_totales, "visualizaciones_totales.csv", df_totales),
+        (carpeta_politicos, "politicos_totales.csv", df_politicos)
+    ]:
+        os.makedirs(carpeta, exist_ok=True)
+        df.to_csv(os.path.join(carpeta, archivo), index=False)
+        print(f"✅ Archivo generado: {os.path.join(carpeta, archivo)}")
+
+    mostrar_resumen_visualizaciones(df_totales)
+    mostrar_resumen_politico(df_politicos, resumir_filtrado(len(df_totales), len(df_politicos)))
+
+if __name__ == "__main__":
+    generar_metricas()
+    print(f"✅ Procesamiento de métricas completado exitosamente!")
@@ -21,6 +21,7 @@ os.environ["STREAMLIT_USE_WATCHMAN"] = "false"
 # Importar módulos utils
 try:
     from utils.data_loaders import cargar_metricas, cargar_datos_comentarios, cargar_datos_comentarios_morrazo, cargar_datos_comentarios_marin
+    from utils.query_engine import version_datos
     from utils.data_processors import (
         procesar_articulos_polemicos, 
         procesar_articulos_polemicos_UNIFICADO,  # 🔧 FUNCIÓN UNIFICADA
@@ -42,6 +43,7 @@ try:
         procesar_comentarios_politicos_impopulares,
         procesar_articulos_politicos_polemicos
     )
+    from utils.result_cache import memorizar_calculo
     from utils.comment_sentiment_processors import (
         extraer_comentarios_para_analisis,
         resumir_sentimientos_por_articulo
@@ -60,7 +62,9 @@ try:
         mostrar_seccion_comentarios_temporal,
         mostrar_tabla_comentarios_con_sentimientos,
         mostrar_explicacion_parametros,
-        mostrar_tabla_articulos_agregados_con_sentimientos
+        mostrar_tabla_articulos_agregados_con_sentimientos,
+        pestanas_perezosas,  # Solo se calcula la pestaña seleccionada
+        mostrar_exploracion_completa  # Tablas paginadas sin tope de top-20
     )
     # 🎨 NUEVO: Importar módulo CSS
     from utils.css_styles import (
@@ -179,6 +183,11 @@ def get_analizador_global():
     return st.session_state.analizador_global
 
 
+def _analisis_completo(resultado):
+    """Solo se guardan en caché los análisis que terminaron con datos y reporte"""
+    return len(resultado[0]) > 0 and resultado[1] is not None
+
+@memorizar_calculo("sentimientos_por_articulo", es_cacheable=_analisis_completo)
 def procesar_comentarios_con_sentimientos_directo(df, analizador, top_n=20, filtro_popularidad=None):
     """
     🔧 VERSIÓN UNIFICADA CORREGIDA: Usa exactamente la misma lógica que la función sin analizador
@@ -198,7 +207,9 @@ def procesar_comentarios_con_sentimientos_directo(df, analizador, top_n=20, filt
             return pd.DataFrame(), None, pd.DataFrame()
         
         # Extraer comentarios SOLO de estos artículos polémicos
-        df_comentarios_completos = extraer_comentarios_para_analisis(df_articulos_polemicos)
+        df_comentarios_completos = extraer_comentarios_para_analisis(
+            df[df['article_id'].isin(df_articulos_polemicos['article_id'])]
+        )
         
         # Para artículos polémicos, usar TODOS los comentarios de los artículos seleccionados
         df_comentarios_filtrados = df_comentarios_completos.copy()
@@ -258,6 +269,7 @@ def procesar_comentarios_con_sentimientos_directo(df, analizador, top_n=20, filt
         st.error(f"❌ Error aplicando análisis de sentimientos: {e}")
         return df_comentarios_filtrados, None, df_comentarios_completos
             
+@memorizar_calculo("sentimientos_individuales", es_cacheable=_analisis_completo)
 def procesar_comentarios_individuales_con_sentimientos(df, analizador, top_n=20, filtro_popularidad=None):
     """
     NUEVA FUNCIÓN: Para comentarios individuales con análisis de sentimientos completo
@@ -570,14 +582,14 @@ def mostrar_analisis_comentarios_con_filtros(datos_comentarios, titulo_ubicacion
             st.error(f"❌ Error aplicando filtros temporales: {e}")
             return
         
-        tab1, tab2, tab3 = st.tabs(["🔥 Artículos polémicos", "👍 Comentarios populares", "👎 Comentarios impopulares"])
+        tab1, tab2, tab3, tab4 = pestanas_perezosas(["🔥 Artículos polémicos", "👍 Comentarios populares", "👎 Comentarios impopulares", "📚 Explorar todo"], key=f"seccion_{ubicacion_key}_general")
         
-        with tab1:
+        if tab1:
             st.subheader(f"🔥 Artículos más polémicos - {titulo_ubicacion}")
             
-            subtab1, subtab2, subtab3 = st.tabs(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"])
+            subtab1, subtab2, subtab3 = pestanas_perezosas(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"], key=f"periodo_{ubicacion_key}_general_polemicos")
             
-            with subtab1:
+            if subtab1:
                 if mostrar_sentimientos and analizador is not None:
                     df_resumido, reporte, df_comentarios_originales = procesar_comentarios_con_sentimientos_directo(
                         comentarios_mayo_2025, analizador, top_n=20, filtro_popularidad=None
@@ -594,10 +606,11 @@ def mostrar_analisis_comentarios_con_filtros(datos_comentarios, titulo_ubicacion
                     mostrar_tabla_articulos_polemicos(
                         datos_polemicos, 
                         f"mayo de 2025 ({titulo_ubicacion})",
-                        key_suffix=f"polemicos_{ubicacion_key}_mes"
+                        key_suffix=f"polemicos_{ubicacion_key}_mes",
+                        df_comentarios=comentarios_mayo_2025
                     )
             
-            with subtab2:
+            if subtab2:
                 if mostrar_sentimientos and analizador is not None:
                     df_resumido, reporte, df_comentarios_originales = procesar_comentarios_con_sentimientos_directo(
                         comentarios_anio_2025, analizador, top_n=20, filtro_popularidad=None
@@ -614,10 +627,11 @@ def mostrar_analisis_comentarios_con_filtros(datos_comentarios, titulo_ubicacion
                     mostrar_tabla_articulos_polemicos(
                         datos_polemicos, 
                         f"año 2025 ({titulo_ubicacion})",
-                        key_suffix=f"polemicos_{ubicacion_key}_anio"
+                        key_suffix=f"polemicos_{ubicacion_key}_anio",
+                        df_comentarios=comentarios_anio_2025
                     )
             
-            with subtab3:
+            if subtab3:
                 if mostrar_sentimientos and analizador is not None:
                     df_resumido, reporte, df_comentarios_originales = procesar_comentarios_con_sentimientos_directo(
                         comentarios_historico, analizador, top_n=20, filtro_popularidad=None
@@ -634,15 +648,16 @@ def mostrar_analisis_comentarios_con_filtros(datos_comentarios, titulo_ubicacion
                     mostrar_tabla_articulos_polemicos(
                         datos_polemicos, 
                         f"histórico ({titulo_ubicacion})",
-                        key_suffix=f"polemicos_{ubicacion_key}_total"
+                        key_suffix=f"polemicos_{ubicacion_key}_total",
+                        df_comentarios=comentarios_historico
                     )
         
-        with tab2:
+        if tab2:
             st.subheader(f"👍 Comentarios más populares - {titulo_ubicacion}")
             
-            subtab1, subtab2, subtab3 = st.tabs(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"])
+            subtab1, subtab2, subtab3 = pestanas_perezosas(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"], key=f"periodo_{ubicacion_key}_general_populares")
             
-            with subtab1:
+            if subtab1:
                 if mostrar_sentimientos and analizador is not None:
                     df_comentarios_analizados, reporte = procesar_comentarios_individuales_con_sentimientos(
                         comentarios_mayo_2025, analizador, top_n=20, filtro_popularidad='popular'
@@ -664,7 +679,7 @@ def mostrar_analisis_comentarios_con_filtros(datos_comentarios, titulo_ubicacion
                         f"populares_{ubicacion_key}_mes"
                     )
             
-            with subtab2:
+            if subtab2:
                 if mostrar_sentimientos and analizador is not None:
                     df_comentarios_analizados, reporte = procesar_comentarios_individuales_con_sentimientos(
                         comentarios_anio_2025, analizador, top_n=20, filtro_popularidad='popular'
@@ -686,7 +701,7 @@ def mostrar_analisis_comentarios_con_filtros(datos_comentarios, titulo_ubicacion
                         f"populares_{ubicacion_key}_anio"
                     )
             
-            with subtab3:
+            if subtab3:
                 if mostrar_sentimientos and analizador is not None:
                     df_comentarios_analizados, reporte = procesar_comentarios_individuales_con_sentimientos(
                         comentarios_historico, analizador, top_n=20, filtro_popularidad='popular'
@@ -708,12 +723,12 @@ def mostrar_analisis_comentarios_con_filtros(datos_comentarios, titulo_ubicacion
                         f"populares_{ubicacion_key}_total"
                     )
         
-        with tab3:
+        if tab3:
             st.subheader(f"👎 Comentarios más impopulares - {titulo_ubicacion}")
             
-            subtab1, subtab2, subtab3 = st.tabs(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"])
+            subtab1, subtab2, subtab3 = pestanas_perezosas(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"], key=f"periodo_{ubicacion_key}_general_impopulares")
             
-            with subtab1:
+            if subtab1:
                 if mostrar_sentimientos and analizador is not None:
                     df_comentarios_analizados, reporte = procesar_comentarios_individuales_con_sentimientos(
                         comentarios_mayo_2025, analizador, top_n=20, filtro_popularidad='impopular'
@@ -735,7 +750,7 @@ def mostrar_analisis_comentarios_con_filtros(datos_comentarios, titulo_ubicacion
                         f"impopulares_{ubicacion_key}_mes"
                     )
             
-            with subtab2:
+            if subtab2:
                 if mostrar_sentimientos and analizador is not None:
                     df_comentarios_analizados, reporte = procesar_comentarios_individuales_con_sentimientos(
                         comentarios_anio_2025, analizador, top_n=20, filtro_popularidad='impopular'
@@ -757,7 +772,7 @@ def mostrar_analisis_comentarios_con_filtros(datos_comentarios, titulo_ubicacion
                         f"impopulares_{ubicacion_key}_anio"
                     )
             
-            with subtab3:
+            if subtab3:
                 if mostrar_sentimientos and analizador is not None:
                     df_comentarios_analizados, reporte = procesar_comentarios_individuales_con_sentimientos(
                         comentarios_historico, analizador, top_n=20, filtro_popularidad='impopular'
@@ -778,6 +793,9 @@ def mostrar_analisis_comentarios_con_filtros(datos_comentarios, titulo_ubicacion
                         lambda df, titulo, key_suffix, table_height=600: mostrar_tabla_comentarios(df, titulo, es_popular=False, key_suffix=key_suffix, table_height=table_height),
                         f"impopulares_{ubicacion_key}_total"
                     )
+
+        if tab4:
+            mostrar_exploracion_completa(comentarios_historico, titulo_ubicacion, f"explorar_{ubicacion_key}_general")
     
     elif tipo_analisis_comentarios == "🗳️ Comentarios sobre Partidos Políticos":
         filtros_partidos = {
@@ -802,7 +820,7 @@ def mostrar_analisis_comentarios_con_filtros(datos_comentarios, titulo_ubicacion
                     st.warning(f"⚠️ No se encontraron comentarios sobre {partido_comentarios} en {titulo_ubicacion}")
                     return
                 
-                st.success(f"✅ Encontrados {len(datos_filtrados)} artículos con comentarios sobre {partido_comentarios}")
+                st.success(f"✅ Encontrados {datos_filtrados['article_id'].nunique()} artículos con comentarios sobre {partido_comentarios}")
         except Exception as e:
             st.error(f"❌ Error filtrando comentarios: {e}")
             return
@@ -813,17 +831,17 @@ def mostrar_analisis_comentarios_con_filtros(datos_comentarios, titulo_ubicacion
             st.error(f"❌ Error aplicando filtros temporales: {e}")
             return
         
-        tab1, tab2, tab3 = st.tabs(["🔥 Artículos polémicos", "👍 Comentarios populares", "👎 Comentarios impopulares"])
+        tab1, tab2, tab3, tab4 = pestanas_perezosas(["🔥 Artículos polémicos", "👍 Comentarios populares", "👎 Comentarios impopulares", "📚 Explorar todo"], key=f"seccion_{ubicacion_key}_partidos")
         
-        with tab1:
+        if tab1:
             st.subheader(f"🔥 Artículos más polémicos - {titulo_ubicacion} + {partido_comentarios}")
             
-            subtab1, subtab2, subtab3 = st.tabs(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"])
+            subtab1, subtab2, subtab3 = pestanas_perezosas(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"], key=f"periodo_{ubicacion_key}_partidos_polemicos")
             
             for subtab, datos, periodo in zip([subtab1, subtab2, subtab3], 
                                             [comentarios_mayo_2025, comentarios_anio_2025, comentarios_historico],
                                             ["Mayo 2025", "Año 2025", "Histórico"]):
-                with subtab:
+                if subtab:
                     if mostrar_sentimientos and analizador is not None:
                         # ✅ USAR FUNCIÓN CON SENTIMIENTOS
                         df_resumido, reporte, df_comentarios_originales = procesar_comentarios_con_sentimientos_directo(
@@ -849,15 +867,15 @@ def mostrar_analisis_comentarios_con_filtros(datos_comentarios, titulo_ubicacion
                             table_height=300
                         )
         
-        with tab2:
+        if tab2:
             st.subheader(f"👍 Comentarios más populares sobre {partido_comentarios}")
             
-            subtab1, subtab2, subtab3 = st.tabs(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"])
+            subtab1, subtab2, subtab3 = pestanas_perezosas(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"], key=f"periodo_{ubicacion_key}_partidos_populares")
             
             for subtab, datos, periodo in zip([subtab1, subtab2, subtab3], 
                                             [comentarios_mayo_2025, comentarios_anio_2025, comentarios_historico],
                                             ["mayo 2025", "año 2025", "histórico"]):
-                with subtab:
+                if subtab:
                     if mostrar_sentimientos and analizador is not None:
                         df_comentarios_analizados, reporte = procesar_comentarios_individuales_con_sentimientos(
                             datos, analizador, top_n=20, filtro_popularidad='popular'
@@ -880,15 +898,15 @@ def mostrar_analisis_comentarios_con_filtros(datos_comentarios, titulo_ubicacion
                             table_height=300
                         )
         
-        with tab3:
+        if tab3:
             st.subheader(f"👎 Comentarios más impopulares sobre {partido_comentarios}")
             
-            subtab1, subtab2, subtab3 = st.tabs(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"])
+            subtab1, subtab2, subtab3 = pestanas_perezosas(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"], key=f"periodo_{ubicacion_key}_partidos_impopulares")
             
             for subtab, datos, periodo in zip([subtab1, subtab2, subtab3], 
                                             [comentarios_mayo_2025, comentarios_anio_2025, comentarios_historico],
                                             ["mayo 2025", "año 2025", "histórico"]):
-                with subtab:
+                if subtab:
                     if mostrar_sentimientos and analizador is not None:
                         df_comentarios_analizados, reporte = procesar_comentarios_individuales_con_sentimientos(
                             datos, analizador, top_n=20, filtro_popularidad='impopular'
@@ -910,6 +928,9 @@ def mostrar_analisis_comentarios_con_filtros(datos_comentarios, titulo_ubicacion
                             f"impopulares_{ubicacion_key}_{partido_comentarios.lower().replace(' ', '_')}_{periodo.replace(' ', '_')}",
                             table_height=300
                         )
+
+        if tab4:
+            mostrar_exploracion_completa(comentarios_historico, f"{titulo_ubicacion} + {partido_comentarios}", f"explorar_{ubicacion_key}_partidos")
     
     elif tipo_analisis_comentarios == "👥 Comentarios sobre Políticos Locales":
         filtros_politicos = {
@@ -934,7 +955,7 @@ def mostrar_analisis_comentarios_con_filtros(datos_comentarios, titulo_ubicacion
                     st.warning(f"⚠️ No se encontraron comentarios sobre {politico_comentarios} en {titulo_ubicacion}")
                     return
                 
-                st.success(f"✅ Encontrados {len(datos_filtrados)} artículos con comentarios sobre {politico_comentarios}")
+                st.success(f"✅ Encontrados {datos_filtrados['article_id'].nunique()} artículos con comentarios sobre {politico_comentarios}")
         except Exception as e:
             st.error(f"❌ Error filtrando comentarios: {e}")
             return
@@ -946,17 +967,17 @@ def mostrar_analisis_comentarios_con_filtros(datos_comentarios, titulo_ubicacion
             return
         
         # Usar la misma estructura que partidos pero con políticos
-        tab1, tab2, tab3 = st.tabs(["🔥 Artículos polémicos", "👍 Comentarios populares", "👎 Comentarios impopulares"])
+        tab1, tab2, tab3, tab4 = pestanas_perezosas(["🔥 Artículos polémicos", "👍 Comentarios populares", "👎 Comentarios impopulares", "📚 Explorar todo"], key=f"seccion_{ubicacion_key}_politicos")
         
-        with tab1:
+        if tab1:
             st.subheader(f"🔥 Artículos más polémicos - {titulo_ubicacion} + {politico_comentarios}")
             
-            subtab1, subtab2, subtab3 = st.tabs(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"])
+            subtab1, subtab2, subtab3 = pestanas_perezosas(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"], key=f"periodo_{ubicacion_key}_politicos_polemicos")
             
             for subtab, datos, periodo in zip([subtab1, subtab2, subtab3], 
                                             [comentarios_mayo_2025, comentarios_anio_2025, comentarios_historico],
                                             ["Mayo 2025", "Año 2025", "Histórico"]):
-                with subtab:
+                if subtab:
                     if mostrar_sentimientos and analizador is not None:
                         # ✅ USAR FUNCIÓN CON SENTIMIENTOS
                         df_resumido, reporte, df_comentarios_originales = procesar_comentarios_con_sentimientos_directo(
@@ -982,15 +1003,15 @@ def mostrar_analisis_comentarios_con_filtros(datos_comentarios, titulo_ubicacion
                             table_height=300
                         )
         
-        with tab2:
+        if tab2:
             st.subheader(f"👍 Comentarios más populares sobre {politico_comentarios}")
             
-            subtab1, subtab2, subtab3 = st.tabs(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"])
+            subtab1, subtab2, subtab3 = pestanas_perezosas(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"], key=f"periodo_{ubicacion_key}_politicos_populares")
             
             for subtab, datos, periodo in zip([subtab1, subtab2, subtab3], 
                                             [comentarios_mayo_2025, comentarios_anio_2025, comentarios_historico],
                                             ["mayo 2025", "año 2025", "histórico"]):
-                with subtab:
+                if subtab:
                     if mostrar_sentimientos and analizador is not None:
                         df_comentarios_analizados, reporte = procesar_comentarios_individuales_con_sentimientos(
                             datos, analizador, top_n=20, filtro_popularidad='popular'
@@ -1013,15 +1034,15 @@ def mostrar_analisis_comentarios_con_filtros(datos_comentarios, titulo_ubicacion
                             table_height=300
                         )
         
-        with tab3:
+        if tab3:
             st.subheader(f"👎 Comentarios más impopulares sobre {politico_comentarios}")
             
-            subtab1, subtab2, subtab3 = st.tabs(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"])
+            subtab1, subtab2, subtab3 = pestanas_perezosas(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"], key=f"periodo_{ubicacion_key}_politicos_impopulares")
             
             for subtab, datos, periodo in zip([subtab1, subtab2, subtab3], 
                                             [comentarios_mayo_2025, comentarios_anio_2025, comentarios_historico],
                                             ["mayo 2025", "año 2025", "histórico"]):
-                with subtab:
+                if subtab:
                     if mostrar_sentimientos and analizador is not None:
                         df_comentarios_analizados, reporte = procesar_comentarios_individuales_con_sentimientos(
                             datos, analizador, top_n=20, filtro_popularidad='impopular'
@@ -1044,6 +1065,9 @@ def mostrar_analisis_comentarios_con_filtros(datos_comentarios, titulo_ubicacion
                             table_height=300
                         )
 
+        if tab4:
+            mostrar_exploracion_completa(comentarios_historico, f"{titulo_ubicacion} + {politico_comentarios}", f"explorar_{ubicacion_key}_politicos")
+
 # 🎨 GESTIÓN INTELIGENTE DE FONDOS
 # Definir qué páginas tendrán fondos específicos
 PAGINAS_CON_FONDO_ORIGINAL = [
@@ -1258,7 +1282,7 @@ elif opcion == "🏘️ Visión General del Municipio":
 elif opcion == "📊 Análisis de Visualizaciones":
     try:
         with st.spinner("📊 Cargando métricas de visualización..."):
-            metricas = cargar_metricas()
+            metricas = cargar_metricas(version_datos())
     except Exception as e:
         st.error(f"❌ Error cargando métricas: {e}")
         st.stop()
@@ -1274,9 +1298,9 @@ elif opcion == "📊 Análisis de Visualizaciones":
         st.title("📈 Artículos más Populares")
         st.markdown("**Top 20 artículos con mayor número de visualizaciones** (todas las temáticas)")
         
-        tab1, tab2, tab3 = st.tabs(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"])
+        tab1, tab2, tab3 = pestanas_perezosas(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"], key="periodo_visualizaciones_populares")
         
-        with tab1:
+        if tab1:
             mostrar_seccion_temporal(
                 "📅 Mayo 2025",
                 "Artículos publicados en mayo de 2025",
@@ -1287,7 +1311,7 @@ elif opcion == "📊 Análisis de Visualizaciones":
                 es_articulos_populares=True
             )
         
-        with tab2:
+        if tab2:
             mostrar_seccion_temporal(
                 "📆 Año 2025",
                 "Artículos publicados en 2025",
@@ -1298,7 +1322,7 @@ elif opcion == "📊 Análisis de Visualizaciones":
                 es_articulos_populares=True
             )
         
-        with tab3:
+        if tab3:
             mostrar_seccion_temporal(
                 "🗳️ Desde las elecciones locales del 28 de mayo de 2023",
                 "Todos los artículos históricos ordenados por popularidad",
@@ -1326,15 +1350,15 @@ elif opcion == "📊 Análisis de Visualizaciones":
         st.title(titulo)
         st.markdown(f"{descripcion}\n\n📊 Los artículos se filtran por menciones específicas del partido.")
         
-        tab1, tab2, tab3 = st.tabs(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"])
+        tab1, tab2, tab3 = pestanas_perezosas(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"], key="periodo_visualizaciones_partidos")
         
-        with tab1:
+        if tab1:
             mostrar_seccion_temporal("📅 Mayo 2025", f"Artículos sobre {partido_especifico} publicados en mayo de 2025", datos["mes"], "mayo de 2025", mostrar_sentimientos, analizador, es_articulos_populares=False)
         
-        with tab2:
+        if tab2:
             mostrar_seccion_temporal("📆 Año 2025", f"Artículos sobre {partido_especifico} publicados en 2025", datos["anio"], "año 2025", mostrar_sentimientos, analizador, es_articulos_populares=False)
         
-        with tab3:
+        if tab3:
             mostrar_seccion_temporal("🗳️ Desde las elecciones locales del 28 de mayo de 2023", f"Todos los artículos sobre {partido_especifico} históricos", datos["total"], "período histórico", mostrar_sentimientos, analizador, es_articulos_populares=False)
 
         titulo, descripcion, datos = mapeo_partidos[partido_especifico]
@@ -1355,15 +1379,15 @@ elif opcion == "📊 Análisis de Visualizaciones":
         st.title(titulo)
         st.markdown(f"{descripcion}\n\n📊 Los artículos se filtran por menciones específicas del político.")
         
-        tab1, tab2, tab3 = st.tabs(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"])
+        tab1, tab2, tab3 = pestanas_perezosas(["📅 Último mes", "📆 Año en curso", "🗳️ Desde elecciones 2023"], key="periodo_visualizaciones_politicos")
         
-        with tab1:
+        if tab1:
             mostrar_seccion_temporal("📅 Mayo 2025", f"Artículos sobre {politico_especifico} publicados en mayo de 2025", datos["mes"], "mayo de 2025", mostrar_sentimientos, analizador, es_articulos_populares=False)
         
-        with tab2:
+        if tab2:
             mostrar_seccion_temporal("📆 Año 2025", f"Artículos sobre {politico_especifico} publicados en 2025", datos["anio"], "año 2025", mostrar_sentimientos, analizador, es_articulos_populares=False)
         
-        with tab3:
+        if tab3:
             mostrar_seccion_temporal("🗳️ Desde las elecciones locales del 28 de mayo de 2023", f"Todos los artículos sobre {politico_especifico} históricos", datos["total"], "período histórico", mostrar_sentimientos, analizador, es_articulos_populares=False)
 
         titulo, descripcion, datos = mapeo_politicos[politico_especifico]
@@ -1375,21 +1399,21 @@ elif opcion == "📊 Análisis de Visualizaciones":
 elif opcion == "💬 Análisis de Comentarios":
     if ubicacion_comentarios == "🌍 Comentarios Globales":
         try:
-            datos_comentarios = cargar_datos_comentarios()
+            datos_comentarios = cargar_datos_comentarios(version_datos())
             mostrar_analisis_comentarios_con_filtros(datos_comentarios, "Comentarios Globales", "global", mostrar_sentimientos, analizador, tipo_analisis_comentarios, partido_comentarios, politico_comentarios)
         except Exception as e:
             st.error(f"❌ Error cargando datos de comentarios globales: {e}")
             
     elif ubicacion_comentarios == "🏛️ Comentarios de O Morrazo y Pontevedra":
         try:
-            datos_comentarios = cargar_datos_comentarios_morrazo()
+            datos_comentarios = cargar_datos_comentarios_morrazo(version_datos())
             mostrar_analisis_comentarios_con_filtros(datos_comentarios, "O Morrazo y Pontevedra", "morrazo", mostrar_sentimientos, analizador, tipo_analisis_comentarios, partido_comentarios, politico_comentarios)
         except Exception as e:
             st.error(f"❌ Error cargando datos de comentarios de O Morrazo: {e}")
             
     elif ubicacion_comentarios == "📍 Comentarios de Marín":
         try:
-            datos_comentarios = cargar_datos_comentarios_marin()
+            datos_comentarios = cargar_datos_comentarios_marin(version_datos())
             mostrar_analisis_comentarios_con_filtros(datos_comentarios, "Marín", "marin", mostrar_sentimientos, analizador, tipo_analisis_comentarios, partido_comentarios, politico_comentarios)
         except Exception as e:
             st.error(f"❌ Error cargando datos de comentarios de Marín: {e}")
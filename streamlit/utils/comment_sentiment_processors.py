@@ -5,48 +5,39 @@ Comment Sentiment Processors - HorizontAI (VERSIÓN CORREGIDA)
 SOLUCIÓN: Cambiar import relativo por parámetro directo
 """
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
 def extraer_comentarios_para_analisis(df):
     """
-    Extrae comentarios individuales de un DataFrame de artículos para análisis de sentimientos
+    Prepara los comentarios individuales de la tabla larga para análisis de sentimientos
     
     Args:
-        df: DataFrame con artículos y comentarios
+        df: DataFrame largo de comentarios (una fila por comentario)
         
     Returns:
         DataFrame con comentarios individuales preparados para análisis
     """
-    comentarios_extraidos = []
-    
-    for _, row in df.iterrows():
-        for i in range(1, 16):  # comment_1 a comment_15
-            comment_text = row.get(f'comment_{i}_text', '')
-            comment_author = row.get(f'comment_{i}_author', '')
-            comment_location = row.get(f'comment_{i}_location', '')
-            comment_likes = row.get(f'comment_{i}_likes', 0)
-            comment_dislikes = row.get(f'comment_{i}_dislikes', 0)
-            
-            if pd.notna(comment_text) and str(comment_text).strip():
-                comentarios_extraidos.append({
-                    'title': comment_text,
-                    'texto_completo_preservado': str(comment_text).strip(),  # Backup del texto completo
-                    'summary': '',
-                    'title_original': row['title'],
-                    'date': str(row.get('date', '')).split('T')[0],  # Quitar la parte de tiempo
-                    'link': row.get('link', ''),
-                    'source': row.get('source', ''),
-                    'n_visualizations': row.get('n_visualizations', 0),  # Por si hubiese visualizaciones
-                    'comment_author': comment_author,
-                    'comment_location': comment_location,
-                    'likes': comment_likes,
-                    'dislikes': comment_dislikes,
-                    'net_score': comment_likes - comment_dislikes,
-                    'comment_index': i
-                })
-    
-    return pd.DataFrame(comentarios_extraidos)
+    textos = df['comment_text'].fillna('').astype(str)
+    df = df[textos.str.strip().ne('')]
+    
+    return pd.DataFrame({
+        'title': df['comment_text'],
+        'texto_completo_preservado': df['comment_text'].astype(str).str.strip(),  # Backup del texto completo
+        'summary': '',
+        'title_original': df['title'],
+        'date': df['date'].fillna('').astype(str).str.split('T').str[0],  # Quitar la parte de tiempo
+        'link': df['link'] if 'link' in df.columns else '',
+        'source': df['source'] if 'source' in df.columns else '',
+        'n_visualizations': df['n_visualizations'] if 'n_visualizations' in df.columns else 0,  # Por si hubiese visualizaciones
+        'comment_author': df['comment_author'],
+        'comment_location': df['comment_location'],
+        'likes': df['likes'],
+        'dislikes': df['dislikes'],
+        'net_score': df['likes'] - df['dislikes'],
+        'comment_index': df['comment_index']
+    }).reset_index(drop=True)
 
 def mostrar_comentarios_con_sentimientos(df_comentarios, reporte, titulo_seccion, mostrar_sentimientos=True, es_popular=True):
     """
@@ -72,44 +63,62 @@ def mostrar_comentarios_con_sentimientos(df_comentarios, reporte, titulo_seccion
         st.error(f"❌ Error importando función de visualización: {e}")
         st.error("💡 Usa la función de visualizers.py directamente")
 
+def modas_por_grupo(codigos_grupo, n_grupos, valores):
+    """
+    Calcula la moda de valores dentro de cada grupo sin funciones Python por grupo
+    
+    Los valores se codifican como categorías (pd.factorize) y se cuentan los pares
+    (grupo, valor) con NumPy. A igualdad de frecuencia gana el valor que aparece
+    antes en el grupo (value_counts().idxmax() dejaba ese orden al algoritmo de
+    ordenación de NumPy).
+    
+    Args:
+        codigos_grupo: array con el código de grupo de cada fila (0..n_grupos-1)
+        n_grupos: número de grupos
+        valores: Serie con los valores (los nulos se ignoran)
+        
+    Returns:
+        tuple: (modas, conteo_moda, n_distintos), arrays de longitud n_grupos.
+        Los grupos sin valores tienen moda None y conteos 0.
+    """
+    modas = np.full(n_grupos, None, dtype=object)
+    conteo_moda = np.zeros(n_grupos, dtype='int64')
+    
+    no_nulos = valores.notna().to_numpy()
+    codigos_valor, categorias = pd.factorize(valores[no_nulos])
+    if len(categorias) == 0:
+        return modas, conteo_moda, np.zeros(n_grupos, dtype='int64')
+    
+    grupos = codigos_grupo[no_nulos]
+    pares, inversa = np.unique(grupos * len(categorias) + codigos_valor, return_inverse=True)
+    conteos = np.bincount(inversa)
+    
+    # Primera aparición de cada par para desempatar
+    primera = np.full(len(pares), len(inversa), dtype='int64')
+    np.minimum.at(primera, inversa, np.arange(len(inversa)))
+    
+    grupo_par = pares // len(categorias)
+    valor_par = pares % len(categorias)
+    
+    # Por grupo: mayor conteo y, a igualdad, primera aparición
+    orden = np.lexsort((primera, -conteos, grupo_par))
+    grupos_ordenados = grupo_par[orden]
+    ganadores = orden[np.r_[True, grupos_ordenados[1:] != grupos_ordenados[:-1]]]
+    
+    modas[grupo_par[ganadores]] = np.asarray(categorias, dtype=object)[valor_par[ganadores]]
+    conteo_moda[grupo_par[ganadores]] = conteos[ganadores]
+    n_distintos = np.bincount(grupo_par, minlength=n_grupos)
+    return modas, conteo_moda, n_distintos
+
 def resumir_sentimientos_por_articulo(df_analizado):
     """
     🔧 VERSIÓN CORREGIDA: Agrupa comentarios por artículo con temática modal
     
-    Maneja errores de columnas faltantes de forma más robusta
+    Maneja errores de columnas faltantes de forma más robusta.
+    Las modas (tono, emoción, idioma, temática) se calculan sobre categorías con
+    NumPy y el resto de columnas con agregaciones nativas de pandas.
     """
     
-    # Función helper para moda
-    def moda_o_neutral(col):
-        try:
-            conteo = col.dropna().value_counts()
-            if len(conteo) == 0:
-                return 'neutral'
-            return conteo.idxmax()
-        except:
-            return 'neutral'
-    
-    # Función helper para temática modal
-    def calcular_tematica_modal(col):
-        try:
-            col_clean = col.dropna()
-            if len(col_clean) == 0:
-                return '📄 Otra'
-            
-            conteo = col_clean.value_counts()
-            if len(conteo) == 0:
-                return '📄 Otra'
-            
-            tematica_modal = conteo.idxmax()
-            
-            # Si todas aparecen solo 1 vez, devolver "Variadas"
-            if conteo.iloc[0] == 1 and len(conteo) > 1:
-                return '📄 Variadas'
-            
-            return tematica_modal
-        except:
-            return '📄 Otra'
-    
     # 🔧 VERIFICACIÓN BÁSICA SOLO DE COLUMNAS CRÍTICAS
     if 'title_original' not in df_analizado.columns:
         st.error("❌ No se encontró la columna 'title_original'")
@@ -141,27 +150,46 @@ def resumir_sentimientos_por_articulo(df_analizado):
     # 🆕 VERIFICAR SI EXISTE COLUMNA DE TEMÁTICA
     tiene_tematica = 'tematica' in df_analizado.columns
     
-    # 🔧 CONFIGURAR AGREGACIONES BÁSICAS
-    agregaciones = {
-        'link': 'first',
-        'tono_general': moda_o_neutral,
-        'emocion_principal': moda_o_neutral,
-        'intensidad_emocional': 'mean',
-        'confianza_analisis': 'mean',
-        'es_politico': lambda x: x.sum() > len(x) / 2,
-        'idioma': moda_o_neutral,
-        'date': 'first',
-        'n_visualizations': 'first',
-        'source': 'first'
-    }
-    
-    # 🆕 AÑADIR TEMÁTICA MODAL SI LA COLUMNA EXISTE
-    if tiene_tematica:
-        agregaciones['tematica'] = calcular_tematica_modal
-    
     # 🔧 AGRUPAR CON MANEJO DE ERRORES
     try:
-        agrupado = df_analizado.groupby(['title_original']).agg(agregaciones).reset_index()
+        # Un código por artículo, en el mismo orden que groupby (ordenado, sin nulos)
+        codigos, titulos = pd.factorize(df_analizado['title_original'], sort=True)
+        con_titulo = codigos >= 0
+        df_grupos = df_analizado[con_titulo]
+        codigos = codigos[con_titulo]
+        n_grupos = len(titulos)
+        
+        agrupado_nativo = df_grupos.groupby(codigos)
+        primeros = agrupado_nativo[['link', 'date', 'n_visualizations', 'source']].first()
+        medias = agrupado_nativo[['intensidad_emocional', 'confianza_analisis']].mean()
+        es_politico = agrupado_nativo['es_politico'].sum() > agrupado_nativo['es_politico'].size() / 2
+        
+        def moda_o_neutral(columna):
+            modas, _, _ = modas_por_grupo(codigos, n_grupos, df_grupos[columna])
+            modas[pd.isna(modas)] = 'neutral'
+            return modas
+        
+        agrupado = pd.DataFrame({
+            'title_original': titulos,
+            'link': primeros['link'].to_numpy(),
+            'tono_general': moda_o_neutral('tono_general'),
+            'emocion_principal': moda_o_neutral('emocion_principal'),
+            'intensidad_emocional': medias['intensidad_emocional'].to_numpy(),
+            'confianza_analisis': medias['confianza_analisis'].to_numpy(),
+            'es_politico': es_politico.to_numpy(),
+            'idioma': moda_o_neutral('idioma'),
+            'date': primeros['date'].to_numpy(),
+            'n_visualizations': primeros['n_visualizations'].to_numpy(),
+            'source': primeros['source'].to_numpy()
+        })
+        
+        # 🆕 AÑADIR TEMÁTICA MODAL SI LA COLUMNA EXISTE
+        if tiene_tematica:
+            modas, conteo_moda, n_distintos = modas_por_grupo(codigos, n_grupos, df_grupos['tematica'])
+            # Si todas aparecen solo 1 vez, devolver "Variadas"
+            modas[(conteo_moda == 1) & (n_distintos > 1)] = '📄 Variadas'
+            modas[pd.isna(modas)] = '📄 Otra'
+            agrupado['tematica'] = modas
     except Exception as e:
         st.error(f"❌ Error en agrupación: {e}")
         st.error("💡 Revisa que las columnas necesarias existan en el DataFrame")
@@ -198,7 +226,7 @@ def procesar_comentarios_politicos_con_sentimientos(df, aplicar_analisis_sentimi
     Procesa comentarios políticos aplicando análisis de sentimientos, y resume por artículo
 
     Args:
-        df: DataFrame con artículos y comentarios ya filtrados por política
+        df: DataFrame largo de comentarios ya filtrados por política
         aplicar_analisis_sentimientos: función que ejecuta el análisis con el analizador
         analizador: Instancia del analizador de sentimientos
         top_n: Número de artículos top a devolver
@@ -0,0 +1,49 @@
+"""
+Esquema compartido entre el pipeline y la app: bits de región de la columna
+comments.regiones e índice de texto completo (FTS5) de horizontai.db.
+
+No depende de Streamlit: filter-advanced.py lo importa por ruta, así la base que
+genera el pipeline y el índice en memoria de la app tienen siempre el mismo esquema.
+"""
+
+import os
+import json
+
+# Reglas de localización del pipeline: de ellas salen los bits de región
+ARCHIVO_REGLAS = os.path.abspath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "src", "comments", "reglas-localizacion.json"
+))
+
+# Tokenizador del índice de texto: sin mayúsculas ni acentos (castellano y gallego)
+TOKENIZADOR_FTS = "unicode61 remove_diacritics 2"
+
+def cargar_bits_region(ruta_reglas=ARCHIVO_REGLAS):
+    """Bit de cada región en la columna comments.regiones ('general' y las regiones de las reglas)"""
+    with open(ruta_reglas, encoding='utf-8') as f:
+        regiones = json.load(f)['regiones']
+    bits = {'general': 1}
+    bits.update({region: regla['bit'] for region, regla in regiones.items()})
+    return bits
+
+def crear_indice_texto(conexion):
+    """
+    Crea los índices FTS5 sobre los títulos de los artículos y el texto de los
+    comentarios de la conexión, y confirma la transacción
+
+    Son índices de contenido externo: guardan solo los términos y apuntan a las
+    filas de articles y comments por rowid sin duplicar el texto.
+    """
+    columnas_articulos = {fila[1] for fila in conexion.execute("PRAGMA table_info(articles)")}
+    columnas_texto = [col for col in ('title', 'summary') if col in columnas_articulos]
+
+    conexion.execute(
+        f"CREATE VIRTUAL TABLE articles_fts USING fts5({', '.join(columnas_texto)}, "
+        f"content='articles', content_rowid='rowid', tokenize='{TOKENIZADOR_FTS}')"
+    )
+    conexion.execute(
+        f"CREATE VIRTUAL TABLE comments_fts USING fts5(text, "
+        f"content='comments', content_rowid='rowid', tokenize='{TOKENIZADOR_FTS}')"
+    )
+    conexion.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+    conexion.execute("INSERT INTO comments_fts(comments_fts) VALUES ('rebuild')")
+    conexion.commit()
@@ -7,33 +7,29 @@ Funciones para cargar y procesar datos de métricas y comentarios.
 
 import streamlit as st
 import pandas as pd
-import os
+from .data_schema import leer_csv
+from .data_snapshots import ruta_publicada
+from .political_comment_processors import ENTIDADES, anotar_entidades
+from .query_engine import BITS_REGION, motor_disponible, consultar_vista, etiquetar_consulta, version_datos
 
-# === FUNCIÓN ROBUSTA PARA DETECTAR LA RAÍZ DEL PROYECTO ===
-def get_project_root():
-    """
-    Sube directorios hasta encontrar la carpeta raíz del proyecto (la que contiene /data).
-    """
-    current = os.path.abspath(__file__)
-    while current != "/" and current:
-        if os.path.isdir(os.path.join(current, "data")):
-            return current
-        current = os.path.dirname(current)
-    raise RuntimeError("No se encontró la carpeta raíz del proyecto (con /data dentro).")
+# Las cargas se cachean por versión de datos (instantánea publicada por el
+# pipeline, ver data_snapshots): al publicarse una nueva, la siguiente ejecución
+# de la app la carga y las entradas de versiones antiguas se expulsan solas
+VERSIONES_EN_CACHE = 2
 
-@st.cache_data  # Cache para mejorar rendimiento
-def cargar_metricas():
+@st.cache_data(max_entries=VERSIONES_EN_CACHE)
+def cargar_metricas(version):
     """
-    Carga todos los archivos de métricas y devuelve los top 20 de cada categoría con filtros de fecha correctos
+    Carga todos los archivos de métricas de la versión de datos indicada
+    (version_datos()) y devuelve los top 20 de cada categoría con filtros de fecha correctos
     """
-    project_root = get_project_root()
-    vis_path = os.path.join(project_root, "data", "processed", "metrics-data", "visualizaciones_totales.csv")
-    pol_path = os.path.join(project_root, "data", "processed", "metrics-advanced", "politicos_totales.csv")    
+    vis_path = ruta_publicada("metrics-data/visualizaciones_totales.csv", version)
+    pol_path = ruta_publicada("metrics-advanced/politicos_totales.csv", version)
     
     try:
         # Rutas de archivos de visualizaciones generales
-        vis_total = pd.read_csv(vis_path)
-        pol_total = pd.read_csv(pol_path)
+        vis_total = leer_csv(vis_path)
+        pol_total = leer_csv(pol_path)
         
         # Limpiar títulos: quitar " - Carriola de Marín" del final
         def limpiar_titulo(titulo):
@@ -57,112 +53,28 @@ def cargar_metricas():
             
             return titulo_limpio.strip()
         
-        # Funciones para filtrar por tipo político
-        def contiene_partidos(texto):
-            """Busca menciones de partidos políticos"""
-            if pd.isna(texto):
-                return False
-            texto_lower = str(texto).lower()
-            partidos = ["pp", "psoe", "bng"]
-            return any(partido in texto_lower for partido in partidos)
-        
-        def contiene_politicos_locales(texto):
-            """Busca menciones de políticos locales específicos"""
-            if pd.isna(texto):
-                return False
-            texto_lower = str(texto).lower()
-            politicos = ["pazos", "manuel pazos", "ramallo", "maría ramallo", "santos", "lucía santos"]
-            return any(politico in texto_lower for politico in politicos)
-        
-        # Nuevas funciones para filtros específicos de partidos
-        def contiene_psoe(texto):
-            """Busca menciones específicas de PSOE o Partido Socialista"""
-            if pd.isna(texto):
-                return False
-            texto_lower = str(texto).lower()
-            return "psoe" in texto_lower or "partido socialista" in texto_lower
-        
-        def contiene_pp(texto):
-            """Busca menciones específicas de PP o Partido Popular"""
-            if pd.isna(texto):
-                return False
-            texto_str = str(texto)
-            return "PP" in texto_str or "partido popular" in texto_str.lower()
-        
-        def contiene_bng(texto):
-            """Busca menciones específicas de BNG o Bloque"""
-            if pd.isna(texto):
-                return False
-            texto_lower = str(texto).lower()
-            texto_str = str(texto)
-            return "bng" in texto_lower or "Bloque " in texto_str
-        
-        # Nuevas funciones para filtros específicos de políticos locales
-        def contiene_manuel_pazos(texto):
-            """Busca menciones específicas de Manuel Pazos"""
-            if pd.isna(texto):
-                return False
-            return "Manuel Pazos" in str(texto)
-        
-        def contiene_maria_ramallo(texto):
-            """Busca menciones específicas de María Ramallo o Ramallo"""
-            if pd.isna(texto):
-                return False
-            texto_str = str(texto)
-            return "María Ramallo" in texto_str or "Ramallo" in texto_str
-        
-        def contiene_lucia_santos(texto):
-            """Busca menciones específicas de Lucía Santos"""
-            if pd.isna(texto):
-                return False
-            return "Lucía Santos" in str(texto)
+        # Artículos que mencionan una entidad (columna entidades de
+        # politicos_totales.csv, calculada en src/metrics/filter-metrics.py)
+        def articulos_de(entidad):
+            return pol_total[(pol_total['entidades'] & ENTIDADES[entidad]['bit']) != 0].copy()
         
         # Aplicar limpieza a títulos
         vis_total['title'] = vis_total['title'].apply(limpiar_titulo)
         pol_total['title'] = pol_total['title'].apply(limpiar_titulo)
         
         # Crear filtros específicos para el contenido político total
-        # Filtrar artículos sobre partidos (general)
-        mascara_partidos_titulo = pol_total['title'].apply(contiene_partidos)
-        mascara_partidos_summary = pol_total['summary'].apply(contiene_partidos)
-        pol_partidos = pol_total[mascara_partidos_titulo | mascara_partidos_summary].copy()
-        
-        # Filtrar artículos sobre políticos locales (general)
-        mascara_politicos_titulo = pol_total['title'].apply(contiene_politicos_locales)
-        mascara_politicos_summary = pol_total['summary'].apply(contiene_politicos_locales)
-        pol_politicos_locales = pol_total[mascara_politicos_titulo | mascara_politicos_summary].copy()
+        pol_partidos = articulos_de('partidos_general')
+        pol_politicos_locales = articulos_de('politicos_general')
         
         # Filtros específicos por partido
-        # PSOE
-        mascara_psoe_titulo = pol_total['title'].apply(contiene_psoe)
-        mascara_psoe_summary = pol_total['summary'].apply(contiene_psoe)
-        pol_psoe = pol_total[mascara_psoe_titulo | mascara_psoe_summary].copy()
-        
-        # PP
-        mascara_pp_titulo = pol_total['title'].apply(contiene_pp)
-        mascara_pp_summary = pol_total['summary'].apply(contiene_pp)
-        pol_pp = pol_total[mascara_pp_titulo | mascara_pp_summary].copy()
-        
-        # BNG
-        mascara_bng_titulo = pol_total['title'].apply(contiene_bng)
-        mascara_bng_summary = pol_total['summary'].apply(contiene_bng)
-        pol_bng = pol_total[mascara_bng_titulo | mascara_bng_summary].copy()
+        pol_psoe = articulos_de('psoe')
+        pol_pp = articulos_de('pp')
+        pol_bng = articulos_de('bng')
         
         # Filtros específicos por político local
-        # Manuel Pazos
-        mascara_manuel_titulo = pol_total['title'].apply(contiene_manuel_pazos)
-        mascara_manuel_summary = pol_total['summary'].apply(contiene_manuel_pazos)
-        pol_manuel = pol_total[mascara_manuel_titulo | mascara_manuel_summary].copy()
-        
-        # María Ramallo
-        mascara_maria_titulo = pol_total['title'].apply(contiene_maria_ramallo)
-        mascara_maria_summary = pol_total['summary'].apply(contiene_maria_ramallo)
-        pol_maria = pol_total[mascara_maria_titulo | mascara_maria_summary].copy()
-        
-        # Lucía Santos
-        mascara_lucia_titulo = pol_total['title'].apply(contiene_lucia_santos)
-        mascara_lucia_summary = pol_total['summary'].apply(contiene_lucia_santos)
-        pol_lucia = pol_total[mascara_lucia_titulo | mascara_lucia_summary].copy()
+        pol_manuel = articulos_de('manuel_pazos')
+        pol_maria = articulos_de('maria_ramallo')
+        pol_lucia = articulos_de('lucia_santos')
         
         # Convertir la columna date a string para filtros
         vis_total['date'] = vis_total['date'].astype(str)
@@ -276,21 +188,68 @@ def cargar_metricas():
         st.error(f"❌ Error cargando métricas: {str(e)}")
         st.stop()
 
-@st.cache_data
-def cargar_datos_comentarios():
+# Renombrado de la tabla larga de comentarios al construir la vista para la app
+COLUMNAS_VISTA_COMENTARIOS = {
+    'author': 'comment_author',
+    'location': 'comment_location',
+    'date': 'comment_date',
+    'text': 'comment_text'
+}
+
+def construir_vista_comentarios(articles, comments):
+    """
+    Une la tabla larga de comentarios con la tabla de artículos.
+    
+    Devuelve una fila por comentario con las columnas del artículo
+    (article_id, title, date, link, source, n_comments...) y las del comentario
+    (comment_index, comment_author, comment_location, comment_date, comment_text,
+    likes, dislikes). Es el formato que consumen los procesadores de la app.
+    """
+    comentarios = comments.rename(columns=COLUMNAS_VISTA_COMENTARIOS)
+    vista = articles.merge(comentarios, on='article_id', how='inner')
+    return vista.sort_values(['article_id', 'comment_index']).reset_index(drop=True)
+
+@st.cache_data(max_entries=VERSIONES_EN_CACHE)
+def cargar_tablas_base(version):
     """
-    Carga los archivos CSV con datos de comentarios
+    Carga una sola vez por versión de datos articles.csv y comments.csv
+    (compartidas por todas las regiones)
     """
-    # Definir rutas base (desde el directorio del script de streamlit)
-    # Asumiendo que app.py está en streamlit/ y data/ está en la raíz del proyecto
-    #ruta_archivo = os.path.join("..", "data", "processed", "filtered-data", "filtered_data.csv")
+    articles = leer_csv(ruta_publicada("filtered-data/articles.csv", version))
+    comments = leer_csv(ruta_publicada("filtered-data/comments.csv", version))
+    return articles, comments
 
-    BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-    ruta_archivo = os.path.join(BASE_DIR, "data", "processed", "filtered-data", "filtered_data.csv")
+def cargar_tablas_comentarios(region, version=None):
+    """
+    Devuelve la vista unida de artículos y comentarios de la región
+    ('general', 'morrazo' o 'marin') en una versión de datos (None = la publicada).
+    
+    Usa el motor de consultas embebido si está disponible y, si no, enmascara
+    comments.csv con su columna de bits de región. La vista queda etiquetada con
+    su región y la versión de los datos para que los procesadores puedan
+    resolverla en SQL o reutilizar resultados memorizados.
+    Lanza FileNotFoundError si falta alguno de los archivos.
+    """
+    if version is None:
+        version = version_datos()
+    if motor_disponible():
+        vista = consultar_vista(region, version=version)
+    else:
+        articles, comments = cargar_tablas_base(version)
+        comments_region = comments[(comments['regiones'] & BITS_REGION[region]) != 0]
+        vista = construir_vista_comentarios(articles, comments_region.drop(columns='regiones'))
     
+    # Menciones de partidos y políticos por artículo, calculadas una sola vez con los datos
+    anotar_entidades(vista)
+    return etiquetar_consulta(vista, region=region, version=version)
+
+@st.cache_data(max_entries=VERSIONES_EN_CACHE)
+def cargar_datos_comentarios(version):
+    """
+    Carga la tabla larga de comentarios globales unida a sus artículos
+    """
     try:
-        # Cargar solo el archivo principal de datos filtrados
-        filtered_data = pd.read_csv(ruta_archivo)
+        filtered_data = cargar_tablas_comentarios("general", version)
         
         return {
             "filtered_data": filtered_data
@@ -298,50 +257,26 @@ def cargar_datos_comentarios():
     
     except FileNotFoundError as e:
         st.error(f"❌ No se encontró el archivo: {e.filename}")
-        st.write(f"Ruta buscada: {ruta_archivo}")
         st.stop()
     except Exception as e:
         st.error(f"❌ Error cargando datos de comentarios: {str(e)}")
         st.stop()
 
-@st.cache_data
-def cargar_datos_comentarios_morrazo():
+@st.cache_data(max_entries=VERSIONES_EN_CACHE)
+def cargar_datos_comentarios_morrazo(version):
     """
     Carga los datos de comentarios específicos de O Morrazo y Pontevedra
     """
-    # Definir rutas base (desde el directorio del script de streamlit)
-    # Asumiendo que app.py está en streamlit/ y el archivo CSV está en el directorio raíz
-    #archivo_morrazo = os.path.join("..", "data", "processed", "filtered-data", "filtro1_localizacion.csv")
-
-    BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-    archivo_morrazo = os.path.join(BASE_DIR, "data", "processed", "filtered-data", "filtro1_localizacion.csv")
-    
-    archivo_encontrado = None
-    
-    # Buscar el archivo en las rutas posibles
-    for ruta in [archivo_morrazo]:
-        if os.path.exists(ruta):
-            archivo_encontrado = ruta
-            break
-    
-    if archivo_encontrado is None:
-        # Mostrar rutas buscadas para debugging
-        st.error("❌ No se encontró el archivo filtro1_localizacion.csv")
-        st.write("📂 Rutas buscadas:")
-        for ruta in [archivo_morrazo]:
-            st.write(f"   - {ruta}")
-        st.stop()
-    
     try:
-        # Cargar el archivo de datos de O Morrazo y Pontevedra
-        morrazo_data = pd.read_csv(archivo_encontrado)
+        # Cargar la tabla larga de comentarios de O Morrazo y Pontevedra
+        morrazo_data = cargar_tablas_comentarios("morrazo", version)
         
         # Verificar que el archivo tiene las columnas necesarias
         columnas_necesarias = ['title', 'date', 'n_comments', 'source']
         columnas_faltantes = [col for col in columnas_necesarias if col not in morrazo_data.columns]
         
         if columnas_faltantes:
-            st.error(f"❌ El archivo {archivo_encontrado} no tiene las columnas necesarias: {columnas_faltantes}")
+            st.error(f"❌ Los datos de O Morrazo no tienen las columnas necesarias: {columnas_faltantes}")
             st.write(f"📊 Columnas disponibles: {list(morrazo_data.columns)}")
             st.stop()
                 
@@ -351,47 +286,23 @@ def cargar_datos_comentarios_morrazo():
     
     except FileNotFoundError as e:
         st.error(f"❌ No se encontró el archivo: {e.filename}")
-        st.write(f"Ruta buscada: {archivo_encontrado}")
         st.stop()
         
-@st.cache_data
-def cargar_datos_comentarios_marin():
+@st.cache_data(max_entries=VERSIONES_EN_CACHE)
+def cargar_datos_comentarios_marin(version):
     """
     Carga los datos de comentarios específicos de Marín
     """
-    # Definir rutas base (desde el directorio del script de streamlit)
-    # Asumiendo que app.py está en streamlit/ y el archivo CSV está en el directorio raíz
-    #archivo_marin = os.path.join("..", "data", "processed", "filtered-data", "filtro6_marin.csv")
-
-    BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-    archivo_marin = os.path.join(BASE_DIR, "data", "processed", "filtered-data", "filtro6_marin.csv")
- 
-    archivo_encontrado = None
-    
-    # Buscar el archivo en las rutas posibles
-    for ruta in [archivo_marin]:
-        if os.path.exists(ruta):
-            archivo_encontrado = ruta
-            break
-    
-    if archivo_encontrado is None:
-        # Mostrar rutas buscadas para debugging
-        st.error("❌ No se encontró el archivo filtro6_marin.csv")
-        st.write("📂 Rutas buscadas:")
-        for ruta in [archivo_marin]:
-            st.write(f"   - {ruta}")
-        st.stop()
-    
     try:
-        # Cargar el archivo de datos de Marín
-        marin_data = pd.read_csv(archivo_encontrado)
+        # Cargar la tabla larga de comentarios de Marín
+        marin_data = cargar_tablas_comentarios("marin", version)
         
         # Verificar que el archivo tiene las columnas necesarias
         columnas_necesarias = ['title', 'date', 'n_comments', 'source']
         columnas_faltantes = [col for col in columnas_necesarias if col not in marin_data.columns]
         
         if columnas_faltantes:
-            st.error(f"❌ El archivo {archivo_encontrado} no tiene las columnas necesarias: {columnas_faltantes}")
+            st.error(f"❌ Los datos de Marín no tienen las columnas necesarias: {columnas_faltantes}")
             st.write(f"📊 Columnas disponibles: {list(marin_data.columns)}")
             st.stop()
                 
@@ -401,9 +312,7 @@ def cargar_datos_comentarios_marin():
     
     except FileNotFoundError as e:
         st.error(f"❌ No se encontró el archivo: {e.filename}")
-        st.write(f"Ruta buscada: {archivo_encontrado}")
         st.stop()
     except Exception as e:
         st.error(f"❌ Error cargando datos de comentarios de Marín: {str(e)}")
-        st.error(f"Archivo: {archivo_encontrado}")
-        st.stop()
\ No newline at end of file
+        st.stop()
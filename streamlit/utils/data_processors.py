@@ -3,38 +3,73 @@ Data Processors - HorizontAI
 =============================
 
 Funciones para procesar datos de comentarios y artículos polémicos.
+
+Todas trabajan sobre la tabla larga de comentarios (una fila por comentario
+con las columnas de su artículo), tal y como la devuelven los data_loaders.
+Si la tabla viene etiquetada con sus parámetros de consulta (región, periodo,
+entidad), el filtrado y la agregación se resuelven en el motor embebido
+(utils/query_engine.py); si no, se calculan con pandas.
 """
 
 import pandas as pd
+from .query_engine import (
+    parametros_consulta,
+    etiquetar_consulta,
+    consultar_articulos_polemicos
+)
+from .ranking_processors import rankear_comentarios_por_popularidad, puntuar_articulos_polemicos
+from .result_cache import memorizar_calculo
+
+def resolver_con_motor(df, consulta_func, **kwargs):
+    """
+    Resuelve la consulta en el motor embebido si df está etiquetado
+
+    Args:
+        df: DataFrame largo de comentarios
+        consulta_func: función de query_engine que recibe region, prefijo_fecha y article_ids
+        **kwargs: parámetros adicionales de la consulta (top_n, popularidad...)
+
+    Returns:
+        DataFrame con el resultado o None si hay que calcularlo con pandas
+    """
+    consulta = parametros_consulta(df)
+    if consulta is None:
+        return None
 
+    try:
+        return consulta_func(
+            consulta['region'],
+            prefijo_fecha=consulta.get('prefijo_fecha'),
+            article_ids=consulta.get('article_ids'),
+            version=consulta.get('version'),
+            **kwargs
+        )
+    except Exception as e:
+        print(f"⚠️ Error en el motor de consultas, se usa pandas: {e}")
+        return None
+
+@memorizar_calculo("articulos_polemicos")
 def procesar_articulos_polemicos(df, top_n=20):
     """
     Encuentra los artículos más polémicos basado en número de comentarios
     y longitud de texto de comentarios
-    
+
     Args:
-        df: DataFrame con artículos y comentarios
+        df: DataFrame largo de comentarios
         top_n: Número de artículos top a devolver
-        
+
     Returns:
         DataFrame con los artículos más polémicos
     """
-    # Crear una copia del dataframe
-    df_processed = df.copy()
-    
-    # Calcular la longitud total de texto de comentarios por artículo
-    df_processed['total_comment_length'] = 0
-    
-    for i in range(1, 16):  # comment_1 a comment_15
-        comment_col = f'comment_{i}_text'
-        if comment_col in df.columns:
-            df_processed[comment_col] = df_processed[comment_col].fillna('')
-            df_processed['total_comment_length'] += df_processed[comment_col].astype(str).str.len()
-    
+    if len(df) == 0:
+        return pd.DataFrame()
+
+    resultado = resolver_con_motor(df, consultar_articulos_polemicos, top_n=top_n, desempate_longitud=True)
+    if resultado is not None:
+        return resultado
+
     # Ordenar primero por número de comentarios, luego por longitud total
-    df_sorted = df_processed.sort_values(['n_comments', 'total_comment_length'], ascending=[False, False])
-    
-    return df_sorted.head(top_n)
+    return puntuar_articulos_polemicos(df, top_n=top_n, desempate_longitud=True)
 
 def procesar_articulos_polemicos_UNIFICADO(df):
     """
@@ -45,151 +80,56 @@ def procesar_articulos_polemicos_UNIFICADO(df):
 def procesar_comentarios_populares(df, top_n=20):
     """
     Encuentra los comentarios más populares (más likes que dislikes)
-    
+
     Args:
-        df: DataFrame con artículos y comentarios
+        df: DataFrame largo de comentarios
         top_n: Número de comentarios top a devolver
-        
+
     Returns:
         DataFrame con los comentarios más populares
     """
-
-    comentarios_populares = []
-    
-    for _, row in df.iterrows():
-        for i in range(1, 16):  # comment_1 a comment_15
-            comment_text = row.get(f'comment_{i}_text', '')
-            comment_likes = row.get(f'comment_{i}_likes', 0)
-            comment_dislikes = row.get(f'comment_{i}_dislikes', 0)
-            comment_author = row.get(f'comment_{i}_author', '')
-            comment_location = row.get(f'comment_{i}_location', '')
-            
-            if pd.notna(comment_text) and str(comment_text).strip() and comment_likes > comment_dislikes:
-                comentarios_populares.append({
-                    'article_title': row['title'],
-                    'article_date': row['date'],
-                    'article_link': row['link'],
-                    'article_source': row['source'],
-                    'comment_text': comment_text,
-                    'comment_author': comment_author,
-                    'comment_location': comment_location,
-                    'likes': comment_likes,
-                    'dislikes': comment_dislikes,
-                    'net_score': comment_likes - comment_dislikes
-                })
-    
-    # Convertir a DataFrame y ordenar por net_score
-    df_comentarios = pd.DataFrame(comentarios_populares)
-    if len(df_comentarios) > 0:
-        df_comentarios = df_comentarios.sort_values('net_score', ascending=False)
-    
-    return df_comentarios.head(top_n)
+    populares, _ = rankear_comentarios_por_popularidad(df, top_n)
+    return populares
 
 def procesar_comentarios_impopulares(df, top_n=20):
     """
     Encuentra los comentarios más impopulares (más dislikes que likes)
-    
+
     Args:
-        df: DataFrame con artículos y comentarios
+        df: DataFrame largo de comentarios
         top_n: Número de comentarios top a devolver
-        
+
     Returns:
         DataFrame con los comentarios más impopulares
     """
-    comentarios_impopulares = []
-    
-    for _, row in df.iterrows():
-        for i in range(1, 16):  # comment_1 a comment_15
-            comment_text = row.get(f'comment_{i}_text', '')
-            comment_likes = row.get(f'comment_{i}_likes', 0)
-            comment_dislikes = row.get(f'comment_{i}_dislikes', 0)
-            comment_author = row.get(f'comment_{i}_author', '')
-            comment_location = row.get(f'comment_{i}_location', '')
-            
-            if pd.notna(comment_text) and str(comment_text).strip() and comment_dislikes > comment_likes:
-                comentarios_impopulares.append({
-                    'article_title': row['title'],
-                    'article_date': row['date'],
-                    'article_link': row['link'],
-                    'article_source': row['source'],
-                    'comment_text': comment_text,
-                    'comment_author': comment_author,
-                    'comment_location': comment_location,
-                    'likes': comment_likes,
-                    'dislikes': comment_dislikes,
-                    'net_score': comment_likes - comment_dislikes
-                })
-    
-    # Convertir a DataFrame y ordenar por net_score (mayor diferencia negativa)
-    df_comentarios = pd.DataFrame(comentarios_impopulares)
-    if len(df_comentarios) > 0:
-        df_comentarios = df_comentarios.sort_values('net_score', ascending=True)
-    
-    return df_comentarios.head(top_n)
+    _, impopulares = rankear_comentarios_por_popularidad(df, top_n)
+    return impopulares
 
+@memorizar_calculo("articulos_polemicos_unificado")
 def obtener_articulos_polemicos_unificado(df, top_n=20):
     """
     🔧 FUNCIÓN UNIFICADA: Determina artículos polémicos usando EXACTAMENTE la misma lógica
     para ambos casos (con y sin analizador)
-    
+
     Args:
-        df: DataFrame con artículos y comentarios
+        df: DataFrame largo de comentarios
         top_n: Número de artículos más polémicos a retornar
-        
+
     Returns:
-        DataFrame ordenado por número de comentarios descendente
+        DataFrame de artículos (con article_id) ordenado por número de comentarios descendente.
+        Los comentarios de cada artículo se recuperan de la tabla larga por article_id.
     """
-    
+
     if len(df) == 0:
         return pd.DataFrame()
-    
-    # 1. Contar comentarios por artículo (mismo criterio siempre)
-    conteo_comentarios = []
-    
-    for index, row in df.iterrows():
-        num_comentarios = 0
-        
-        # Contar comentarios del 1 al 15
-        for i in range(1, 16):
-            comment_text = row.get(f'comment_{i}_text', '')
-            if pd.notna(comment_text) and str(comment_text).strip():
-                num_comentarios += 1
-        
-        # También verificar columna n_comments si existe
-        if 'n_comments' in row and pd.notna(row['n_comments']):
-            num_comentarios = max(num_comentarios, int(row['n_comments']))
-        
-        conteo_comentarios.append({
-            'title': row.get('title', ''),
-            'date': row.get('date', ''),
-            'source': row.get('source', ''),
-            'link': row.get('link', ''),
-            'n_visualizations': row.get('n_visualizations', 0),
-            'summary': row.get('summary', ''),
-            'n_comments': num_comentarios,
-            'total_comment_length': sum([
-                len(str(row.get(f'comment_{i}_text', ''))) 
-                for i in range(1, 16) 
-                if pd.notna(row.get(f'comment_{i}_text', ''))
-            ]),
-            # Preservar comentarios originales para análisis
-            **{k: v for k, v in row.items() if k.startswith('comment_')}
-        })
-    
-    # 2. Crear DataFrame y ordenar por número de comentarios DESCENDENTE
-    df_resultado = pd.DataFrame(conteo_comentarios)
-    
-    if len(df_resultado) == 0:
-        return df_resultado
-    
-    # 🔧 CRITERIO UNIFICADO: Ordenar siempre por número de comentarios descendente
-    df_resultado = df_resultado.sort_values('n_comments', ascending=False)
-    
-    # 3. Filtrar solo artículos que tengan al menos 1 comentario
-    df_resultado = df_resultado[df_resultado['n_comments'] > 0]
-    
-    # 4. Retornar top N más polémicos
-    return df_resultado.head(top_n).reset_index(drop=True)
+
+    resultado = resolver_con_motor(df, consultar_articulos_polemicos, top_n=top_n, desempate_longitud=False)
+    if resultado is not None:
+        return resultado
+
+    # 🔧 CRITERIO UNIFICADO: Ordenar siempre por número de comentarios descendente,
+    # solo artículos con al menos 1 comentario
+    return puntuar_articulos_polemicos(df, top_n=top_n, desempate_longitud=False, solo_con_comentarios=True)
 
 def aplicar_filtros_temporales(datos_comentarios):
     """
@@ -201,10 +141,14 @@ def aplicar_filtros_temporales(datos_comentarios):
     except:
         # Si falla, usar valores por defecto
         datos_comentarios["filtered_data"]['date'] = ''
-    
-    # Aplicar filtros temporales
+
+    # Aplicar filtros temporales (el prefijo de fecha queda anotado para el motor de consultas)
     comentarios_mayo_2025 = datos_comentarios["filtered_data"][datos_comentarios["filtered_data"]['date'].str.startswith('2025-05')]
     comentarios_anio_2025 = datos_comentarios["filtered_data"][datos_comentarios["filtered_data"]['date'].str.startswith('2025')]
     comentarios_historico = datos_comentarios["filtered_data"]
-    
-    return comentarios_mayo_2025, comentarios_anio_2025, comentarios_historico
\ No newline at end of file
+
+    if 'consulta' in comentarios_historico.attrs:
+        etiquetar_consulta(comentarios_mayo_2025, prefijo_fecha='2025-05')
+        etiquetar_consulta(comentarios_anio_2025, prefijo_fecha='2025')
+
+    return comentarios_mayo_2025, comentarios_anio_2025, comentarios_historico
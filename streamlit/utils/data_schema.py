@@ -0,0 +1,129 @@
+"""
+Data Schema - HorizontAI
+=========================
+
+Esquema único de las columnas de los datos del pipeline y de la app, con tipos
+compactos:
+- Categorías para los valores muy repetidos (fuente, autor, localización)
+- Enteros pequeños con nulos para los contadores (likes, dislikes, n_comments,
+  n_visualizations...)
+- Texto respaldado por pyarrow (títulos, enlaces, resúmenes, comentarios y
+  fechas, que se filtran por prefijo ISO y en los comentarios son texto libre)
+
+El tipo depende solo del nombre de la columna, así que vale igual para
+articles.csv, comments.csv, el formato ancho comment_N_* de los scrapers, las
+métricas y las vistas del motor de consultas. Las columnas que no aparecen
+aquí se dejan como estén.
+
+No depende de Streamlit: main.py lo importa por ruta para leer las entradas
+de las etapas en proceso.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    TEXTO = "string[pyarrow]"
+except ImportError:
+    TEXTO = "string"
+
+CATEGORIA = "category"
+
+# Tipo de cada columna por nombre
+TIPOS_COLUMNA = {
+    # Artículos
+    'article_id': "Int32",
+    'source': CATEGORIA,
+    'title': TEXTO,
+    'link': TEXTO,
+    'date': TEXTO,
+    'summary': TEXTO,
+    'n_comments': "Int16",
+    'n_visualizations': "Int32",
+    'year_month': CATEGORIA,
+    'year': "Int16",
+    'fecha_filtrado': CATEGORIA,
+    'filtro_aplicado': CATEGORIA,
+    'entidades': "UInt8",
+    # Comentarios (tabla larga y vista de la app)
+    'comment_index': "Int16",
+    'author': CATEGORIA,
+    'location': CATEGORIA,
+    'text': TEXTO,
+    'comment_author': CATEGORIA,
+    'comment_location': CATEGORIA,
+    'comment_date': TEXTO,
+    'comment_text': TEXTO,
+    'likes': "Int16",
+    'dislikes': "Int16",
+    'regiones': "UInt8"
+}
+
+# Formato ancho de los scrapers: comment_N_<campo>
+PATRON_COLUMNA_ANCHA = re.compile(r'^comment_\d+_(author|location|date|text|likes|dislikes)$')
+TIPOS_CAMPO_ANCHO = {
+    'author': CATEGORIA,
+    'location': CATEGORIA,
+    'date': TEXTO,
+    'text': TEXTO,
+    'likes': "Int16",
+    'dislikes': "Int16"
+}
+
+def tipo_columna(columna):
+    """Tipo compacto de una columna, o None si no está en el esquema"""
+    if columna in TIPOS_COLUMNA:
+        return TIPOS_COLUMNA[columna]
+    coincidencia = PATRON_COLUMNA_ANCHA.match(str(columna))
+    return TIPOS_CAMPO_ANCHO[coincidencia.group(1)] if coincidencia else None
+
+def es_entero(tipo):
+    """Indica si un tipo del esquema es entero"""
+    return tipo is not None and tipo not in (TEXTO, CATEGORIA)
+
+def dtypes_lectura(columnas):
+    """
+    dtypes para pd.read_csv: texto y categorías se leen ya con su tipo (sin
+    inferirlo); los enteros se convierten después en aplicar_esquema porque
+    las fuentes pueden traerlos como 3.0 o vacíos
+    """
+    tipos = {col: tipo_columna(col) for col in columnas}
+    return {col: tipo for col, tipo in tipos.items() if tipo is not None and not es_entero(tipo)}
+
+def _a_entero(serie, tipo):
+    """Convierte a entero con nulos; si no cabe en tipo, a Int64; si hay decimales, se deja igual"""
+    numeros = pd.to_numeric(serie, errors='coerce')
+    valores = numeros.dropna()
+    if len(valores) and not np.all(np.mod(valores.to_numpy(dtype='float64'), 1) == 0):
+        return serie
+    limites = np.iinfo(pd.api.types.pandas_dtype(tipo).numpy_dtype)
+    if len(valores) and (valores.min() < limites.min or valores.max() > limites.max):
+        tipo = "Int64"
+    return numeros.astype(tipo)
+
+def aplicar_esquema(df):
+    """
+    Convierte in situ las columnas de df que están en el esquema a su tipo compacto
+
+    Returns:
+        el mismo df (conserva df.attrs)
+    """
+    for columna in df.columns:
+        tipo = tipo_columna(columna)
+        if tipo is None or df[columna].dtype == pd.api.types.pandas_dtype(tipo):
+            continue
+        if es_entero(tipo):
+            df[columna] = _a_entero(df[columna], tipo)
+        elif tipo == CATEGORIA:
+            df[columna] = df[columna].astype(CATEGORIA)
+        else:
+            df[columna] = df[columna].astype(TEXTO)
+    return df
+
+def leer_csv(ruta, **kwargs):
+    """pd.read_csv con los tipos del esquema"""
+    columnas = pd.read_csv(ruta, nrows=0).columns
+    return aplicar_esquema(pd.read_csv(ruta, dtype=dtypes_lectura(columnas), **kwargs))
@@ -0,0 +1,137 @@
+"""
+Data Snapshots - HorizontAI
+============================
+
+Instantáneas versionadas de los datos que lee la app.
+
+Las etapas del pipeline escriben sus salidas en data/processed (su carpeta de
+trabajo). Al terminar una ejecución correcta, el pipeline copia los archivos
+que usa la app a una carpeta nueva data/processed/snapshots/<versión>/ (primero
+con un nombre temporal y después renombrándola) y cambia el puntero
+snapshots/current con otro reemplazo atómico. La app solo lee instantáneas
+completas: nunca ve un archivo a medio escribir, y como la versión cambia con
+cada publicación, sus cachés cargan los datos nuevos en la siguiente ejecución
+sin reiniciar.
+
+Sin instantáneas publicadas (p. ej. recién clonado el repositorio) se leen los
+archivos de data/processed.
+
+No depende de Streamlit: main.py lo importa por ruta para publicar.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+
+CARPETA_PROCESADOS = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed"))
+CARPETA_INSTANTANEAS = os.path.join(CARPETA_PROCESADOS, "snapshots")
+PUNTERO_ACTUAL = os.path.join(CARPETA_INSTANTANEAS, "current")
+MANIFIESTO = "manifest.json"
+
+# Instantáneas que se conservan (las sesiones abiertas pueden seguir leyendo la anterior)
+INSTANTANEAS_CONSERVADAS = 3
+
+# Archivos que lee la app, relativos a data/processed
+ARCHIVOS_PUBLICADOS = [
+    "filtered-data/articles.csv",
+    "filtered-data/comments.csv",
+    "filtered-data/horizontai.db",
+    "metrics-data/visualizaciones_totales.csv",
+    "metrics-advanced/politicos_totales.csv"
+]
+
+def version_actual():
+    """Versión publicada (nombre de la instantánea), o None si no hay ninguna"""
+    try:
+        with open(PUNTERO_ACTUAL, encoding="utf-8") as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return version if version and os.path.isdir(os.path.join(CARPETA_INSTANTANEAS, version)) else None
+
+def ruta_publicada(archivo, version):
+    """
+    Ruta de un archivo de ARCHIVOS_PUBLICADOS en la instantánea version, o en
+    data/processed si version no es una instantánea existente
+    """
+    carpeta = os.path.join(CARPETA_INSTANTANEAS, str(version))
+    if not os.path.isdir(carpeta):
+        carpeta = CARPETA_PROCESADOS
+    return os.path.join(carpeta, *archivo.split("/"))
+
+def _hash_archivo(ruta):
+    """Hash SHA-256 del contenido de un archivo"""
+    digest = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(bloque)
+    return digest.hexdigest()
+
+def _leer_manifiesto(version):
+    """Manifiesto de una instantánea ({} si no existe)"""
+    try:
+        with open(os.path.join(CARPETA_INSTANTANEAS, version, MANIFIESTO), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def _escribir_atomico(ruta, texto):
+    """Escribe un archivo de texto pequeño con archivo temporal + reemplazo"""
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        f.write(texto)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+
+def limpiar_instantaneas(conservar=INSTANTANEAS_CONSERVADAS):
+    """Borra las instantáneas antiguas y las temporales de publicaciones interrumpidas"""
+    actual = version_actual()
+    versiones = sorted(
+        nombre for nombre in os.listdir(CARPETA_INSTANTANEAS)
+        if os.path.isdir(os.path.join(CARPETA_INSTANTANEAS, nombre)) and not nombre.startswith(".")
+    )
+    antiguas = [version for version in versiones[:-conservar] if version != actual]
+    temporales = [nombre for nombre in os.listdir(CARPETA_INSTANTANEAS) if nombre.startswith(".") and nombre.endswith(".tmp")]
+    for nombre in antiguas + temporales:
+        shutil.rmtree(os.path.join(CARPETA_INSTANTANEAS, nombre), ignore_errors=True)
+    return antiguas
+
+def publicar_instantanea(carpeta_origen=CARPETA_PROCESADOS):
+    """
+    Publica los ARCHIVOS_PUBLICADOS de carpeta_origen como instantánea nueva y
+    mueve a ella el puntero current. Si no cambió ninguno respecto a la
+    instantánea actual, no se publica nada.
+
+    Returns:
+        tuple: (versión publicada o actual, True si se publicó una nueva)
+    """
+    faltan = [archivo for archivo in ARCHIVOS_PUBLICADOS if not os.path.isfile(os.path.join(carpeta_origen, *archivo.split("/")))]
+    if faltan:
+        raise FileNotFoundError(f"Faltan archivos para publicar: {', '.join(faltan)}")
+
+    huellas = {archivo: _hash_archivo(os.path.join(carpeta_origen, *archivo.split("/"))) for archivo in ARCHIVOS_PUBLICADOS}
+    actual = version_actual()
+    if actual and _leer_manifiesto(actual).get("archivos") == huellas:
+        return actual, False
+
+    os.makedirs(CARPETA_INSTANTANEAS, exist_ok=True)
+    version = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    temporal = os.path.join(CARPETA_INSTANTANEAS, f".{version}.tmp")
+    try:
+        for archivo in ARCHIVOS_PUBLICADOS:
+            destino = os.path.join(temporal, *archivo.split("/"))
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            shutil.copy2(os.path.join(carpeta_origen, *archivo.split("/")), destino)
+        manifiesto = {"version": version, "publicada": datetime.now().isoformat(timespec="seconds"), "archivos": huellas}
+        _escribir_atomico(os.path.join(temporal, MANIFIESTO), json.dumps(manifiesto, indent=2))
+        os.replace(temporal, os.path.join(CARPETA_INSTANTANEAS, version))
+    except BaseException:
+        shutil.rmtree(temporal, ignore_errors=True)
+        raise
+
+    _escribir_atomico(PUNTERO_ACTUAL, version)
+    limpiar_instantaneas()
+    return version, True
@@ -0,0 +1,169 @@
+"""
+Display Processors - HorizontAI
+================================
+
+Columnas de presentación de las tablas del dashboard (etiquetas con emoji,
+títulos truncados, mapeo enlace → título completo).
+
+Las etiquetas se resuelven con tablas de consulta sobre los valores distintos
+de cada columna (pd.factorize) en lugar de aplicar una función fila a fila, y
+las tablas ya preparadas se guardan en la caché de resultados por el contenido
+de la tabla de entrada. Mostrar una tabla se reduce así a seleccionar columnas
+de un DataFrame ya preparado, sin copias.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .result_cache import huella_tabla, obtener_o_calcular
+
+# Tablas de consulta valor → etiqueta
+ETIQUETAS_IDIOMA = {
+    'gallego': 'Gallego',
+    'castellano': 'Castellano'
+}
+
+ETIQUETAS_IDIOMA_COMENTARIOS = {
+    'gallego': '📘 Gallego',
+    'castellano': '🐂 Castellano'
+}
+
+ETIQUETAS_TONO = {
+    'positivo': '😊 Positivo',
+    'negativo': '😔 Negativo',
+    'neutral': '😐 Neutral'
+}
+
+ETIQUETAS_POLITICO = {
+    True: '🏛️ Sí',
+    False: '📰 No'
+}
+
+EMOJI_EMOCIONES = {
+    'alegría': '😄', 'esperanza': '🌟', 'orgullo': '💪', 'satisfacción': '😌',
+    'tristeza': '😢', 'ira': '😠', 'miedo': '😨', 'decepción': '😞', 'desprecio': '🙄',
+    'sorpresa': '😲', 'nostalgia': '🥺', 'preocupación': '😟', 'neutral': '😐'
+}
+
+def _etiquetar_valores_distintos(serie, etiquetar, por_defecto):
+    """
+    Aplica etiquetar() una vez por valor distinto de la serie y expande el resultado
+
+    Args:
+        serie: Serie a etiquetar
+        etiquetar: función valor → etiqueta (solo se llama con valores no nulos)
+        por_defecto: etiqueta de los valores nulos
+
+    Returns:
+        Serie de etiquetas con el mismo índice
+    """
+    codigos, distintos = pd.factorize(serie)
+    etiquetas = np.array([etiquetar(valor) for valor in distintos] + [por_defecto], dtype=object)
+    # Los nulos tienen código -1, que apunta a la etiqueta por defecto del final
+    return pd.Series(etiquetas[codigos], index=serie.index)
+
+def etiquetar_categorias(serie, etiquetas, por_defecto):
+    """
+    Equivalente a serie.map(etiquetas).fillna(por_defecto) resuelto por valores distintos
+    """
+    return _etiquetar_valores_distintos(serie, lambda valor: etiquetas.get(valor, por_defecto), por_defecto)
+
+def etiquetar_emociones(serie, por_defecto="🤷‍♂️ Ninguna"):
+    """
+    Etiqueta '<emoji> Emoción' para cada emoción de la serie
+    """
+    return _etiquetar_valores_distintos(
+        serie,
+        lambda emocion: f"{EMOJI_EMOCIONES.get(emocion, '🤔')} {str(emocion).title()}",
+        por_defecto
+    )
+
+def truncar_titulo_palabras(titulo, max_palabras=10):
+    """
+    Trunca un título a un número máximo de palabras
+    """
+    if pd.isna(titulo) or not str(titulo).strip():
+        return "Sin título"
+
+    palabras = str(titulo).strip().split()
+
+    if len(palabras) <= max_palabras:
+        return titulo
+    else:
+        return " ".join(palabras[:max_palabras]) + "..."
+
+def truncar_titulos(serie, max_palabras=5):
+    """
+    Trunca todos los títulos de la serie (una vez por título distinto)
+    """
+    return _etiquetar_valores_distintos(
+        serie,
+        lambda titulo: truncar_titulo_palabras(titulo, max_palabras),
+        "Sin título"
+    )
+
+def _primera_columna(df, candidatas):
+    """Primera columna de candidatas presente en df (o None)"""
+    return next((col for col in candidatas if col in df.columns), None)
+
+def mapping_titulos(df, columnas_enlace, columnas_titulo):
+    """
+    Mapeo enlace → título completo (limpio) de las filas de df
+
+    Args:
+        df: DataFrame de artículos o comentarios
+        columnas_enlace: columnas candidatas para el enlace, por prioridad
+        columnas_titulo: columnas candidatas para el título, por prioridad
+
+    Returns:
+        dict {enlace: título}; sin columna de enlace se usa 'no_link_<índice>'
+    """
+    columna_enlace = _primera_columna(df, columnas_enlace)
+    if columna_enlace is not None:
+        enlaces = df[columna_enlace]
+    else:
+        enlaces = pd.Series([f'no_link_{idx}' for idx in df.index], index=df.index)
+
+    columna_titulo = _primera_columna(df, columnas_titulo)
+    if columna_titulo is not None:
+        titulos = df[columna_titulo]
+        titulos = titulos.astype(str).str.strip().where(titulos.notna(), 'Sin título')
+    else:
+        titulos = pd.Series('Sin título', index=df.index)
+
+    return dict(zip(enlaces, titulos))
+
+def crear_mapping_titulos_originales(df):
+    """Mapping enlace → título original de una tabla de artículos"""
+    return mapping_titulos(df, ('link',), ('title',))
+
+def crear_mapping_titulos_articulos_comentarios(df):
+    """Mapping específico para títulos de artículos desde comentarios"""
+    # Priorizar article_link, luego link; title_original, luego article_title, luego title
+    return mapping_titulos(df, ('article_link', 'link'), ('title_original', 'article_title', 'title'))
+
+def preparar_tabla(nombre, df, preparar, *parametros):
+    """
+    Prepara (o recupera de la caché) la versión para pantalla de una tabla
+
+    El resultado se comparte entre reruns y sesiones, así que quien lo recibe
+    solo debe seleccionar columnas, nunca modificarlo.
+
+    Args:
+        nombre: nombre de la preparación para la clave de caché
+        df: tabla de entrada
+        preparar: función (df, *parametros) → resultado
+        *parametros: parámetros hashables de la preparación
+
+    Returns:
+        El resultado de preparar(df, *parametros)
+    """
+    huella = huella_tabla(df)
+    if huella is None:
+        return preparar(df, *parametros)
+
+    return obtener_o_calcular(
+        (nombre, huella, parametros),
+        lambda: preparar(df, *parametros),
+        copiar=False
+    )
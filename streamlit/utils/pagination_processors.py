@@ -0,0 +1,154 @@
+"""
+Pagination Processors - HorizontAI
+===================================
+
+Páginas de las tablas completas (todos los artículos con comentarios, todos
+los comentarios) sin el tope de top-20.
+
+Si la tabla larga viene etiquetada, el orden y el recorte de la página se
+resuelven en el motor embebido (ORDER BY ... LIMIT/OFFSET), de modo que solo
+viajan a pandas las filas visibles. Si no, el orden completo se calcula una
+vez con pandas, se guarda en la caché de resultados y cada página es un
+recorte de ese orden.
+"""
+
+import pandas as pd
+
+from .data_processors import resolver_con_motor
+from .query_engine import (
+    ORDEN_ARTICULOS,
+    ORDEN_COMENTARIOS,
+    contar_articulos,
+    consultar_pagina_articulos,
+    contar_comentarios,
+    consultar_pagina_comentarios
+)
+from .ranking_processors import puntuar_articulos_polemicos
+from .result_cache import huella_datos, obtener_o_calcular
+
+# Etiquetas de las columnas por las que se puede ordenar cada tabla
+COLUMNAS_ORDEN_ARTICULOS = {
+    'n_comments': '💬 Comentarios',
+    'total_comment_length': '📝 Longitud total',
+    'date': '📅 Fecha'
+}
+
+COLUMNAS_ORDEN_COMENTARIOS = {
+    'net_score': '📊 Puntuación',
+    'likes': '👍 Likes',
+    'dislikes': '👎 Dislikes',
+    'comment_date': '📅 Fecha del comentario',
+    'article_date': '📰 Fecha del artículo'
+}
+
+def _memorizar(nombre, df, calcular, *parametros):
+    """Memoriza calcular() por la huella de df si la tiene"""
+    huella = huella_datos(df)
+    if huella is None:
+        return calcular()
+    return obtener_o_calcular((nombre, huella, parametros), calcular, copiar=False)
+
+def _orden_estable(valores, descendente):
+    """Posiciones ordenadas por valores; a igualdad se respeta la posición original"""
+    orden = pd.Series(valores).sort_values(ascending=not descendente, kind='stable', na_position='last')
+    return orden.index.to_numpy()
+
+def _pagina_con_motor(df, contar_func, pagina_func, offset, limite, orden, descendente):
+    """Página y total resueltos en el motor, o None si df no está etiquetado"""
+    total = resolver_con_motor(df, contar_func)
+    if total is None:
+        return None
+    pagina = resolver_con_motor(df, pagina_func, offset=offset, limite=limite, orden=orden, descendente=descendente)
+    if pagina is None:
+        return None
+    return pagina, total
+
+def paginar_articulos(df, offset=0, limite=50, orden='n_comments', descendente=True):
+    """
+    Página del ranking completo de artículos de la tabla larga
+
+    Args:
+        df: DataFrame largo de comentarios
+        offset: primera fila de la página
+        limite: filas por página
+        orden: clave de ORDEN_ARTICULOS
+        descendente: sentido del orden
+
+    Returns:
+        tuple: (DataFrame de la página, número total de artículos)
+    """
+    if orden not in ORDEN_ARTICULOS:
+        raise ValueError(f"Columna de orden no permitida: {orden}")
+    if len(df) == 0:
+        return pd.DataFrame(), 0
+
+    resultado = _pagina_con_motor(df, contar_articulos, consultar_pagina_articulos, offset, limite, orden, descendente)
+    if resultado is not None:
+        return resultado
+
+    articulos = _memorizar(
+        "ranking_articulos_completo", df,
+        lambda: puntuar_articulos_polemicos(df, top_n=df['article_id'].nunique(), desempate_longitud=False)
+    )
+    posiciones = _memorizar(
+        "orden_articulos", df,
+        lambda: _orden_estable(articulos[orden].to_numpy(), descendente),
+        orden, descendente
+    )
+
+    columnas = ['article_id', 'title', 'date', 'source', 'link', 'n_comments', 'total_comment_length']
+    pagina = articulos.iloc[posiciones[offset:offset + limite]]
+    return pagina[[col for col in columnas if col in pagina.columns]].reset_index(drop=True), len(articulos)
+
+def paginar_comentarios(df, offset=0, limite=50, orden='net_score', descendente=True):
+    """
+    Página de todos los comentarios de la tabla larga
+
+    Args:
+        df: DataFrame largo de comentarios
+        offset: primera fila de la página
+        limite: filas por página
+        orden: clave de ORDEN_COMENTARIOS
+        descendente: sentido del orden
+
+    Returns:
+        tuple: (DataFrame de la página, número total de comentarios)
+    """
+    if orden not in ORDEN_COMENTARIOS:
+        raise ValueError(f"Columna de orden no permitida: {orden}")
+    if len(df) == 0:
+        return pd.DataFrame(), 0
+
+    resultado = _pagina_con_motor(df, contar_comentarios, consultar_pagina_comentarios, offset, limite, orden, descendente)
+    if resultado is not None:
+        return resultado
+
+    columnas_orden = {
+        'net_score': lambda: df['likes'].to_numpy(dtype='int64') - df['dislikes'].to_numpy(dtype='int64'),
+        'likes': lambda: df['likes'].to_numpy(),
+        'dislikes': lambda: df['dislikes'].to_numpy(),
+        'comment_date': lambda: df['comment_date'].to_numpy(),
+        'article_date': lambda: df['date'].to_numpy()
+    }
+    posiciones = _memorizar(
+        "orden_comentarios", df,
+        lambda: _orden_estable(columnas_orden[orden](), descendente),
+        orden, descendente
+    )
+
+    filas = df.iloc[posiciones[offset:offset + limite]]
+    pagina = pd.DataFrame({
+        'article_id': filas['article_id'].values,
+        'article_title': filas['title'].values,
+        'article_date': filas['date'].values,
+        'article_link': filas['link'].values,
+        'comment_index': filas['comment_index'].values,
+        'comment_author': filas['comment_author'].values,
+        'comment_location': filas['comment_location'].values,
+        'comment_date': filas['comment_date'].values,
+        'comment_text': filas['comment_text'].values,
+        'likes': filas['likes'].values,
+        'dislikes': filas['dislikes'].values,
+        'net_score': (filas['likes'] - filas['dislikes']).values
+    })
+    return pagina, len(df)
@@ -5,311 +5,242 @@ Political Comment Processors - HorizontAI
 Funciones para filtrar y procesar comentarios con contenido político específico.
 """
 
+import re
 import pandas as pd
+from .data_processors import procesar_articulos_polemicos
+from .ranking_processors import rankear_comentarios_por_popularidad
+from .query_engine import etiquetar_consulta
+from .search_processors import marcar_articulos_con_coincidencias
 
-def filtrar_comentarios_por_partidos_general(df):
+def _patron_palabras(palabras):
+    """Alternativa sin distinguir mayúsculas con las palabras clave escapadas"""
+    return '(?i:' + '|'.join(map(re.escape, palabras)) + ')'
+
+# "PP" en mayúsculas como palabra: " PP ", "PP " al inicio, " PP" al final, " PP." o " PP,"
+PATRON_PP = r'(?<= )PP(?=[ .,])|^PP |(?<= )PP\Z'
+
+# Un patrón compilado y un bit por entidad. Las menciones de cada artículo se
+# calculan una sola vez al cargar los datos (columna entidades, ver anotar_entidades)
+ENTIDADES = {
+    'partidos_general': {
+        'bit': 1,
+        'patron': re.compile(_patron_palabras(["psoe", "partido socialista", "bloque nacionalista", "bng", "partido popular"]) + '|' + PATRON_PP)
+    },
+    'psoe': {
+        'bit': 2,
+        'patron': re.compile(_patron_palabras(["psoe", "partido socialista", "socialista", "psdeg"]))
+    },
+    'pp': {
+        'bit': 4,
+        'patron': re.compile(PATRON_PP + '|' + _patron_palabras(["partido popular"]))
+    },
+    'bng': {
+        'bit': 8,
+        'patron': re.compile(_patron_palabras(["bng", "bloque nacionalista", "bloque"]))
+    },
+    # Los apellidos con mayúscula (Pazos, Ramallo, Santos) ya quedan cubiertos al no distinguir mayúsculas
+    'politicos_general': {
+        'bit': 16,
+        'patron': re.compile(_patron_palabras(["pazos", "manuel pazos", "ramallo", "maría ramallo", "maria ramallo", "santos", "lucía santos", "lucia santos"]))
+    },
+    'manuel_pazos': {
+        'bit': 32,
+        'patron': re.compile(_patron_palabras(["manuel pazos", "pazos"]))
+    },
+    'maria_ramallo': {
+        'bit': 64,
+        'patron': re.compile(_patron_palabras(["maría ramallo", "maria ramallo", "ramallo"]))
+    },
+    'lucia_santos': {
+        'bit': 128,
+        'patron': re.compile(_patron_palabras(["lucía santos", "lucia santos"]))
+    }
+}
+
+def anotar_entidades(df):
     """
-    Filtra artículos que tienen comentarios mencionando cualquier partido político
+    Añade la columna entidades: máscara de bits (ver ENTIDADES) con las entidades
+    mencionadas en algún comentario del artículo de cada fila.
+    
+    Cada patrón se aplica una sola vez sobre todos los textos de comentarios.
     
     Args:
-        df: DataFrame con artículos y comentarios
+        df: DataFrame largo de comentarios (una fila por comentario)
         
     Returns:
-        DataFrame filtrado con artículos que tienen comentarios sobre partidos
+        El mismo DataFrame con la columna entidades
+    """
+    textos = df['comment_text'].fillna('').astype(str)
+    validos = textos.str.strip().ne('')
+    
+    entidades = pd.Series(0, index=df.index, dtype='int64')
+    for entidad in ENTIDADES.values():
+        menciona = validos & textos.str.contains(entidad['patron'])
+        menciona_articulo = menciona.groupby(df['article_id']).transform('any')
+        entidades |= menciona_articulo.astype('int64') * entidad['bit']
+    
+    df['entidades'] = entidades
+    return df
+
+def _filtrar_articulos_por_entidad(df, entidad):
     """
-    def contiene_partidos_en_comentarios(row):
-        """Busca menciones de partidos en todos los comentarios del artículo"""
-        partidos_keywords = ["psoe", "partido socialista", "bloque nacionalista", "bng"]
+    Conserva todos los comentarios de los artículos en los que algún comentario
+    menciona la entidad
+
+    Args:
+        df: DataFrame largo de comentarios (una fila por comentario)
+        entidad: clave de ENTIDADES
+
+    Returns:
+        DataFrame filtrado con los comentarios de los artículos seleccionados
+    """
+    if 'entidades' not in df.columns:
+        df = anotar_entidades(df.copy())
+    
+    return _conservar_articulos(df, (df['entidades'] & ENTIDADES[entidad]['bit']) != 0)
+
+def _conservar_articulos(df, seleccion):
+    """
+    Conserva las filas seleccionadas (artículos completos) y anota sus article_id
+    para que el motor de consultas siga resolviendo df en SQL
+    """
+    df_filtrado = df[seleccion].reset_index(drop=True)
+    
+    if 'consulta' in df.attrs:
+        etiquetar_consulta(df_filtrado, article_ids=[int(article_id) for article_id in df_filtrado['article_id'].unique()])
+    return df_filtrado
+
+def filtrar_comentarios_por_termino(df, texto, incluir_titulos=False):
+    """
+    Filtra artículos que tienen comentarios mencionando un término libre
+    
+    A diferencia de las entidades predefinidas, el término se busca en el índice
+    de texto (palabras completas, sin distinguir mayúsculas ni acentos; 'socialis*'
+    busca por prefijo), así que no hace falta recorrer los textos con un patrón.
+    
+    Args:
+        df: DataFrame largo de comentarios
+        texto: término o términos a buscar
+        incluir_titulos: conservar también los artículos cuyo título los contiene
         
-        for i in range(1, 16):  # comment_1 a comment_15
-            comment_text = row.get(f'comment_{i}_text', '')
-            if pd.notna(comment_text) and str(comment_text).strip():
-                texto_str = str(comment_text)
-                texto_lower = texto_str.lower()
-                
-                # Buscar keywords normales
-                for keyword in partidos_keywords:
-                    if keyword in texto_lower:
-                        return True
-                
-                # Búsqueda especial para "PP" (mayúsculas)
-                if (" PP " in texto_str or 
-                    texto_str.startswith("PP ") or 
-                    texto_str.endswith(" PP") or
-                    " PP." in texto_str or
-                    " PP," in texto_str):
-                    return True
-                    
-                # Búsqueda especial para "partido popular" 
-                if "partido popular" in texto_lower:
-                    return True
-        return False
+    Returns:
+        DataFrame filtrado con los comentarios de los artículos seleccionados
+    """
+    return _conservar_articulos(df, marcar_articulos_con_coincidencias(df, texto, incluir_titulos))
+
+def filtrar_comentarios_por_partidos_general(df):
+    """
+    Filtra artículos que tienen comentarios mencionando cualquier partido político
     
-    mask = df.apply(contiene_partidos_en_comentarios, axis=1)
-    return df[mask].reset_index(drop=True)
+    Args:
+        df: DataFrame largo de comentarios
+        
+    Returns:
+        DataFrame filtrado con los comentarios de artículos que hablan de partidos
+    """
+    return _filtrar_articulos_por_entidad(df, 'partidos_general')
 
 def filtrar_comentarios_por_psoe(df):
     """
     Filtra artículos que tienen comentarios mencionando PSOE/Partido Socialista
     """
-    def contiene_psoe_en_comentarios(row):
-        psoe_keywords = ["psoe", "partido socialista", "socialista", "psdeg"]
-        
-        for i in range(1, 16):
-            comment_text = row.get(f'comment_{i}_text', '')
-            if pd.notna(comment_text) and str(comment_text).strip():
-                texto_lower = str(comment_text).lower()
-                for keyword in psoe_keywords:
-                    if keyword in texto_lower:
-                        return True
-        return False
-    
-    mask = df.apply(contiene_psoe_en_comentarios, axis=1)
-    return df[mask].reset_index(drop=True)
+    return _filtrar_articulos_por_entidad(df, 'psoe')
 
 def filtrar_comentarios_por_pp(df):
     """
     Filtra artículos que tienen comentarios mencionando PP/Partido Popular
     """
-    def contiene_pp_en_comentarios(row):
-        for i in range(1, 16):
-            comment_text = row.get(f'comment_{i}_text', '')
-            if pd.notna(comment_text) and str(comment_text).strip():
-                texto_str = str(comment_text)
-                texto_lower = texto_str.lower()
-                
-                # Buscar "PP" con espacios o signos de puntuación
-                if (" PP " in texto_str or 
-                    texto_str.startswith("PP ") or 
-                    texto_str.endswith(" PP") or
-                    " PP." in texto_str or
-                    " PP," in texto_str or
-                    "partido popular" in texto_lower):
-                    return True
-        return False
-    
-    mask = df.apply(contiene_pp_en_comentarios, axis=1)
-    return df[mask].reset_index(drop=True)
+    return _filtrar_articulos_por_entidad(df, 'pp')
 
 def filtrar_comentarios_por_bng(df):
     """
     Filtra artículos que tienen comentarios mencionando BNG/Bloque
     """
-    def contiene_bng_en_comentarios(row):
-        bng_keywords = ["bng", "bloque nacionalista", "bloque"]
-        
-        for i in range(1, 16):
-            comment_text = row.get(f'comment_{i}_text', '')
-            if pd.notna(comment_text) and str(comment_text).strip():
-                texto_lower = str(comment_text).lower()
-                for keyword in bng_keywords:
-                    if keyword in texto_lower:
-                        return True
-        return False
-    
-    mask = df.apply(contiene_bng_en_comentarios, axis=1)
-    return df[mask].reset_index(drop=True)
+    return _filtrar_articulos_por_entidad(df, 'bng')
 
 def filtrar_comentarios_por_politicos_general(df):
     """
     Filtra artículos que tienen comentarios mencionando cualquier político local
     """
-    def contiene_politicos_en_comentarios(row):
-        politicos_keywords = ["pazos", "manuel pazos", "ramallo", "maría ramallo", "maria ramallo", "santos", "lucía santos", "lucia santos"]
-        
-        for i in range(1, 16):
-            comment_text = row.get(f'comment_{i}_text', '')
-            if pd.notna(comment_text) and str(comment_text).strip():
-                texto_str = str(comment_text)
-                texto_lower = texto_str.lower()
-                
-                for keyword in politicos_keywords:
-                    if keyword in texto_lower:
-                        return True
-                        
-                # Búsqueda especial para apellidos con mayúscula
-                if ("Pazos" in texto_str or 
-                    "Ramallo" in texto_str or 
-                    "Santos" in texto_str):
-                    return True
-        return False
-    
-    mask = df.apply(contiene_politicos_en_comentarios, axis=1)
-    return df[mask].reset_index(drop=True)
+    return _filtrar_articulos_por_entidad(df, 'politicos_general')
 
 def filtrar_comentarios_por_manuel_pazos(df):
     """
     Filtra artículos que tienen comentarios mencionando Manuel Pazos
     """
-    def contiene_manuel_pazos_en_comentarios(row):
-        for i in range(1, 16):
-            comment_text = row.get(f'comment_{i}_text', '')
-            if pd.notna(comment_text) and str(comment_text).strip():
-                texto_str = str(comment_text)
-                texto_lower = texto_str.lower()
-                
-                if ("Pazos" in texto_str or 
-                    "manuel pazos" in texto_lower or
-                    "pazos" in texto_lower):
-                    return True
-        return False
-    
-    mask = df.apply(contiene_manuel_pazos_en_comentarios, axis=1)
-    return df[mask].reset_index(drop=True)
+    return _filtrar_articulos_por_entidad(df, 'manuel_pazos')
 
 def filtrar_comentarios_por_maria_ramallo(df):
     """
     Filtra artículos que tienen comentarios mencionando María Ramallo
     """
-    def contiene_maria_ramallo_en_comentarios(row):
-        for i in range(1, 16):
-            comment_text = row.get(f'comment_{i}_text', '')
-            if pd.notna(comment_text) and str(comment_text).strip():
-                texto_str = str(comment_text)
-                texto_lower = texto_str.lower()
-                
-                if ("Ramallo" in texto_str or 
-                    "maría ramallo" in texto_lower or
-                    "maria ramallo" in texto_lower or
-                    "ramallo" in texto_lower):
-                    return True
-        return False
-    
-    mask = df.apply(contiene_maria_ramallo_en_comentarios, axis=1)
-    return df[mask].reset_index(drop=True)
+    return _filtrar_articulos_por_entidad(df, 'maria_ramallo')
 
 def filtrar_comentarios_por_lucia_santos(df):
     """
     Filtra artículos que tienen comentarios mencionando Lucía Santos
     """
-    def contiene_lucia_santos_en_comentarios(row):
-        for i in range(1, 16):
-            comment_text = row.get(f'comment_{i}_text', '')
-            if pd.notna(comment_text) and str(comment_text).strip():
-                texto_lower = str(comment_text).lower()
-                
-                if ("lucía santos" in texto_lower or
-                    "lucia santos" in texto_lower):
-                    return True
-        return False
-    
-    mask = df.apply(contiene_lucia_santos_en_comentarios, axis=1)
-    return df[mask].reset_index(drop=True)
+    return _filtrar_articulos_por_entidad(df, 'lucia_santos')
+
+def _comentarios_politicos_con_puntuacion(df, net_score):
+    """
+    Prepara la tabla de salida de comentarios políticos con su net_score
+    """
+    return pd.DataFrame({
+        'article_title': df['title'],
+        'article_date': df['date'],
+        'article_link': df['link'],
+        'article_source': df['source'],
+        'comment_text': df['comment_text'],
+        'comment_author': df['comment_author'],
+        'comment_location': df['comment_location'],
+        'likes': df['likes'],
+        'dislikes': df['dislikes'],
+        'net_score': net_score
+    })
 
 def procesar_comentarios_politicos_populares(df, top_n=20):
     """
     Encuentra los comentarios populares que mencionan contenido político
     
     Args:
-        df: DataFrame con artículos y comentarios ya filtrados por política
+        df: DataFrame largo de comentarios ya filtrados por política
         top_n: Número de comentarios top a devolver
         
     Returns:
         DataFrame con los comentarios políticos más populares
     """
-    comentarios_politicos_populares = []
-    
-    for _, row in df.iterrows():
-        for i in range(1, 16):  # comment_1 a comment_15
-            comment_text = row.get(f'comment_{i}_text', '')
-            comment_likes = row.get(f'comment_{i}_likes', 0)
-            comment_dislikes = row.get(f'comment_{i}_dislikes', 0)
-            comment_author = row.get(f'comment_{i}_author', '')
-            comment_location = row.get(f'comment_{i}_location', '')
-            
-            if (pd.notna(comment_text) and 
-                str(comment_text).strip() and 
-                comment_likes > comment_dislikes):
-                
-                comentarios_politicos_populares.append({
-                    'article_title': row['title'],
-                    'article_date': row['date'],
-                    'article_link': row['link'],
-                    'article_source': row['source'],
-                    'comment_text': comment_text,
-                    'comment_author': comment_author,
-                    'comment_location': comment_location,
-                    'likes': comment_likes,
-                    'dislikes': comment_dislikes,
-                    'net_score': comment_likes - comment_dislikes
-                })
-    
-    # Convertir a DataFrame y ordenar por net_score
-    df_comentarios = pd.DataFrame(comentarios_politicos_populares)
-    if len(df_comentarios) > 0:
-        df_comentarios = df_comentarios.sort_values('net_score', ascending=False)
-    
-    return df_comentarios.head(top_n)
+    populares, _ = rankear_comentarios_por_popularidad(df, top_n)
+    return populares
 
 def procesar_comentarios_politicos_impopulares(df, top_n=20):
     """
     Encuentra los comentarios impopulares que mencionan contenido político
     
     Args:
-        df: DataFrame con artículos y comentarios ya filtrados por política
+        df: DataFrame largo de comentarios ya filtrados por política
         top_n: Número de comentarios top a devolver
         
     Returns:
         DataFrame con los comentarios políticos más impopulares
     """
-    comentarios_politicos_impopulares = []
-    
-    for _, row in df.iterrows():
-        for i in range(1, 16):  # comment_1 a comment_15
-            comment_text = row.get(f'comment_{i}_text', '')
-            comment_likes = row.get(f'comment_{i}_likes', 0)
-            comment_dislikes = row.get(f'comment_{i}_dislikes', 0)
-            comment_author = row.get(f'comment_{i}_author', '')
-            comment_location = row.get(f'comment_{i}_location', '')
-            
-            if (pd.notna(comment_text) and 
-                str(comment_text).strip() and 
-                comment_dislikes > comment_likes):
-                
-                comentarios_politicos_impopulares.append({
-                    'article_title': row['title'],
-                    'article_date': row['date'],
-                    'article_link': row['link'],
-                    'article_source': row['source'],
-                    'comment_text': comment_text,
-                    'comment_author': comment_author,
-                    'comment_location': comment_location,
-                    'likes': comment_likes,
-                    'dislikes': comment_dislikes,
-                    'net_score': comment_dislikes - comment_likes
-                })
+    impopulares = df[df['dislikes'] > df['likes']]
+    df_comentarios = _comentarios_politicos_con_puntuacion(impopulares, impopulares['dislikes'] - impopulares['likes'])
     
-    # Convertir a DataFrame y ordenar por net_score (mayor diferencia negativa)
-    df_comentarios = pd.DataFrame(comentarios_politicos_impopulares)
-    if len(df_comentarios) > 0:
-        df_comentarios = df_comentarios.sort_values('net_score', ascending=True)
+    # Ordenar por net_score (mayor diferencia negativa)
+    df_comentarios = df_comentarios.sort_values('net_score', ascending=True, kind='stable')
     
-    return df_comentarios.head(top_n)
+    return df_comentarios.head(top_n).reset_index(drop=True)
 
 def procesar_articulos_politicos_polemicos(df, top_n=20):
     """
     Encuentra los artículos más polémicos que tienen comentarios políticos
     
     Args:
-        df: DataFrame con artículos y comentarios ya filtrados por política
+        df: DataFrame largo de comentarios ya filtrados por política
         top_n: Número de artículos top a devolver
         
     Returns:
         DataFrame con los artículos políticos más polémicos
     """
-    # Crear una copia del dataframe
-    df_processed = df.copy()
-    
-    # Calcular la longitud total de texto de comentarios por artículo
-    df_processed['total_comment_length'] = 0
-    
-    for i in range(1, 16):  # comment_1 a comment_15
-        comment_col = f'comment_{i}_text'
-        if comment_col in df.columns:
-            df_processed[comment_col] = df_processed[comment_col].fillna('')
-            df_processed['total_comment_length'] += df_processed[comment_col].astype(str).str.len()
-    
-    # Ordenar primero por número de comentarios, luego por longitud total
-    df_sorted = df_processed.sort_values(['n_comments', 'total_comment_length'], ascending=[False, False])
-    
-    return df_sorted.head(top_n)
\ No newline at end of file
+    return procesar_articulos_polemicos(df, top_n=top_n)
@@ -0,0 +1,449 @@
+"""
+Query Engine - HorizontAI
+==========================
+
+Motor de consultas embebido sobre las tablas de artículos y comentarios.
+
+Las consultas de la app (periodo, región, entidad, top_n) se
+traducen a SQL parametrizado para que el filtrado y la agregación se hagan
+dentro del motor y no fila a fila en pandas. Las tablas paginadas también
+delegan en el motor el orden y el recorte de la página (ORDER BY, LIMIT/OFFSET):
+- DuckDB en memoria si está instalado (consulta directamente los DataFrames)
+- SQLite en su defecto, usando horizontai.db generada por el pipeline
+  (o una copia en memoria a partir de los CSVs si la base no existe)
+
+La búsqueda de texto usa siempre SQLite FTS5 (articles_fts sobre los títulos y
+comments_fts sobre el texto de los comentarios), con un tokenizador que no
+distingue mayúsculas ni acentos, válido para castellano y gallego ("Marín" =
+"marin"). El índice viene en horizontai.db; si la base no lo tiene se construye
+en memoria al primer uso.
+
+Las conexiones se abren por versión de datos (instantánea publicada, ver
+data_snapshots): las consultas de una vista van siempre a la versión de la que
+salió, y al publicarse una nueva la siguiente carga abre su propia conexión.
+
+Todo se ejecuta dentro del proceso, sin servicios externos.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from functools import lru_cache
+
+import pandas as pd
+
+from .comments_index import cargar_bits_region, crear_indice_texto
+from .data_schema import aplicar_esquema, leer_csv
+from .data_snapshots import ruta_publicada, version_actual
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+ARCHIVO_BASE_DATOS = "horizontai.db"
+
+# Conexiones abiertas a la vez: la versión publicada y la anterior
+VERSIONES_ABIERTAS = 2
+
+# Bits de región leídos de las mismas reglas que usa filter-advanced.py
+BITS_REGION = cargar_bits_region()
+
+# Las conexiones se comparten entre las sesiones de Streamlit: una consulta a la vez
+_BLOQUEO_CONEXION = threading.Lock()
+_BLOQUEO_INDICE = threading.Lock()
+
+def ruta_tabla(archivo, version):
+    """Ruta de un archivo de filtered-data en la versión de datos indicada"""
+    return ruta_publicada(f"filtered-data/{archivo}", version)
+
+def obtener_conexion(version=None):
+    """
+    Conexión al motor embebido para una versión de datos (por defecto la publicada)
+
+    Returns:
+        tuple: (nombre_motor, conexion)
+    """
+    return _abrir_conexion(version_datos() if version is None else version)
+
+@lru_cache(maxsize=VERSIONES_ABIERTAS)
+def _abrir_conexion(version):
+    """Abre (una sola vez por versión) la conexión al motor embebido"""
+    tablas = ['articles', 'comments']
+
+    if duckdb is not None:
+        conexion = duckdb.connect()
+        for tabla in tablas:
+            conexion.register(tabla, leer_csv(ruta_tabla(f"{tabla}.csv", version)))
+        print("🦆 Motor de consultas: DuckDB en memoria")
+        return 'duckdb', conexion
+
+    ruta_bd = ruta_tabla(ARCHIVO_BASE_DATOS, version)
+    if os.path.exists(ruta_bd):
+        conexion = sqlite3.connect(f"file:{ruta_bd}?mode=ro", uri=True, check_same_thread=False)
+        print(f"🗄️ Motor de consultas: SQLite ({ARCHIVO_BASE_DATOS})")
+        return 'sqlite', conexion
+
+    # Sin base generada por el pipeline: construirla en memoria desde los CSVs
+    conexion = sqlite3.connect(":memory:", check_same_thread=False)
+    for tabla in tablas:
+        pd.read_csv(ruta_tabla(f"{tabla}.csv", version)).to_sql(tabla, conexion, index=False)
+    print("🗄️ Motor de consultas: SQLite en memoria (desde CSVs)")
+    return 'sqlite', conexion
+
+def motor_disponible():
+    """Indica si se puede usar el motor de consultas embebido"""
+    try:
+        obtener_conexion()
+        return True
+    except Exception as e:
+        print(f"⚠️ Motor de consultas no disponible, se usa pandas: {e}")
+        return False
+
+def ejecutar_consulta(sql, parametros=(), version=None):
+    """
+    Ejecuta una consulta parametrizada sobre una versión de datos (por defecto
+    la publicada) y devuelve un DataFrame con los tipos compactos del esquema
+    (ver data_schema)
+    """
+    motor, conexion = obtener_conexion(version)
+    with _BLOQUEO_CONEXION:
+        if motor == 'duckdb':
+            resultado = conexion.execute(sql, list(parametros)).df()
+        else:
+            resultado = pd.read_sql_query(sql, conexion, params=list(parametros))
+    return aplicar_esquema(resultado)
+
+def version_datos():
+    """
+    Versión de los datos: la instantánea publicada por el pipeline o, si aún no
+    hay ninguna, la fecha de modificación más reciente de las tablas
+    """
+    version = version_actual()
+    if version is not None:
+        return version
+    return max(
+        os.path.getmtime(ruta_tabla(archivo, None))
+        for archivo in ("articles.csv", "comments.csv")
+    )
+
+def etiquetar_consulta(df, **parametros):
+    """
+    Anota en df.attrs los parámetros de consulta que describen a df (region,
+    prefijo_fecha, article_ids) para que los procesadores puedan resolverlo en SQL.
+
+    Se guarda también el número de filas: si luego df se filtra por otra vía,
+    la etiqueta deja de ser válida y se vuelve a pandas.
+    """
+    consulta = dict(df.attrs.get('consulta', {}))
+    consulta.update(parametros)
+    consulta['n_filas'] = len(df)
+    df.attrs['consulta'] = consulta
+    return df
+
+def parametros_consulta(df):
+    """
+    Devuelve los parámetros de consulta de df si siguen siendo válidos, o None
+    """
+    consulta = df.attrs.get('consulta')
+    if not consulta or consulta.get('n_filas') != len(df) or consulta.get('region') not in BITS_REGION:
+        return None
+    if not motor_disponible():
+        return None
+    return consulta
+
+def _condiciones(region, prefijo_fecha=None, article_ids=None):
+    """
+    Construye la cláusula WHERE común (región, periodo y entidad) y sus parámetros
+    """
+    condiciones = ["(c.regiones & ?) != 0"]
+    parametros = [BITS_REGION[region]]
+
+    if prefijo_fecha:
+        condiciones.append("CAST(a.date AS VARCHAR) LIKE ?")
+        parametros.append(f"{prefijo_fecha}%")
+
+    if article_ids is not None:
+        if len(article_ids) == 0:
+            condiciones.append("1 = 0")
+        else:
+            condiciones.append(f"a.article_id IN ({', '.join('?' * len(article_ids))})")
+            parametros.extend(int(article_id) for article_id in article_ids)
+
+    return " AND ".join(condiciones), parametros
+
+def consultar_vista(region, prefijo_fecha=None, article_ids=None, version=None):
+    """
+    Tabla larga de comentarios de la región unida a sus artículos
+
+    Returns:
+        DataFrame con una fila por comentario (mismo formato que data_loaders.construir_vista_comentarios)
+    """
+    where, parametros = _condiciones(region, prefijo_fecha, article_ids)
+    sql = f"""
+        SELECT a.*,
+               c.comment_index,
+               c.author AS comment_author,
+               c.location AS comment_location,
+               c.date AS comment_date,
+               c.text AS comment_text,
+               c.likes,
+               c.dislikes
+        FROM articles a
+        JOIN comments c ON c.article_id = a.article_id
+        WHERE {where}
+        ORDER BY a.article_id, c.comment_index
+    """
+    return ejecutar_consulta(sql, parametros, version=version)
+
+def consultar_articulos_polemicos(region, prefijo_fecha=None, article_ids=None, top_n=20, desempate_longitud=True, version=None):
+    """
+    Artículos con más comentarios (y mayor longitud total de comentarios)
+
+    Args:
+        region: clave de BITS_REGION
+        prefijo_fecha: prefijo de la fecha del artículo ('2025-05', '2025' o None)
+        article_ids: artículos permitidos por el filtro de entidad (None = todos)
+        top_n: número de artículos a devolver
+        desempate_longitud: ordenar también por total_comment_length
+        version: versión de datos de la vista (None = la publicada)
+
+    Returns:
+        DataFrame de artículos con n_comments y total_comment_length
+    """
+    where, parametros = _condiciones(region, prefijo_fecha, article_ids)
+    orden = "n_comments DESC, total_comment_length DESC" if desempate_longitud else "n_comments DESC"
+    sql = f"""
+        SELECT a.article_id,
+               a.title,
+               a.date,
+               a.source,
+               a.link,
+               CASE WHEN COUNT(*) > COALESCE(a.n_comments, 0) THEN COUNT(*) ELSE COALESCE(a.n_comments, 0) END AS n_comments,
+               SUM(LENGTH(COALESCE(c.text, ''))) AS total_comment_length,
+               0 AS n_visualizations,
+               '' AS summary
+        FROM articles a
+        JOIN comments c ON c.article_id = a.article_id
+        WHERE {where}
+        GROUP BY a.article_id, a.title, a.date, a.source, a.link, a.n_comments
+        ORDER BY {orden}, a.article_id
+        LIMIT ?
+    """
+    return ejecutar_consulta(sql, parametros + [int(top_n)], version=version)
+
+# Columnas por las que se puede ordenar cada tabla paginada (nombre → expresión SQL)
+ORDEN_ARTICULOS = {
+    'n_comments': 'n_comments',
+    'total_comment_length': 'total_comment_length',
+    'date': 'date'
+}
+
+ORDEN_COMENTARIOS = {
+    'net_score': 'net_score',
+    'likes': 'c.likes',
+    'dislikes': 'c.dislikes',
+    'comment_date': 'c.date',
+    'article_date': 'a.date'
+}
+
+def _orden_sql(columnas, orden, descendente):
+    """Cláusula de orden a partir de una columna permitida (nunca se interpola texto del usuario)"""
+    if orden not in columnas:
+        raise ValueError(f"Columna de orden no permitida: {orden}")
+    return f"{columnas[orden]} {'DESC' if descendente else 'ASC'}"
+
+def contar_articulos(region, prefijo_fecha=None, article_ids=None, version=None):
+    """Número de artículos con comentarios de la región (para paginar)"""
+    where, parametros = _condiciones(region, prefijo_fecha, article_ids)
+    sql = f"""
+        SELECT COUNT(DISTINCT a.article_id) AS total
+        FROM articles a
+        JOIN comments c ON c.article_id = a.article_id
+        WHERE {where}
+    """
+    return int(ejecutar_consulta(sql, parametros, version=version)['total'].iloc[0])
+
+def consultar_pagina_articulos(region, prefijo_fecha=None, article_ids=None, offset=0, limite=50, orden='n_comments', descendente=True, version=None):
+    """
+    Una página del ranking completo de artículos por comentarios
+
+    Args:
+        region, prefijo_fecha, article_ids: filtros comunes (ver _condiciones)
+        version: versión de datos de la vista (None = la publicada)
+        offset: primera fila de la página
+        limite: filas por página
+        orden: clave de ORDEN_ARTICULOS
+        descendente: sentido del orden
+
+    Returns:
+        DataFrame con las filas de la página (mismas columnas que consultar_articulos_polemicos)
+    """
+    where, parametros = _condiciones(region, prefijo_fecha, article_ids)
+    sql = f"""
+        SELECT *
+        FROM (
+            SELECT a.article_id,
+                   a.title,
+                   a.date,
+                   a.source,
+                   a.link,
+                   CASE WHEN COUNT(*) > COALESCE(a.n_comments, 0) THEN COUNT(*) ELSE COALESCE(a.n_comments, 0) END AS n_comments,
+                   SUM(LENGTH(COALESCE(c.text, ''))) AS total_comment_length
+            FROM articles a
+            JOIN comments c ON c.article_id = a.article_id
+            WHERE {where}
+            GROUP BY a.article_id, a.title, a.date, a.source, a.link, a.n_comments
+        ) articulos
+        ORDER BY {_orden_sql(ORDEN_ARTICULOS, orden, descendente)}, article_id
+        LIMIT ? OFFSET ?
+    """
+    return ejecutar_consulta(sql, parametros + [int(limite), int(offset)], version=version)
+
+def contar_comentarios(region, prefijo_fecha=None, article_ids=None, version=None):
+    """Número de comentarios de la región (para paginar)"""
+    where, parametros = _condiciones(region, prefijo_fecha, article_ids)
+    sql = f"""
+        SELECT COUNT(*) AS total
+        FROM articles a
+        JOIN comments c ON c.article_id = a.article_id
+        WHERE {where}
+    """
+    return int(ejecutar_consulta(sql, parametros, version=version)['total'].iloc[0])
+
+def consultar_pagina_comentarios(region, prefijo_fecha=None, article_ids=None, offset=0, limite=50, orden='net_score', descendente=True, version=None):
+    """
+    Una página de todos los comentarios con su artículo
+
+    Args:
+        region, prefijo_fecha, article_ids: filtros comunes (ver _condiciones)
+        version: versión de datos de la vista (None = la publicada)
+        offset: primera fila de la página
+        limite: filas por página
+        orden: clave de ORDEN_COMENTARIOS
+        descendente: sentido del orden
+
+    Returns:
+        DataFrame con las filas de la página
+    """
+    where, parametros = _condiciones(region, prefijo_fecha, article_ids)
+    sql = f"""
+        SELECT a.article_id,
+               a.title AS article_title,
+               a.date AS article_date,
+               a.link AS article_link,
+               c.comment_index,
+               c.author AS comment_author,
+               c.location AS comment_location,
+               c.date AS comment_date,
+               c.text AS comment_text,
+               c.likes,
+               c.dislikes,
+               c.likes - c.dislikes AS net_score
+        FROM articles a
+        JOIN comments c ON c.article_id = a.article_id
+        WHERE {where}
+        ORDER BY {_orden_sql(ORDEN_COMENTARIOS, orden, descendente)}, a.article_id, c.comment_index
+        LIMIT ? OFFSET ?
+    """
+    return ejecutar_consulta(sql, parametros + [int(limite), int(offset)], version=version)
+
+def obtener_indice_texto(version=None):
+    """Conexión SQLite con el índice de texto de una versión de datos (por defecto la publicada)"""
+    return _abrir_indice_texto(version_datos() if version is None else version)
+
+@lru_cache(maxsize=VERSIONES_ABIERTAS)
+def _abrir_indice_texto(version):
+    """
+    Abre (una sola vez por versión) la conexión SQLite con el índice de texto
+
+    Usa horizontai.db si ya trae las tablas FTS; si no, copia los CSVs a una
+    base en memoria y construye allí el índice.
+    """
+    ruta_bd = ruta_tabla(ARCHIVO_BASE_DATOS, version)
+    if os.path.exists(ruta_bd):
+        conexion = sqlite3.connect(f"file:{ruta_bd}?mode=ro", uri=True, check_same_thread=False)
+        tablas = {fila[0] for fila in conexion.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if {'articles_fts', 'comments_fts'} <= tablas:
+            print(f"🔎 Índice de texto: SQLite FTS5 ({ARCHIVO_BASE_DATOS})")
+            return conexion
+        conexion.close()
+
+    conexion = sqlite3.connect(":memory:", check_same_thread=False)
+    for tabla in ('articles', 'comments'):
+        pd.read_csv(ruta_tabla(f"{tabla}.csv", version)).to_sql(tabla, conexion, index=False)
+    crear_indice_texto(conexion)
+    print("🔎 Índice de texto: SQLite FTS5 en memoria (desde CSVs)")
+    return conexion
+
+def expresion_busqueda(texto):
+    """
+    Traduce el texto del buscador a una expresión MATCH de FTS5
+
+    Cada palabra se busca como término exacto y todas deben aparecer; las
+    frases entre comillas se buscan seguidas y un '*' final busca por prefijo
+    ("socialis*"). Todo va entre comillas, así que el texto del usuario nunca
+    se interpreta como sintaxis de FTS5.
+
+    Returns:
+        str o None si el texto no contiene ningún término
+    """
+    terminos = []
+    for frase, palabra in re.findall(r'"([^"]*)"|(\S+)', texto or ''):
+        termino = frase or palabra
+        prefijo = termino.endswith('*')
+        termino = termino.strip('*').strip()
+        if termino:
+            terminos.append(f'"{termino}"' + ('*' if prefijo else ''))
+    return ' '.join(terminos) if terminos else None
+
+def _consultar_indice(sql, parametros, version=None):
+    """Ejecuta una consulta sobre la conexión del índice de texto"""
+    conexion = obtener_indice_texto(version)
+    with _BLOQUEO_INDICE:
+        return pd.read_sql_query(sql, conexion, params=list(parametros))
+
+def comentarios_que_mencionan(texto, version=None):
+    """
+    Comentarios cuyo texto contiene los términos buscados, por relevancia (bm25),
+    en la versión de datos indicada (None = la publicada)
+
+    Returns:
+        DataFrame con article_id, comment_index y relevancia (menor = más relevante)
+    """
+    expresion = expresion_busqueda(texto)
+    if expresion is None:
+        return pd.DataFrame(columns=['article_id', 'comment_index', 'relevancia'])
+
+    sql = """
+        SELECT c.article_id,
+               c.comment_index,
+               bm25(comments_fts) AS relevancia
+        FROM comments_fts
+        JOIN comments c ON c.rowid = comments_fts.rowid
+        WHERE comments_fts MATCH ?
+        ORDER BY relevancia
+    """
+    return _consultar_indice(sql, [expresion], version)
+
+def articulos_que_mencionan(texto, version=None):
+    """
+    Artículos cuyo título contiene los términos buscados, en la versión de
+    datos indicada (None = la publicada)
+
+    Returns:
+        list: article_id de los artículos, por relevancia
+    """
+    expresion = expresion_busqueda(texto)
+    if expresion is None:
+        return []
+
+    sql = """
+        SELECT a.article_id
+        FROM articles_fts
+        JOIN articles a ON a.rowid = articles_fts.rowid
+        WHERE articles_fts MATCH ?
+        ORDER BY bm25(articles_fts)
+    """
+    return [int(article_id) for article_id in _consultar_indice(sql, [expresion], version)['article_id']]
@@ -0,0 +1,175 @@
+"""
+Ranking Processors - HorizontAI
+================================
+
+Rankings vectorizados sobre la tabla larga de comentarios.
+
+Los comentarios populares e impopulares se calculan juntos en una sola pasada
+sobre arrays de NumPy (net_score = likes - dislikes) con selección parcial
+(np.partition) en lugar de ordenar todos los comentarios. El resultado se
+guarda en la caché de resultados (result_cache) por (versión de datos, región,
+periodo, entidad, top_n) para que las pestañas que piden el mismo ranking no lo
+recalculen.
+
+Los artículos polémicos se puntúan igual: recuento de comentarios y suma de
+longitudes por artículo con np.bincount y selección parcial del top-N. Los
+comentarios no se copian al resultado; se recuperan por article_id.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .result_cache import memorizar_calculo
+
+def _top_n_indices(valores, posiciones, top_n, descendente):
+    """
+    Devuelve las posiciones de los top_n valores con selección parcial
+
+    El orden es el de un sort estable: por valor y, a igualdad, por posición
+    original. Los empates en el límite se resuelven igual que con sort_values.
+
+    Args:
+        valores: array con el valor de cada candidato
+        posiciones: array con la posición de cada candidato en la tabla
+        top_n: número de elementos a devolver
+        descendente: True para los mayores valores, False para los menores
+
+    Returns:
+        array de posiciones ordenadas
+    """
+    if descendente:
+        valores = -valores
+
+    if len(valores) > top_n:
+        # Umbral del elemento top_n: se quedan todos los que lo igualan para desempatar por posición
+        umbral = np.partition(valores, top_n - 1)[top_n - 1]
+        seleccion = valores <= umbral
+        valores, posiciones = valores[seleccion], posiciones[seleccion]
+
+    orden = np.lexsort((posiciones, valores))
+    return posiciones[orden][:top_n]
+
+def _tabla_comentarios_ranking(df, posiciones):
+    """
+    Construye la tabla de salida de comentarios populares/impopulares con net_score
+    """
+    filas = df.iloc[posiciones]
+    return pd.DataFrame({
+        'article_title': filas['title'].values,
+        'article_date': filas['date'].values,
+        'article_link': filas['link'].values,
+        'article_source': filas['source'].values,
+        'comment_text': filas['comment_text'].values,
+        'comment_author': filas['comment_author'].values,
+        'comment_location': filas['comment_location'].values,
+        'likes': filas['likes'].values,
+        'dislikes': filas['dislikes'].values,
+        'net_score': (filas['likes'] - filas['dislikes']).values
+    })
+
+@memorizar_calculo("popularidad_comentarios")
+def rankear_comentarios_por_popularidad(df, top_n=20):
+    """
+    Calcula a la vez los comentarios más populares y más impopulares
+
+    Args:
+        df: DataFrame largo de comentarios
+        top_n: Número de comentarios de cada ranking
+
+    Returns:
+        tuple: (populares, impopulares), ordenados por net_score descendente y ascendente
+    """
+    net_score = df['likes'].to_numpy(dtype='int64') - df['dislikes'].to_numpy(dtype='int64')
+    posiciones = np.arange(len(net_score))
+
+    positivos = net_score > 0
+    negativos = net_score < 0
+
+    populares = _tabla_comentarios_ranking(
+        df, _top_n_indices(net_score[positivos], posiciones[positivos], top_n, descendente=True)
+    )
+    impopulares = _tabla_comentarios_ranking(
+        df, _top_n_indices(net_score[negativos], posiciones[negativos], top_n, descendente=False)
+    )
+
+    return populares, impopulares
+
+# Columnas del artículo que se arrastran al puntuar artículos polémicos
+COLUMNAS_ARTICULO = ['article_id', 'title', 'date', 'source', 'link', 'n_visualizations', 'summary']
+
+def _top_n_lexicografico(claves, top_n):
+    """
+    Posiciones de los top_n elementos ordenados por varias claves descendentes
+
+    Se preselecciona con np.partition sobre la primera clave y solo se ordenan
+    los candidatos. A igualdad de todas las claves se respeta la posición original.
+
+    Args:
+        claves: lista de arrays (clave principal primero)
+        top_n: número de elementos a devolver
+
+    Returns:
+        array de posiciones ordenadas
+    """
+    principal = -claves[0]
+    posiciones = np.arange(len(principal))
+
+    if len(principal) > top_n:
+        umbral = np.partition(principal, top_n - 1)[top_n - 1]
+        posiciones = posiciones[principal <= umbral]
+
+    # np.lexsort ordena por la última clave: posición < claves secundarias < principal
+    orden = np.lexsort([posiciones] + [-clave[posiciones] for clave in reversed(claves)])
+    return posiciones[orden][:top_n]
+
+def puntuar_articulos_polemicos(df, top_n=20, desempate_longitud=True, solo_con_comentarios=False):
+    """
+    Puntúa los artículos de la tabla larga por número de comentarios y longitud total
+
+    Args:
+        df: DataFrame largo de comentarios
+        top_n: Número de artículos a devolver
+        desempate_longitud: ordenar también por total_comment_length
+        solo_con_comentarios: descartar artículos con n_comments = 0
+
+    Returns:
+        DataFrame de artículos (con article_id) con n_comments, máximo entre los
+        comentarios encontrados y el contador original, y total_comment_length
+    """
+    if len(df) == 0:
+        return pd.DataFrame()
+
+    codigos, _ = pd.factorize(df['article_id'])
+    n_articulos = codigos.max() + 1
+    primeras = np.unique(codigos, return_index=True)[1]
+
+    textos = df['comment_text'].fillna('').astype(str)
+    encontrados = np.bincount(codigos, weights=textos.str.strip().ne('').to_numpy(), minlength=n_articulos)
+    longitud_total = np.bincount(codigos, weights=textos.str.len().to_numpy(), minlength=n_articulos).astype('int64')
+
+    # Respetar también el contador original n_comments si existe
+    if 'n_comments' in df.columns:
+        originales = pd.to_numeric(df['n_comments'], errors='coerce').fillna(0).to_numpy()[primeras]
+        n_comments = np.maximum(encontrados, originales).astype('int64')
+    else:
+        n_comments = encontrados.astype('int64')
+
+    candidatos = np.arange(n_articulos)
+    if solo_con_comentarios:
+        candidatos = candidatos[n_comments > 0]
+
+    claves = [n_comments[candidatos], longitud_total[candidatos]] if desempate_longitud else [n_comments[candidatos]]
+    seleccion = candidatos[_top_n_lexicografico(claves, top_n)]
+
+    columnas = [col for col in COLUMNAS_ARTICULO if col in df.columns]
+    resultado = df.iloc[primeras[seleccion]][columnas].reset_index(drop=True)
+    resultado['n_comments'] = n_comments[seleccion]
+    resultado['total_comment_length'] = longitud_total[seleccion]
+
+    # Rellenar columnas opcionales que no vienen en los datos de comentarios
+    if 'n_visualizations' not in resultado.columns:
+        resultado['n_visualizations'] = 0
+    if 'summary' not in resultado.columns:
+        resultado['summary'] = ''
+
+    return resultado
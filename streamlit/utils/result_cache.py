@@ -0,0 +1,166 @@
+"""
+Result Cache - HorizontAI
+==========================
+
+Caché LRU de resultados de cálculos del dashboard (análisis de sentimientos,
+rankings...) compartida por todas las sesiones del proceso.
+
+La clave combina el nombre del cálculo, la huella de los datos de entrada
+(versión de datos, región, periodo y entidad) y los parámetros de la llamada
+(top_n, filtro de popularidad, análisis activado...). Las interacciones que no
+cambian la clave, como seleccionar una fila de una tabla, devuelven el
+resultado guardado sin recalcular. Las tablas ya reducidas que se muestran en
+pantalla se identifican por el hash de su contenido (huella_tabla).
+
+La memoria está acotada por número de entradas y por tamaño aproximado,
+expulsando primero lo menos usado.
+"""
+
+import inspect
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+import pandas as pd
+
+MAX_ENTRADAS = 256
+MAX_BYTES = 256 * 1024 * 1024
+
+_RESULTADOS = OrderedDict()  # {clave: (resultado, bytes)}
+_BLOQUEO = threading.Lock()
+_estado = {'bytes': 0, 'aciertos': 0, 'fallos': 0}
+
+def huella_datos(df):
+    """
+    Huella de un DataFrame de comentarios para usarla en claves de caché
+
+    Si df está etiquetado por los data_loaders se usan sus parámetros de consulta;
+    si no, la huella de todo su contenido (huella_tabla), porque el cálculo
+    puede leer cualquier columna: likes, texto...
+    """
+    consulta = df.attrs.get('consulta')
+    if consulta and consulta.get('n_filas') == len(df) and 'version' in consulta:
+        article_ids = consulta.get('article_ids')
+        return (
+            consulta['version'],
+            consulta.get('region'),
+            consulta.get('prefijo_fecha'),
+            tuple(article_ids) if article_ids is not None else None
+        )
+
+    return huella_tabla(df)
+
+def huella_tabla(df):
+    """
+    Huella del contenido completo de una tabla ya reducida (top-N, comentarios de un artículo)
+
+    Pensada para las tablas que se muestran en pantalla, donde hashear todas las
+    columnas es barato. Las columnas con valores no hashables (dicts y listas
+    del análisis de sentimientos) se hashean por su representación en texto.
+    Devuelve None si aun así no se puede hashear.
+    """
+    try:
+        hashes = pd.util.hash_pandas_object(df, index=False)
+    except TypeError:
+        try:
+            objetos = df.select_dtypes(include='object').columns
+            hashes = pd.util.hash_pandas_object(df.astype({col: str for col in objetos}), index=False)
+        except TypeError:
+            return None
+    return ('tabla', tuple(df.columns), len(df), int(hashes.sum()))
+
+def _tamano(resultado):
+    """Tamaño aproximado en bytes de un resultado (DataFrames dentro de tuplas e imágenes incluidos)"""
+    elementos = resultado if isinstance(resultado, tuple) else (resultado,)
+    tamano = 0
+    for elemento in elementos:
+        if isinstance(elemento, pd.DataFrame):
+            tamano += int(elemento.memory_usage(deep=True).sum())
+        elif isinstance(elemento, bytes):
+            tamano += len(elemento)
+    return tamano
+
+def _copiar(resultado):
+    """Copia los DataFrames del resultado para que quien llama no modifique la caché"""
+    if isinstance(resultado, tuple):
+        return tuple(elemento.copy() if isinstance(elemento, pd.DataFrame) else elemento for elemento in resultado)
+    return resultado.copy() if isinstance(resultado, pd.DataFrame) else resultado
+
+def obtener_o_calcular(clave, calcular, es_cacheable=lambda resultado: True, copiar=True):
+    """
+    Devuelve el resultado guardado para la clave o lo calcula y lo guarda
+
+    Args:
+        clave: tupla hashable que identifica el cálculo
+        calcular: función sin argumentos que produce el resultado
+        es_cacheable: función que decide si un resultado se guarda (p. ej. no guardar errores)
+        copiar: False para devolver el objeto guardado (solo si quien llama no lo modifica)
+
+    Returns:
+        El resultado (una copia si viene de la caché y copiar es True)
+    """
+    with _BLOQUEO:
+        if clave in _RESULTADOS:
+            _RESULTADOS.move_to_end(clave)
+            _estado['aciertos'] += 1
+            guardado = _RESULTADOS[clave][0]
+            return _copiar(guardado) if copiar else guardado
+        _estado['fallos'] += 1
+
+    resultado = calcular()
+    if not es_cacheable(resultado):
+        return resultado
+
+    tamano = _tamano(resultado)
+    with _BLOQUEO:
+        if clave in _RESULTADOS:
+            _estado['bytes'] -= _RESULTADOS.pop(clave)[1]
+        _RESULTADOS[clave] = (resultado, tamano)
+        _estado['bytes'] += tamano
+
+        # Expulsar lo menos usado hasta volver a los límites
+        while len(_RESULTADOS) > MAX_ENTRADAS or (_estado['bytes'] > MAX_BYTES and len(_RESULTADOS) > 1):
+            _, (_, tamano_expulsado) = _RESULTADOS.popitem(last=False)
+            _estado['bytes'] -= tamano_expulsado
+
+    return _copiar(resultado) if copiar else resultado
+
+def memorizar_calculo(nombre, es_cacheable=lambda resultado: True):
+    """
+    Decorador para funciones cuyo primer argumento es el DataFrame de comentarios
+
+    La clave es (nombre, huella de df, resto de argumentos). Un argumento
+    'analizador' se reduce a si está disponible o no, ya que la instancia no es
+    comparable entre sesiones.
+    """
+    def decorador(func):
+        firma = inspect.signature(func)
+
+        @wraps(func)
+        def envoltura(df, *args, **kwargs):
+            huella = huella_datos(df)
+            if huella is None:
+                return func(df, *args, **kwargs)
+
+            argumentos = firma.bind(df, *args, **kwargs)
+            argumentos.apply_defaults()
+            parametros = []
+            for parametro, valor in list(argumentos.arguments.items())[1:]:
+                if parametro == 'analizador':
+                    valor = valor is not None
+                parametros.append((parametro, valor))
+
+            clave = (nombre, huella, tuple(parametros))
+            return obtener_o_calcular(clave, lambda: func(df, *args, **kwargs), es_cacheable)
+        return envoltura
+    return decorador
+
+def estadisticas_cache():
+    """Entradas, memoria aproximada y aciertos/fallos de la caché"""
+    with _BLOQUEO:
+        return {
+            'entradas': len(_RESULTADOS),
+            'bytes': _estado['bytes'],
+            'aciertos': _estado['aciertos'],
+            'fallos': _estado['fallos']
+        }
@@ -0,0 +1,103 @@
+"""
+Search Processors - HorizontAI
+===============================
+
+Búsqueda de términos libres sobre la tabla larga de comentarios usando el
+índice de texto FTS5 del motor de consultas (ver query_engine). El índice no
+distingue mayúsculas ni acentos, así que "marin" encuentra "Marín".
+
+El índice devuelve los (article_id, comment_index) que coinciden y aquí se
+cruzan con las filas de df, de modo que la búsqueda respeta la región, el
+periodo y los filtros de entidad ya aplicados.
+"""
+
+import pandas as pd
+
+from .query_engine import articulos_que_mencionan, comentarios_que_mencionan
+
+def _version(df):
+    """Versión de datos de la que salió df (None si no está etiquetado: la publicada)"""
+    return df.attrs.get('consulta', {}).get('version')
+
+def _claves_comentario(df):
+    """Índice (article_id, comment_index) de las filas de df"""
+    return pd.MultiIndex.from_arrays([
+        df['article_id'].astype('int64'),
+        df['comment_index'].astype('int64')
+    ])
+
+def marcar_coincidencias(df, texto):
+    """
+    Filas de df cuyo comentario contiene los términos buscados
+
+    Args:
+        df: DataFrame largo de comentarios (una fila por comentario)
+        texto: texto del buscador (ver query_engine.expresion_busqueda)
+
+    Returns:
+        Serie booleana con el índice de df
+    """
+    coincidencias = comentarios_que_mencionan(texto, _version(df))
+    if len(df) == 0 or len(coincidencias) == 0:
+        return pd.Series(False, index=df.index)
+
+    encontrados = pd.MultiIndex.from_arrays([
+        coincidencias['article_id'].astype('int64'),
+        coincidencias['comment_index'].astype('int64')
+    ])
+    return pd.Series(_claves_comentario(df).isin(encontrados), index=df.index)
+
+def marcar_articulos_con_coincidencias(df, texto, incluir_titulos=False):
+    """
+    Filas de df de los artículos en los que algún comentario (o el título, si
+    incluir_titulos) contiene los términos buscados
+
+    Returns:
+        Serie booleana con el índice de df
+    """
+    menciona = marcar_coincidencias(df, texto)
+    menciona_articulo = menciona.groupby(df['article_id']).transform('any') if len(df) else menciona
+    if incluir_titulos:
+        menciona_articulo |= df['article_id'].isin(articulos_que_mencionan(texto, _version(df)))
+    return menciona_articulo
+
+def buscar_comentarios(df, texto, limite=100):
+    """
+    Comentarios de df que contienen los términos buscados, los más relevantes primero
+
+    Args:
+        df: DataFrame largo de comentarios
+        texto: texto del buscador
+        limite: número máximo de comentarios
+
+    Returns:
+        tuple: (DataFrame con los comentarios, número total de coincidencias)
+    """
+    coincidencias = comentarios_que_mencionan(texto, _version(df))
+    if len(df) == 0 or len(coincidencias) == 0:
+        return pd.DataFrame(), 0
+
+    # Las coincidencias ya vienen por relevancia: se recorren en ese orden
+    encontrados = pd.MultiIndex.from_arrays([
+        coincidencias['article_id'].astype('int64'),
+        coincidencias['comment_index'].astype('int64')
+    ])
+    posiciones = _claves_comentario(df).get_indexer_for(encontrados)
+    posiciones = posiciones[posiciones >= 0]
+
+    filas = df.iloc[posiciones[:limite]]
+    resultado = pd.DataFrame({
+        'article_id': filas['article_id'].values,
+        'article_title': filas['title'].values,
+        'article_date': filas['date'].values,
+        'article_link': filas['link'].values,
+        'comment_index': filas['comment_index'].values,
+        'comment_author': filas['comment_author'].values,
+        'comment_location': filas['comment_location'].values,
+        'comment_date': filas['comment_date'].values,
+        'comment_text': filas['comment_text'].values,
+        'likes': filas['likes'].values,
+        'dislikes': filas['dislikes'].values,
+        'net_score': (filas['likes'] - filas['dislikes']).values
+    })
+    return resultado, len(posiciones)
@@ -1,144 +1,197 @@
-# En statistics.py - cambiar plt.show() por st.pyplot()
-import streamlit as st
+"""
+Statistics - HorizontAI
+========================
+
+Gráficos de estadísticas de visualizaciones (por político, partido, mes y temática).
+
+Los agregados de los cuatro gráficos se calculan juntos en una sola pasada
+sobre los títulos y los gráficos se dibujan una sola vez a PNG. Ambos se
+guardan en la caché de resultados por la huella del contenido de la tabla,
+así que los reruns solo envían a pantalla los bytes ya generados.
+"""
+
+import io
+import re
+
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+import streamlit as st
+from matplotlib.figure import Figure
+
+from .result_cache import huella_tabla, obtener_o_calcular
+
+# Menciones en el título (se buscan sobre el título en minúsculas)
+PATRONES_POLITICOS = {
+    'Ramallo': "ramallo",
+    'Pazos': "pazos",
+    'Santos': "santos"
+}
+
+PATRONES_PARTIDOS = {
+    'PP': r"\bpp\b|partido popular",
+    'PSOE': "psoe|partido socialista",
+    'BNG': "bng|bloque"
+}
+
+# Temáticas por palabras clave del título (o resumen); gana la primera que coincide
+TEMATICAS = [
+    ("🏛️ Política", ["ramallo", "pazos", "santos", "concejal", "concelleiro", "alcaldesa", "alcalde", "candidato"]),
+    ("🕊️ Necrológicas", ["falleció", "esquela", "funeral", "necrológica", "velatorio"]),
+    ("🎉 Festividades", ["fiesta", "verbena", "festival", "romería", "celebración"]),
+    ("🚌 Transporte", ["bus", "autobús", "tráfico", "movilidad", "transporte"]),
+    ("💭 Opinión", ["opinión", "editorial", "carta al director"])
+]
+TEMATICA_POR_DEFECTO = "📄 Otra"
+
+COLUMNAS_AGREGADOS = ['title', 'summary', 'date', 'n_visualizations']
+
+def calcular_agregados_visualizaciones(vis_total: pd.DataFrame):
+    """
+    Visualizaciones por político, partido, mes y temática en una sola pasada
+
+    Los títulos se pasan a minúsculas una vez y cada grupo de palabras clave se
+    busca con un único patrón. vis_total no se modifica.
+
+    Returns:
+        dict de Series {'politicos', 'partidos', 'meses', 'tematicas'}
+    """
+    visualizaciones = vis_total['n_visualizations']
+    titulos = vis_total['title'].fillna('').astype(str).str.lower()
+
+    def sumar_menciones(patrones):
+        return pd.Series({
+            nombre: visualizaciones[titulos.str.contains(patron)].sum()
+            for nombre, patron in patrones.items()
+        })
+
+    meses = visualizaciones.groupby(vis_total['date'].astype(str).str[:7]).sum()
+
+    textos = vis_total['title']
+    if 'summary' in vis_total.columns:
+        textos = textos.combine_first(vis_total['summary'])
+    textos = textos.astype(str).str.lower()
+    tematica = np.select(
+        [textos.str.contains('|'.join(map(re.escape, palabras))) for _, palabras in TEMATICAS],
+        [nombre for nombre, _ in TEMATICAS],
+        default=TEMATICA_POR_DEFECTO
+    )
+    tematicas = visualizaciones.groupby(tematica).sum().sort_values(ascending=False)
+    tematicas = tematicas[tematicas.index != TEMATICA_POR_DEFECTO]
+
+    return {
+        'politicos': sumar_menciones(PATRONES_POLITICOS),
+        'partidos': sumar_menciones(PATRONES_PARTIDOS),
+        'meses': meses,
+        'tematicas': tematicas
+    }
+
+def _huella_visualizaciones(vis_total):
+    """Huella del contenido de las columnas que usan los gráficos"""
+    return huella_tabla(vis_total[[col for col in COLUMNAS_AGREGADOS if col in vis_total.columns]])
+
+def obtener_agregados_visualizaciones(vis_total: pd.DataFrame):
+    """Agregados de calcular_agregados_visualizaciones, memorizados por la huella de vis_total"""
+    huella = _huella_visualizaciones(vis_total)
+    if huella is None:
+        return calcular_agregados_visualizaciones(vis_total)
+    return obtener_o_calcular(
+        ('agregados_visualizaciones', huella),
+        lambda: calcular_agregados_visualizaciones(vis_total),
+        copiar=False
+    )
+
+def _dibujar_barras(ax, serie, colores):
+    ax.bar(serie.index, serie.values, color=colores)
+
+def _dibujar_linea(ax, serie, color):
+    ax.plot(serie.index, serie.values, marker='o', color=color)
+    ax.tick_params(axis='x', labelrotation=45)
+
+def _dibujar_barras_rotadas(ax, serie, color):
+    serie.plot(kind='bar', ax=ax, color=color)
+    ax.tick_params(axis='x', labelrotation=45)
+    for etiqueta in ax.get_xticklabels():
+        etiqueta.set_horizontalalignment('right')
+
+# Cómo se dibuja cada agregado: tamaño, función de dibujo, color(es) y ejes
+GRAFICOS = {
+    'politicos': {'figsize': (8, 5), 'dibujar': _dibujar_barras, 'color': ['#FF6B6B', '#4ECDC4', '#45B7D1'], 'xlabel': "Político", 'ylabel': "Visualizaciones"},
+    'partidos': {'figsize': (8, 5), 'dibujar': _dibujar_barras, 'color': ['#6C5CE7', '#FD79A8', '#00B894'], 'xlabel': "Partido", 'ylabel': "Visualizaciones"},
+    'meses': {'figsize': (10, 4), 'dibujar': _dibujar_linea, 'color': '#E17055', 'xlabel': "Mes", 'ylabel': "Visualizaciones"},
+    'tematicas': {'figsize': (10, 5), 'dibujar': _dibujar_barras_rotadas, 'color': '#74B9FF', 'xlabel': "Temática", 'ylabel': "Total de visualizaciones"}
+}
+
+def renderizar_grafico(serie, agregado, titulo):
+    """
+    Dibuja un agregado a PNG (mismo formato que st.pyplot)
+
+    Se usa una Figure suelta, sin el estado global de pyplot, para poder
+    dibujar desde varias sesiones a la vez.
+
+    Returns:
+        bytes: imagen PNG
+    """
+    grafico = GRAFICOS[agregado]
+    fig = Figure(figsize=grafico['figsize'])
+    ax = fig.subplots()
+    grafico['dibujar'](ax, serie, grafico['color'])
+    ax.set_title(titulo)
+    ax.set_xlabel(grafico['xlabel'])
+    ax.set_ylabel(grafico['ylabel'])
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=200, bbox_inches='tight')
+    return buffer.getvalue()
+
+def mostrar_grafico(vis_total: pd.DataFrame, agregado, titulo):
+    """
+    Muestra un gráfico de visualizaciones; el PNG se genera una vez por huella de datos y título
+    """
+    huella = _huella_visualizaciones(vis_total)
+
+    def generar():
+        return renderizar_grafico(obtener_agregados_visualizaciones(vis_total)[agregado], agregado, titulo)
+
+    png = generar() if huella is None else obtener_o_calcular(('grafico_visualizaciones', huella, agregado, titulo), generar)
+    st.image(png, use_container_width=True)
 
 def generar_visualizaciones_politicas_streamlit(vis_total: pd.DataFrame):
     """Versión adaptada para Streamlit"""
-    
+
     st.divider()
     st.subheader("📊 Estadísticas Avanzadas de Visualizaciones")
-    
+
     col1, col2 = st.columns(2)
-    
+
     with col1:
         visualizar_por_politico_st(vis_total)
         visualizar_por_partido_st(vis_total)
-    
+
     with col2:
         visualizar_por_mes_st(vis_total)
         visualizar_por_tematica_inferida_st(vis_total)
 
 def visualizar_por_politico_st(vis_total: pd.DataFrame):
-    politicos = ['Ramallo', 'Pazos', 'Santos']
-    vis_politicos = [
-        vis_total[vis_total['title'].str.contains("Ramallo", case=False, na=False)]['n_visualizations'].sum(),
-        vis_total[vis_total['title'].str.contains("Pazos", case=False, na=False)]['n_visualizations'].sum(),
-        vis_total[vis_total['title'].str.contains("Santos", case=False, na=False)]['n_visualizations'].sum()
-    ]
-
-    fig, ax = plt.subplots(figsize=(8, 5))
-    ax.bar(politicos, vis_politicos, color=['#FF6B6B', '#4ECDC4', '#45B7D1'])
-    ax.set_title("Visualizaciones por político")
-    ax.set_ylabel("Visualizaciones")
-    ax.set_xlabel("Político")
-    plt.tight_layout()
-    st.pyplot(fig)  # ✅ Cambio clave
+    mostrar_grafico(vis_total, 'politicos', "Visualizaciones por político")
 
 def visualizar_por_partido_st(vis_total: pd.DataFrame):
-    partidos = ['PP', 'PSOE', 'BNG']
-    vis_partidos = [
-        vis_total[vis_total['title'].str.contains(r"\bPP\b|partido popular", case=False, na=False)]['n_visualizations'].sum(),
-        vis_total[vis_total['title'].str.contains("psoe|partido socialista", case=False, na=False)]['n_visualizations'].sum(),
-        vis_total[vis_total['title'].str.contains("bng|bloque", case=False, na=False)]['n_visualizations'].sum()
-    ]
-
-    fig, ax = plt.subplots(figsize=(8, 5))
-    ax.bar(partidos, vis_partidos, color=['#6C5CE7', '#FD79A8', '#00B894'])
-    ax.set_title("Visualizaciones por partido")
-    ax.set_ylabel("Visualizaciones")
-    ax.set_xlabel("Partido")
-    plt.tight_layout()
-    st.pyplot(fig)
+    mostrar_grafico(vis_total, 'partidos', "Visualizaciones por partido")
 
 def visualizar_por_mes_st(vis_total: pd.DataFrame):
-    vis_total['year_month'] = vis_total['date'].astype(str).str[:7]
-    monthly_views = vis_total.groupby('year_month')['n_visualizations'].sum().reset_index()
-
-    fig, ax = plt.subplots(figsize=(10, 4))
-    ax.plot(monthly_views['year_month'], monthly_views['n_visualizations'], marker='o', color='#E17055')
-    ax.set_title("📅 Visualizaciones totales por mes")
-    ax.set_ylabel("Visualizaciones")
-    ax.set_xlabel("Mes")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    st.pyplot(fig)
+    mostrar_grafico(vis_total, 'meses', "📅 Visualizaciones totales por mes")
 
 def visualizar_por_tematica_inferida_st(vis_total: pd.DataFrame):
-    def inferir_tematica(texto):
-        texto = str(texto).lower()
-        if any(p in texto for p in ["ramallo", "pazos", "santos", "concejal", "concelleiro", "alcaldesa", "alcalde", "candidato"]):
-            return "🏛️ Política"
-        elif any(e in texto for e in ["falleció", "esquela", "funeral", "necrológica", "velatorio"]):
-            return "🕊️ Necrológicas"
-        elif any(f in texto for f in ["fiesta", "verbena", "festival", "romería", "celebración"]):
-            return "🎉 Festividades"
-        elif any(t in texto for t in ["bus", "autobús", "tráfico", "movilidad", "transporte"]):
-            return "🚌 Transporte"
-        elif any(o in texto for o in ["opinión", "editorial", "carta al director"]):
-            return "💭 Opinión"
-        else:
-            return "📄 Otra"
-
-    vis_total["tematica"] = vis_total["title"].combine_first(vis_total["summary"]).apply(inferir_tematica)
-    temas_vis = vis_total.groupby('tematica')['n_visualizations'].sum().sort_values(ascending=False)
-    temas_vis = temas_vis[temas_vis.index != "📄 Otra"]
-
-    fig, ax = plt.subplots(figsize=(10, 5))
-    temas_vis.plot(kind='bar', ax=ax, color='#74B9FF')
-    ax.set_title("📂 Visualizaciones por temática")
-    ax.set_xlabel("Temática")
-    ax.set_ylabel("Total de visualizaciones")
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    st.pyplot(fig)
-
-import matplotlib.pyplot as plt
+    mostrar_grafico(vis_total, 'tematicas', "📂 Visualizaciones por temática")
 
 def mostrar_estadisticas_por_politico(vis_total: pd.DataFrame):
     """Gráfico de barras: visualizaciones por político"""
-    politicos = ['Ramallo', 'Pazos', 'Santos']
-    vis_politicos = [
-        vis_total[vis_total['title'].str.contains("Ramallo", case=False, na=False)]['n_visualizations'].sum(),
-        vis_total[vis_total['title'].str.contains("Pazos", case=False, na=False)]['n_visualizations'].sum(),
-        vis_total[vis_total['title'].str.contains("Santos", case=False, na=False)]['n_visualizations'].sum()
-    ]
-
-    fig, ax = plt.subplots(figsize=(8, 5))
-    ax.bar(politicos, vis_politicos, color=['#FF6B6B', '#4ECDC4', '#45B7D1'])
-    ax.set_title("🏛️ Visualizaciones por político")
-    ax.set_ylabel("Visualizaciones")
-    ax.set_xlabel("Político")
-    plt.tight_layout()
-    st.pyplot(fig)
+    mostrar_grafico(vis_total, 'politicos', "🏛️ Visualizaciones por político")
 
 def mostrar_estadisticas_por_partido(vis_total: pd.DataFrame):
     """Gráfico de barras: visualizaciones por partido"""
-    partidos = ['PP', 'PSOE', 'BNG']
-    vis_partidos = [
-        vis_total[vis_total['title'].str.contains(r"\bPP\b|partido popular", case=False, na=False)]['n_visualizations'].sum(),
-        vis_total[vis_total['title'].str.contains("psoe|partido socialista", case=False, na=False)]['n_visualizations'].sum(),
-        vis_total[vis_total['title'].str.contains("bng|bloque", case=False, na=False)]['n_visualizations'].sum()
-    ]
-
-    fig, ax = plt.subplots(figsize=(8, 5))
-    ax.bar(partidos, vis_partidos, color=['#6C5CE7', '#FD79A8', '#00B894'])
-    ax.set_title("🔍 Visualizaciones por partido")
-    ax.set_ylabel("Visualizaciones")
-    ax.set_xlabel("Partido")
-    plt.tight_layout()
-    st.pyplot(fig)
+    mostrar_grafico(vis_total, 'partidos', "🔍 Visualizaciones por partido")
 
 def mostrar_estadisticas_temporales(vis_total: pd.DataFrame):
     """Gráfico de líneas: evolución temporal"""
-    vis_total['year_month'] = vis_total['date'].astype(str).str[:7]
-    monthly_views = vis_total.groupby('year_month')['n_visualizations'].sum().reset_index()
-
-    fig, ax = plt.subplots(figsize=(10, 4))
-    ax.plot(monthly_views['year_month'], monthly_views['n_visualizations'], marker='o', color='#E17055')
-    ax.set_title("📅 Visualizaciones totales por mes")
-    ax.set_ylabel("Visualizaciones")
-    ax.set_xlabel("Mes")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    st.pyplot(fig)
\ No newline at end of file
+    mostrar_grafico(vis_total, 'meses', "📅 Visualizaciones totales por mes")
@@ -3,11 +3,38 @@ Visualizers - HorizontAI (VERSIÓN MEJORADA)
 ===========================================
 
 Funciones para mostrar tablas, gráficos y paneles con las nuevas columnas y tono informal.
+
+Las tablas con selección de fila se ejecutan como fragmentos (st.fragment):
+seleccionar una fila solo vuelve a ejecutar la tabla y su panel de detalles,
+no todo app.py. El análisis de sentimientos de la tabla mostrada se memoriza
+por su contenido, de modo que esos reruns no vuelven a pasar por el modelo.
 """
 
 import streamlit as st
 import pandas as pd
 from .sentiment_integration import aplicar_analisis_sentimientos, mostrar_analisis_sentimientos_compacto
+from .result_cache import huella_tabla, obtener_o_calcular
+from .display_processors import (
+    ETIQUETAS_IDIOMA,
+    ETIQUETAS_IDIOMA_COMENTARIOS,
+    ETIQUETAS_TONO,
+    ETIQUETAS_POLITICO,
+    EMOJI_EMOCIONES,
+    etiquetar_categorias,
+    etiquetar_emociones,
+    truncar_titulos,
+    crear_mapping_titulos_originales,
+    crear_mapping_titulos_articulos_comentarios,
+    preparar_tabla
+)
+from .pagination_processors import (
+    COLUMNAS_ORDEN_ARTICULOS,
+    COLUMNAS_ORDEN_COMENTARIOS,
+    paginar_articulos,
+    paginar_comentarios
+)
+from .political_comment_processors import filtrar_comentarios_por_termino
+from .search_processors import buscar_comentarios
 
 def mostrar_explicacion_parametros():
     """Explicación mejorada con tono informal pero profesional"""
@@ -61,36 +88,6 @@ def mostrar_explicacion_parametros():
         **En resumen**: Ya no es solo análisis, es comprensión emocional real 🎯
         """)
 
-def truncar_titulo_palabras(titulo, max_palabras=10):
-    """
-    Trunca un título a un número máximo de palabras
-    """
-    if pd.isna(titulo) or not str(titulo).strip():
-        return "Sin título"
-    
-    palabras = str(titulo).strip().split()
-    
-    if len(palabras) <= max_palabras:
-        return titulo
-    else:
-        return " ".join(palabras[:max_palabras]) + "..."
-
-def crear_mapping_titulos_originales(df):
-
-    mapping = {}
-    
-    for idx, row in df.iterrows():
-        link = row.get('link', f'no_link_{idx}')  # Fallback si no hay link
-        titulo_original = row.get('title', 'Sin título')
-        
-        # Limpiar y preservar título original
-        if pd.notna(titulo_original):
-            mapping[link] = str(titulo_original).strip()
-        else:
-            mapping[link] = 'Sin título'
-    
-    return mapping
-
 def obtener_titulo_original(selected_article, mapping_titulos):
 
     link = selected_article.get('article_link', selected_article.get('link', ''))
@@ -105,26 +102,49 @@ def obtener_titulo_original(selected_article, mapping_titulos):
     
     return 'Título no disponible'
 
-def crear_mapping_titulos_articulos_comentarios(df):
-    """Mapping específico para títulos de artículos desde comentarios"""
-    mapping = {}
-    
-    for idx, row in df.iterrows():
-        # Priorizar article_link, luego link
-        link = row.get('article_link', row.get('link', f'no_link_{idx}'))
-        
-        # Priorizar title_original, luego article_title, luego title
-        titulo = row.get('title_original', 
-                        row.get('article_title', 
-                               row.get('title', 'Sin título')))
-        
-        if pd.notna(titulo):
-            mapping[link] = str(titulo).strip()
-        else:
-            mapping[link] = 'Sin título'
-    
-    return mapping
+def analizar_tabla_con_cache(df, analizador, nombre):
+    """
+    Aplica el análisis de sentimientos a una tabla ya preparada, memorizado por su contenido
 
+    Args:
+        df: DataFrame a analizar (top-N o comentarios de un artículo)
+        analizador: Instancia del analizador
+        nombre: nombre del cálculo para la clave de caché
+
+    Returns:
+        Tuple con (df_analizado, reporte)
+    """
+    huella = huella_tabla(df)
+    if huella is None:
+        return aplicar_analisis_sentimientos(df, analizador)
+
+    return obtener_o_calcular(
+        (nombre, huella),
+        lambda: aplicar_analisis_sentimientos(df, analizador),
+        es_cacheable=lambda resultado: resultado[1] is not None
+    )
+
+def _preparar_tabla_articulos(df):
+    """Copia de la tabla de artículos con títulos truncados y mapping a los títulos completos"""
+    df_display = df.copy()
+    mapping_titulos_originales = crear_mapping_titulos_originales(df_display)
+    df_display['title'] = truncar_titulos(df_display['title'], 5)
+    return df_display, mapping_titulos_originales
+
+def _etiquetar_tabla_articulos(df_display):
+    """Columnas con emojis de la tabla de artículos analizada"""
+    columnas = {
+        'idioma_emoji': etiquetar_categorias(df_display['idioma'], ETIQUETAS_IDIOMA, '🤷‍♂️ No detectado'),
+        'tono_general_emoji': etiquetar_categorias(df_display['tono_general'], ETIQUETAS_TONO, '🤷‍♂️ Sin definir'),
+        'emocion_primaria_emoji': etiquetar_emociones(df_display['emocion_principal']),
+        # La temática ya viene con emoji del analizador mejorado
+        'tematica_display': df_display['tematica'].fillna("📄 Otra")
+    }
+    if 'es_politico' in df_display.columns:
+        columnas['politico_emoji'] = etiquetar_categorias(df_display['es_politico'], ETIQUETAS_POLITICO, '🤷‍♂️ No detectado')
+    return df_display.assign(**columnas)
+
+@st.fragment
 def mostrar_tabla_con_detalles_y_sentimientos(df, titulo_seccion, mostrar_sentimientos=False, analizador=None, es_articulos_populares=True):
     """
     Tabla mejorada con las nuevas columnas en el orden solicitado:
@@ -142,20 +162,14 @@ def mostrar_tabla_con_detalles_y_sentimientos(df, titulo_seccion, mostrar_sentim
         st.info(f"🤷‍♂️ No hay artículos para {titulo_seccion.lower()} (de momento)")
         return
     
-    # Aplicar análisis si está habilitado
-    df_display = df.copy()
+    # Títulos truncados y mapping a los títulos completos (preparados una vez por tabla)
+    df_display, mapping_titulos_originales = preparar_tabla("tabla_articulos", df, _preparar_tabla_articulos)
     reporte = None
 
-    # Función para guardar título completo del artículo
-    mapping_titulos_originales = crear_mapping_titulos_originales(df_display)
-
-    # Truncar títulos a 5 palabras
-    df_display['title'] = df_display['title'].apply(lambda x: truncar_titulo_palabras(x, 5))
-
+    # Aplicar análisis si está habilitado
     if mostrar_sentimientos and analizador is not None:
         with st.spinner("🧠 Aplicando análisis de sentimientos..."):
-            from .sentiment_integration import aplicar_analisis_sentimientos
-            df_display, reporte = aplicar_analisis_sentimientos(df_display, analizador)
+            df_display, reporte = analizar_tabla_con_cache(df_display, analizador, "analisis_tabla_articulos")
             
         if reporte is None:
             st.error("❌ Error aplicando análisis de sentimientos")
@@ -173,41 +187,11 @@ def mostrar_tabla_con_detalles_y_sentimientos(df, titulo_seccion, mostrar_sentim
             st.error(f"❌ Faltan estas columnas en el análisis: {columnas_faltantes}")
             mostrar_sentimientos = False
         else:
+            # Etiquetas con emojis precalculadas para la tabla analizada
+            df_tabla = preparar_tabla("tabla_articulos_sentimientos", df_display, _etiquetar_tabla_articulos)
+
             # ORDEN SOLICITADO: idioma → tono → emoción primaria → emoción secundaria → resto
             if es_articulos_populares:
-                columnas_analisis = ["idioma", "tono_general", "emocion_principal", "intensidad_emocional",
-                                   "confianza_analisis", "tematica", "es_politico"]
-                
-                df_tabla = df_display[columnas_basicas + columnas_analisis].copy()
-                
-                # Mejorar la presentación de los datos
-                df_tabla['idioma_emoji'] = df_tabla['idioma'].map({
-                    'gallego': 'Gallego',
-                    'castellano': 'Castellano'
-                }).fillna('🤷‍♂️ No detectado')
-                
-                df_tabla['tono_general_emoji'] = df_tabla['tono_general'].map({
-                    'positivo': '😊 Positivo',
-                    'negativo': '😔 Negativo', 
-                    'neutral': '😐 Neutral'
-                }).fillna('🤷‍♂️ Sin definir')
-                
-                # Emociones con emojis
-                emoji_emociones = {
-                    'alegría': '😄', 'esperanza': '🌟', 'orgullo': '💪', 'satisfacción': '😌',
-                    'tristeza': '😢', 'ira': '😠', 'miedo': '😨', 'decepción': '😞', 'desprecio': '🙄',
-                    'sorpresa': '😲', 'nostalgia': '🥺', 'preocupación': '😟', 'neutral': '😐'
-                }
-                
-                df_tabla['emocion_primaria_emoji'] = df_tabla['emocion_principal'].apply(
-                    lambda x: f"{emoji_emociones.get(x, '🤔')} {str(x).title()}" if pd.notna(x) else "🤷‍♂️ Ninguna"
-                )
-                                
-                df_tabla['politico_emoji'] = df_tabla['es_politico'].map({
-                    True: '🏛️ Sí',
-                    False: '📰 No'
-                }).fillna('🤷‍♂️ No detectado')
-                
                 column_config = {
                     "title": "Título",
                     "n_visualizations": st.column_config.NumberColumn("👁️ Vistas", format="%d"),
@@ -228,36 +212,6 @@ def mostrar_tabla_con_detalles_y_sentimientos(df, titulo_seccion, mostrar_sentim
                 
             else:
                 # Para artículos políticos: mostrar temática en lugar de "es_político"
-                columnas_analisis = ["idioma", "tono_general", "emocion_principal", 
-                                   "confianza_analisis", "intensidad_emocional", "tematica"]
-                
-                df_tabla = df_display[columnas_basicas + columnas_analisis].copy()
-                
-                # Aplicar los mismos emojis y formato
-                df_tabla['idioma_emoji'] = df_tabla['idioma'].map({
-                    'gallego': 'Gallego',
-                    'castellano': 'Castellano'
-                }).fillna('🤷‍♂️ No detectado')
-                
-                df_tabla['tono_general_emoji'] = df_tabla['tono_general'].map({
-                    'positivo': '😊 Positivo',
-                    'negativo': '😔 Negativo', 
-                    'neutral': '😐 Neutral'
-                }).fillna('🤷‍♂️ Sin definir')
-                
-                emoji_emociones = {
-                    'alegría': '😄', 'esperanza': '🌟', 'orgullo': '💪', 'satisfacción': '😌',
-                    'tristeza': '😢', 'ira': '😠', 'miedo': '😨', 'decepción': '😞', 'desprecio': '🙄',
-                    'sorpresa': '😲', 'nostalgia': '🥺', 'preocupación': '😟', 'neutral': '😐'
-                }
-                
-                df_tabla['emocion_primaria_emoji'] = df_tabla['emocion_principal'].apply(
-                    lambda x: f"{emoji_emociones.get(x, '🤔')} {str(x).title()}" if pd.notna(x) else "🤷‍♂️ Ninguna"
-                )
-                                
-                # La temática ya viene con emoji del analizador mejorado
-                df_tabla['tematica_display'] = df_tabla['tematica'].fillna("📄 Otra")
-                
                 column_config = {
                     "title": "Título",
                     "n_visualizations": st.column_config.NumberColumn("👁️ Vistas", format="%d"),
@@ -277,7 +231,7 @@ def mostrar_tabla_con_detalles_y_sentimientos(df, titulo_seccion, mostrar_sentim
     
     # Tabla básica si no hay análisis
     if not mostrar_sentimientos or reporte is None:
-        df_tabla = df_display[columnas_basicas].copy()
+        df_tabla = df_display
         column_config = {
             "title": "Título",
             "n_visualizations": st.column_config.NumberColumn("👁️ Vistas", format="%d"),
@@ -340,35 +294,13 @@ def mostrar_tabla_con_detalles_y_sentimientos(df, titulo_seccion, mostrar_sentim
         st.divider()
         mostrar_analisis_sentimientos_comentarios_compacto(df_display, reporte, titulo_seccion)
         
-def mostrar_tabla_comentarios_con_sentimientos(df, titulo_seccion, mostrar_sentimientos=False, analizador=None, es_popular=True, reporte=None):
+def _preparar_tabla_comentarios(df, con_sentimientos):
     """
-    FUNCIÓN CORREGIDA: Inicializa variables correctamente
+    Copia de la tabla de comentarios con columnas estandarizadas, vista previa
+    truncada y, si con_sentimientos, etiquetas con emojis del análisis
     """
-    st.info("💡 Haz clic en la columna de la izquierda de la tabla para ver detalles del comentario")
-
-    if len(df) == 0:
-        tipo = "populares" if es_popular else "impopulares"
-        st.info(f"🤷‍♂️ No hay comentarios {tipo} para {titulo_seccion.lower()}")
-        return
-    
-    # Inicializar variables desde el principio
-    columnas_mostrar = []
-    column_config = {}
-    
-    # Aplicar análisis si está habilitado y no se ha hecho ya
     df_display = df.copy()
 
-    # Guardar título completo
-    mapping_titulos_articulos_originales = crear_mapping_titulos_articulos_comentarios(df_display)
-    
-    if mostrar_sentimientos and analizador is not None and reporte is None:
-        with st.spinner("🧠 Analizando comentarios..."):
-            df_display, reporte = aplicar_analisis_sentimientos(df, analizador)
-            
-        if reporte is None:
-            st.error("💥 El análisis falló")
-            mostrar_sentimientos = False
-    
     # MAPEAR COLUMNAS SEGÚN LA ESTRUCTURA DEL DATAFRAME
     if 'vista_previa_comentario' in df_display.columns:
         # Estructura de comentarios individuales procesados
@@ -377,15 +309,15 @@ def mostrar_tabla_comentarios_con_sentimientos(df, titulo_seccion, mostrar_senti
             'comment_author': 'comment_author',
             'comment_location': 'ubicacion_comentario',
             'likes': 'likes_comentario',
-            'dislikes': 'dislikes_comentario', 
+            'dislikes': 'dislikes_comentario',
             'net_score': 'net_score',
             'link': 'enlace_articulo'
         }
-        
+
         # Calcular net_score si no existe
         if 'net_score' not in df_display.columns and 'likes_comentario' in df_display.columns and 'dislikes_comentario' in df_display.columns:
             df_display['net_score'] = df_display['likes_comentario'] - df_display['dislikes_comentario']
-        
+
     else:
         # Estructura tradicional de comentarios extraídos
         mapeo_columnas = {
@@ -397,7 +329,7 @@ def mostrar_tabla_comentarios_con_sentimientos(df, titulo_seccion, mostrar_senti
             'net_score': 'net_score',
             'link': 'link'
         }
-        
+
     if 'comment_preview' not in df_display.columns:
         # Determinar qué columna contiene el texto del comentario
         if 'title' in df_display.columns:
@@ -406,87 +338,101 @@ def mostrar_tabla_comentarios_con_sentimientos(df, titulo_seccion, mostrar_senti
             texto_columna = 'comment_text'  # Sin análisis de sentimientos
         else:
             texto_columna = None
-    
+
         # Una vez creado comment_preview, truncamos la vista previa a 5 palabras
         if texto_columna:
-            df_display['texto_original'] = df_display[texto_columna].copy()  # Guardar original
-            df_display['comment_preview'] = df_display[texto_columna].apply(
-                lambda x: truncar_titulo_palabras(x, 5)  # 5 palabras
-            )
-    
+            df_display['texto_original'] = df_display[texto_columna]  # Guardar original
+            df_display['comment_preview'] = truncar_titulos(df_display[texto_columna], 5)
+
     # RENOMBRAR COLUMNAS PARA ESTANDARIZAR
     for nombre_estandar, nombre_real in mapeo_columnas.items():
         if nombre_real in df_display.columns and nombre_estandar != nombre_real:
             df_display[nombre_estandar] = df_display[nombre_real]
+
+    if con_sentimientos:
+        df_display['idioma_emoji'] = etiquetar_categorias(df_display['idioma'], ETIQUETAS_IDIOMA_COMENTARIOS, '🤷‍♂️ No detectado')
+        df_display['tono_general_emoji'] = etiquetar_categorias(df_display['tono_general'], ETIQUETAS_TONO, '🤷‍♂️ Sin definir')
+        df_display['emocion_principal_emoji'] = etiquetar_emociones(df_display['emocion_principal'])
+
+        # 🔧 CORRECCIÓN: Manejar temática condicionalmente
+        if 'tematica' in df_display.columns:
+            df_display['tematica_display'] = df_display['tematica'].fillna("📄 Otra")
+
+    return df_display
+
+@st.fragment
+def mostrar_tabla_comentarios_con_sentimientos(df, titulo_seccion, mostrar_sentimientos=False, analizador=None, es_popular=True, reporte=None):
+    """
+    FUNCIÓN CORREGIDA: Inicializa variables correctamente
+    """
+    st.info("💡 Haz clic en la columna de la izquierda de la tabla para ver detalles del comentario")
+
+    if len(df) == 0:
+        tipo = "populares" if es_popular else "impopulares"
+        st.info(f"🤷‍♂️ No hay comentarios {tipo} para {titulo_seccion.lower()}")
+        return
     
-    # 🔧 DEFINIR COLUMNAS BÁSICAS SIEMPRE
-    columnas_basicas = ['comment_preview', 'comment_author', 'comment_location', 'likes', 'dislikes', 'net_score', 'link']
+    # Inicializar variables desde el principio
+    columnas_mostrar = []
+    column_config = {}
     
-    # ANÁLISIS DE SENTIMIENTOS
+    # Guardar título completo
+    mapping_titulos_articulos_originales = preparar_tabla("mapping_titulos_comentarios", df, crear_mapping_titulos_articulos_comentarios)
+    
+    # Aplicar análisis si está habilitado y no se ha hecho ya
+    df_analizado = df
+    if mostrar_sentimientos and analizador is not None and reporte is None:
+        with st.spinner("🧠 Analizando comentarios..."):
+            df_analizado, reporte = analizar_tabla_con_cache(df, analizador, "analisis_tabla_comentarios")
+            
+        if reporte is None:
+            st.error("💥 El análisis falló")
+            mostrar_sentimientos = False
+    
+    # ANÁLISIS DE SENTIMIENTOS: solo si están todas las columnas
+    tiene_sentimientos = False
     if mostrar_sentimientos and reporte is not None:
         columnas_sentimientos = ['idioma', 'tono_general', 'emocion_principal', 'confianza_analisis', 'intensidad_emocional']
-        columnas_faltantes = [col for col in columnas_sentimientos if col not in df_display.columns]
-        
-        if not columnas_faltantes:
-            # Aplicar emojis
-            df_display['idioma_emoji'] = df_display['idioma'].map({
-                'gallego': '📘 Gallego',
-                'castellano': '🐂 Castellano'
-            }).fillna('🤷‍♂️ No detectado')
-            
-            df_display['tono_general_emoji'] = df_display['tono_general'].map({
-                'positivo': '😊 Positivo',
-                'negativo': '😔 Negativo', 
-                'neutral': '😐 Neutral'
-            }).fillna('🤷‍♂️ Sin definir')
-            
-            emoji_emociones = {
-                'alegría': '😄', 'esperanza': '🌟', 'orgullo': '💪', 'satisfacción': '😌',
-                'tristeza': '😢', 'ira': '😠', 'miedo': '😨', 'decepción': '😞', 'desprecio': '🙄',
-                'sorpresa': '😲', 'nostalgia': '🥺', 'preocupación': '😟', 'neutral': '😐'
-            }
-            
-            df_display['emocion_principal_emoji'] = df_display['emocion_principal'].apply(
-                lambda x: f"{emoji_emociones.get(x, '🤔')} {str(x).title()}" if pd.notna(x) else "🤷‍♂️ Ninguna"
-            )
-
-            # 🔧 CORRECCIÓN: Manejar temática condicionalmente
-            tiene_tematica = 'tematica' in df_display.columns
-            if tiene_tematica:
-                df_display['tematica_display'] = df_display['tematica'].fillna("📄 Otra")
-            
-            # CONFIGURACIÓN CON SENTIMIENTOS
-            column_config = {
-                "comment_preview": "💬 Comentario",
-                "comment_author": "👤 Autor",
-                "comment_location": "📍 Ubicación",
-                "likes": st.column_config.NumberColumn("👍 Likes", format="%d"),
-                "dislikes": st.column_config.NumberColumn("👎 Dislikes", format="%d"),
-                "net_score": st.column_config.NumberColumn("📊 Puntuación", format="%+d"),
-                "idioma_emoji": "🌍 Idioma", 
-                "tono_general_emoji": "😊 Tono",
-                "emocion_principal_emoji": "🎭 Emoción",
-                "intensidad_emocional": st.column_config.NumberColumn("🔥 Intensidad", format="%d/5"),
-                "confianza_analisis": st.column_config.NumberColumn("📊 Confianza", format="%.2f"),
-                "link": st.column_config.LinkColumn("🔗 Artículo", display_text="Ver")
-            }
-
-            # 🔧 CORRECCIÓN: Columnas base sin temática
-            columnas_mostrar = ['comment_preview', 'comment_location', 'likes', 'dislikes', 'net_score',
-                                'idioma_emoji', 'tono_general_emoji', 'emocion_principal_emoji']
-            
-            # 🔧 AÑADIR temática solo si existe
-            if tiene_tematica:
-                column_config["tematica_display"] = "📂 Temática"
-                columnas_mostrar.append('tematica_display')
-            
-            # Añadir columnas finales
-            columnas_mostrar.extend(['intensidad_emocional', 'confianza_analisis', 'link'])
-            
-        else:
+        tiene_sentimientos = all(col in df_analizado.columns for col in columnas_sentimientos)
+        if not tiene_sentimientos:
             # Si faltan columnas de sentimientos, usar configuración básica
             mostrar_sentimientos = False
     
+    # Columnas estandarizadas y emojis precalculados para esta tabla
+    df_display = preparar_tabla("tabla_comentarios", df_analizado, _preparar_tabla_comentarios, tiene_sentimientos)
+    
+    # 🔧 DEFINIR COLUMNAS BÁSICAS SIEMPRE
+    columnas_basicas = ['comment_preview', 'comment_author', 'comment_location', 'likes', 'dislikes', 'net_score', 'link']
+    
+    if tiene_sentimientos:
+        # CONFIGURACIÓN CON SENTIMIENTOS
+        column_config = {
+            "comment_preview": "💬 Comentario",
+            "comment_author": "👤 Autor",
+            "comment_location": "📍 Ubicación",
+            "likes": st.column_config.NumberColumn("👍 Likes", format="%d"),
+            "dislikes": st.column_config.NumberColumn("👎 Dislikes", format="%d"),
+            "net_score": st.column_config.NumberColumn("📊 Puntuación", format="%+d"),
+            "idioma_emoji": "🌍 Idioma", 
+            "tono_general_emoji": "😊 Tono",
+            "emocion_principal_emoji": "🎭 Emoción",
+            "intensidad_emocional": st.column_config.NumberColumn("🔥 Intensidad", format="%d/5"),
+            "confianza_analisis": st.column_config.NumberColumn("📊 Confianza", format="%.2f"),
+            "link": st.column_config.LinkColumn("🔗 Artículo", display_text="Ver")
+        }
+
+        # 🔧 CORRECCIÓN: Columnas base sin temática
+        columnas_mostrar = ['comment_preview', 'comment_location', 'likes', 'dislikes', 'net_score',
+                            'idioma_emoji', 'tono_general_emoji', 'emocion_principal_emoji']
+        
+        # 🔧 AÑADIR temática solo si existe
+        if 'tematica_display' in df_display.columns:
+            column_config["tematica_display"] = "📂 Temática"
+            columnas_mostrar.append('tematica_display')
+        
+        # Añadir columnas finales
+        columnas_mostrar.extend(['intensidad_emocional', 'confianza_analisis', 'link'])
+    
     # 🔧 CONFIGURACIÓN BÁSICA (SIEMPRE SE EJECUTA SI NO HAY SENTIMIENTOS)
     if not mostrar_sentimientos:
         column_config = {
@@ -643,13 +589,7 @@ def mostrar_tabla_comentarios_con_sentimientos(df, titulo_seccion, mostrar_senti
             # Emojis
             emoji_idioma = '📘' if idioma == 'gallego' else '🐂' if idioma == 'castellano' else '🤷‍♂️'
             emoji_tono = '😊' if tono == 'positivo' else '😔' if tono == 'negativo' else '😐'
-            
-            emoji_emociones = {
-                'alegría': '😄', 'esperanza': '🌟', 'orgullo': '💪', 'satisfacción': '😌',
-                'tristeza': '😢', 'ira': '😠', 'miedo': '😨', 'decepción': '😞', 'desprecio': '🙄',
-                'sorpresa': '😲', 'nostalgia': '🥺', 'preocupación': '😟', 'neutral': '😐'
-            }
-            emoji_emocion = emoji_emociones.get(emocion, '🤔')
+            emoji_emocion = EMOJI_EMOCIONES.get(emocion, '🤔')
 
             # Obtener temática si está disponible
             tematica = selected_comment.get('tematica', '📄 Otra')
@@ -964,8 +904,27 @@ def mostrar_analisis_sentimientos_compacto(df_analizado, reporte, titulo_seccion
             for tematica, cantidad in list(tematicas.items())[:4]:
                 st.write(f"• {tematica}: {cantidad} artículos")
 
-def mostrar_tabla_articulos_polemicos(df, titulo_seccion, key_suffix="", table_height=600):
-    """Muestra tabla de artículos más polémicos"""
+def _preparar_tabla_polemicos(df):
+    """Tabla de artículos polémicos con fecha AAAA-MM-DD, títulos truncados y mapping a los títulos completos"""
+    df_display = df.copy()
+
+    # Formatear fecha a AAAA-MM-DD
+    if 'date' in df_display.columns:
+        # Convertir a string y tomar solo los primeros 10 caracteres (AAAA-MM-DD)
+        fechas = df_display['date'].astype(str).str[:10]
+        
+        # Limpiar cualquier formato extraño: quitar timestamp y reemplazar valores nulos
+        df_display['date'] = fechas.str.replace('T.*', '', regex=True).replace('nan', 'Sin fecha')
+
+    # Guardar títulos completos
+    mapping_titulos_originales = crear_mapping_titulos_originales(df_display)
+
+    # Truncar títulos a 5 palabras
+    df_display['title'] = truncar_titulos(df_display['title'], 5)
+    return df_display, mapping_titulos_originales
+
+def mostrar_tabla_articulos_polemicos(df, titulo_seccion, key_suffix="", table_height=600, df_comentarios=None):
+    """Muestra tabla de artículos más polémicos (df_comentarios: tabla larga para el panel de detalles)"""
     if len(df) == 0:
         st.info(f"🤷‍♂️ No hay artículos polémicos para {titulo_seccion.lower()}")
         return
@@ -978,22 +937,10 @@ def mostrar_tabla_articulos_polemicos(df, titulo_seccion, key_suffix="", table_h
         st.error("❌ No se encontraron las columnas necesarias para mostrar artículos polémicos")
         return
     
-    df_display = df[columnas_disponibles].copy()
-
-    # Formatear fecha a AAAA-MM-DD
-    if 'date' in df_display.columns:
-    # Convertir a string y tomar solo los primeros 10 caracteres (AAAA-MM-DD)
-        df_display['date'] = df_display['date'].astype(str).str[:10]
-        
-        # Limpiar cualquier formato extraño
-        df_display['date'] = df_display['date'].str.replace('T.*', '', regex=True)  # Quitar timestamp
-        df_display['date'] = df_display['date'].replace('nan', 'Sin fecha')         # Reemplazar valores nulos
-
-    # Guardar títulos completos
-    mapping_titulos_originales = crear_mapping_titulos_originales(df_display)
-
-    # Truncar títulos a 5 palabras
-    df_display['title'] = df_display['title'].apply(lambda x: truncar_titulo_palabras(x, 5))
+    # Fechas formateadas, títulos truncados y mapping a los títulos completos
+    df_display, mapping_titulos_originales = preparar_tabla(
+        "tabla_articulos_polemicos", df[columnas_disponibles], _preparar_tabla_polemicos
+    )
     
     try:
         event = st.dataframe(
@@ -1027,32 +974,44 @@ def mostrar_tabla_articulos_polemicos(df, titulo_seccion, key_suffix="", table_h
         titulo_original = obtener_titulo_original(selected_article, mapping_titulos_originales)
         st.subheader(f"**📰 Artículo:** {titulo_original}")
 
-        # Primero contar todos los comentarios
-        total_comentarios = 0
-        for i in range(1, 16):
-            comment_text = selected_article.get(f'comment_{i}_text', '')
-            if pd.notna(comment_text) and str(comment_text).strip():
-                total_comentarios += 1
+        # Comentarios del artículo en la tabla larga
+        if df_comentarios is not None and 'article_id' in selected_article.index:
+            comentarios_articulo = df_comentarios[df_comentarios['article_id'] == selected_article['article_id']]
+            comentarios_articulo = comentarios_articulo.sort_values('comment_index')
+            textos = comentarios_articulo['comment_text'].fillna('').astype(str)
+            comentarios_articulo = comentarios_articulo[textos.str.strip().ne('')]
+        else:
+            comentarios_articulo = pd.DataFrame()
 
         # Mostrar el total UNA VEZ
+        total_comentarios = len(comentarios_articulo)
         if total_comentarios > 0:
             st.write(f"**💬 Encontrados {total_comentarios} comentarios:**")
         
         # Mostrar comentarios del artículo
-        comentarios_mostrados = 0
-        for i in range(1, 16):
-            comment_text = selected_article.get(f'comment_{i}_text', '')
-            comment_author = selected_article.get(f'comment_{i}_author', '')
-            comment_likes = selected_article.get(f'comment_{i}_likes', 0)
-            comment_dislikes = selected_article.get(f'comment_{i}_dislikes', 0)
-            
-            if pd.notna(comment_text) and str(comment_text).strip() and comentarios_mostrados < 15:
-                with st.expander(f"💬 Comentario de {comment_author} | 👍 {comment_likes} | 👎 {comment_dislikes}"):
-                    st.write(comment_text)
-                comentarios_mostrados += 1
+        for _, comentario in comentarios_articulo.head(15).iterrows():
+            with st.expander(f"💬 Comentario de {comentario['comment_author']} | 👍 {comentario['likes']} | 👎 {comentario['dislikes']}"):
+                st.write(comentario['comment_text'])
+
+def _preparar_tabla_ranking_comentarios(df):
+    """Tabla de comentarios populares/impopulares con vista previa truncada y mapping a los títulos completos"""
+    df_display = df.copy()
+
+    # Guardar título original
+    mapping_titulos_articulos_originales = crear_mapping_titulos_articulos_comentarios(df_display)
+
+    # Crear previsualización del comentario
+    if 'comment_text' in df_display.columns:
+        textos = df_display['comment_text'].fillna('').astype(str)
+        df_display['comment_preview'] = textos.where(textos.str.len() <= 20, textos.str[:20] + "...")
+
+    # Truncar títulos a 5 palabras
+    if 'article_title' in df_display.columns:
+        df_display['article_title'] = truncar_titulos(df_display['article_title'], 5)
+    return df_display, mapping_titulos_articulos_originales
 
 def mostrar_tabla_comentarios(df, titulo_seccion, es_popular=True, key_suffix="", table_height=600):
-    """Muestra tabla de comentarios populares o impopulares (sin cambios significativos)"""
+    """Muestra tabla de comentarios populares o impopulares (filas de la tabla larga de comentarios)"""
     if len(df) == 0:
         tipo = "populares" if es_popular else "impopulares"
         st.info(f"🤷‍♂️ No hay comentarios {tipo} para {titulo_seccion.lower()}")
@@ -1066,21 +1025,10 @@ def mostrar_tabla_comentarios(df, titulo_seccion, es_popular=True, key_suffix=""
         st.error("❌ No se encontraron suficientes columnas para mostrar comentarios")
         return
     
-    # Crear tabla con información relevante
-    df_display = df[columnas_disponibles].copy()
-
-    # Guardar título original     
-    mapping_titulos_articulos_originales = crear_mapping_titulos_articulos_comentarios(df_display)
-
-    # Truncar títulos a 5 palabras
-    if 'title' in df_display.columns:
-        df_display['title'] = df_display['title'].apply(lambda x: truncar_titulo_palabras(x, 5))
-    
-    # Crear previsualización del comentario ANTES de configurar columnas
-    if 'comment_preview' not in df_display.columns and 'comment_text' in df_display.columns:
-        df_display['comment_preview'] = df_display['comment_text'].apply(
-            lambda x: str(x)[:20] + "..." if len(str(x)) > 20 else str(x)
-        )
+    # Vista previa, títulos truncados y mapping a los títulos completos
+    df_display, mapping_titulos_articulos_originales = preparar_tabla(
+        "tabla_ranking_comentarios", df[columnas_disponibles], _preparar_tabla_ranking_comentarios
+    )
 
     # Configurar columnas para mostrar
     columnas_tabla = ['comment_preview', 'comment_location', 'likes', 'dislikes', 'net_score', 'article_title', 'article_link']
@@ -1116,35 +1064,16 @@ def mostrar_tabla_comentarios(df, titulo_seccion, es_popular=True, key_suffix=""
         
         st.divider()
         
-        # 🆕 AÑADIR: Información del artículo encima del comentario
-        # Obtener título del artículo
-        titulo_articulo = None
+        # Información del artículo encima del comentario
         if 'article_title' in selected_comment and pd.notna(selected_comment['article_title']):
             titulo_articulo = selected_comment['article_title']
-        elif mapping_titulos_articulos_originales:
-            # Usar mapping como fallback
-            link = selected_comment.get('article_link', '')
-            if link and link in mapping_titulos_articulos_originales:
-                titulo_articulo = mapping_titulos_articulos_originales[link]
-        
-        # Obtener fecha del artículo y formatearla
+        else:
+            titulo_articulo = obtener_titulo_original(selected_comment, mapping_titulos_articulos_originales)
         fecha_articulo = None
         if 'article_date' in selected_comment and pd.notna(selected_comment['article_date']):
-            fecha_raw = selected_comment['article_date']
-        elif 'date' in selected_comment and pd.notna(selected_comment['date']):
-            fecha_raw = selected_comment['date']
-        else:
-            fecha_raw = None
+            # Formatear fecha a AAAA-MM-DD
+            fecha_articulo = str(selected_comment['article_date'])[:10].replace('T', ' ').split(' ')[0]
         
-        # Formatear fecha a AAAA-MM-DD
-        if fecha_raw:
-            try:
-                # Convertir a string y tomar solo AAAA-MM-DD
-                fecha_articulo = str(fecha_raw)[:10].replace('T', ' ').split(' ')[0]
-            except:
-                fecha_articulo = str(fecha_raw)
-        
-        # 🆕 MOSTRAR: Información del artículo
         if titulo_articulo:
             st.markdown(f"**📰 Artículo:** {titulo_articulo}")
         
@@ -1153,7 +1082,7 @@ def mostrar_tabla_comentarios(df, titulo_seccion, es_popular=True, key_suffix=""
         
         # Si tenemos título o fecha, añadir separación visual
         if titulo_articulo or fecha_articulo:
-            st.markdown("---")  # Línea separadora sutil
+            st.markdown("---")
         
         st.subheader("💬 Comentario completo")
         
@@ -1180,17 +1109,188 @@ def mostrar_tabla_comentarios(df, titulo_seccion, es_popular=True, key_suffix=""
                 st.write(f"📊 **Puntuación neta:** {selected_comment['net_score']}")
             if 'article_source' in selected_comment:
                 st.write(f"🏢 **Fuente:** {selected_comment['article_source']}")
-            
-            if 'article_title' in selected_comment:
-                st.write("**📰 Artículo relacionado:**")
-                titulo_articulo_completo = obtener_titulo_original(selected_comment, mapping_titulos_articulos_originales)
-                st.write(titulo_articulo_completo)
 
             if 'article_link' in selected_comment and pd.notna(selected_comment['article_link']):
                 st.link_button("🔗 Ver artículo completo", selected_comment['article_link'])
             else:
                 st.info("🤷‍♂️ Enlace no disponible")
 
+def pestanas_perezosas(etiquetas, key):
+    """
+    Selector de pestañas que solo evalúa la pestaña visible
+
+    A diferencia de st.tabs, que ejecuta el contenido de todas las pestañas en
+    cada rerun, devuelve un booleano por etiqueta y solo el de la pestaña
+    seleccionada es True. Se usa igual que st.tabs cambiando `with` por `if`:
+
+        tab1, tab2, tab3 = pestanas_perezosas([...], key="...")
+        if tab1:
+            ...
+
+    Args:
+        etiquetas: lista de etiquetas de las pestañas
+        key: clave única del selector (guarda la pestaña elegida en session_state)
+
+    Returns:
+        list: un booleano por etiqueta
+    """
+    seleccion = st.segmented_control(
+        "Sección",
+        etiquetas,
+        default=etiquetas[0],
+        key=key,
+        label_visibility="collapsed"
+    )
+    # El control permite deseleccionar: en ese caso se muestra la primera pestaña
+    if seleccion not in etiquetas:
+        seleccion = etiquetas[0]
+    return [etiqueta == seleccion for etiqueta in etiquetas]
+
+@st.fragment
+def mostrar_tabla_paginada(paginar_func, datos, columnas_orden, column_config, key, tamano_pagina=50):
+    """
+    Tabla paginada: solo se consulta y se dibuja la página visible
+
+    Cambiar de página o de orden vuelve a ejecutar solo este fragmento.
+
+    Args:
+        paginar_func: función (datos, offset, limite, orden, descendente) → (página, total)
+        datos: DataFrame largo de comentarios
+        columnas_orden: {columna: etiqueta} de las columnas por las que se puede ordenar
+        column_config: configuración de columnas de st.dataframe
+        key: prefijo único de las claves de los controles
+        tamano_pagina: filas por página
+    """
+    col1, col2, col3 = st.columns([2, 1, 1])
+
+    with col1:
+        orden = st.selectbox(
+            "Ordenar por",
+            list(columnas_orden),
+            format_func=columnas_orden.get,
+            key=f"{key}_orden"
+        )
+    with col2:
+        descendente = st.toggle("Descendente", value=True, key=f"{key}_descendente")
+
+    clave_pagina = f"{key}_pagina"
+    pagina_actual = st.session_state.setdefault(clave_pagina, 1)
+
+    try:
+        df_pagina, total = paginar_func(
+            datos, offset=(pagina_actual - 1) * tamano_pagina, limite=tamano_pagina,
+            orden=orden, descendente=descendente
+        )
+        n_paginas = max(1, -(-total // tamano_pagina))
+
+        # Si la página guardada ya no existe (p. ej. tras cambiar de filtro), ir a la última
+        if pagina_actual > n_paginas:
+            pagina_actual = n_paginas
+            st.session_state[clave_pagina] = pagina_actual
+            df_pagina, total = paginar_func(
+                datos, offset=(pagina_actual - 1) * tamano_pagina, limite=tamano_pagina,
+                orden=orden, descendente=descendente
+            )
+    except Exception as e:
+        st.error(f"💥 Error cargando la página: {e}")
+        return
+
+    with col3:
+        st.number_input("Página", min_value=1, max_value=n_paginas, step=1, key=clave_pagina)
+
+    if total == 0:
+        st.info("🤷‍♂️ No hay resultados")
+        return
+
+    inicio = (pagina_actual - 1) * tamano_pagina
+    st.caption(f"Mostrando {inicio + 1}–{inicio + len(df_pagina)} de {total} · página {pagina_actual} de {n_paginas}")
+
+    st.dataframe(
+        df_pagina,
+        column_config=column_config,
+        column_order=[col for col in column_config if col in df_pagina.columns],
+        use_container_width=True,
+        hide_index=True
+    )
+
+def mostrar_exploracion_completa(datos, titulo_seccion, key):
+    """
+    Sección para recorrer todos los artículos y comentarios de datos, sin el tope de top-20
+
+    Con el buscador, las tablas se reducen a los artículos cuyo título o algún
+    comentario contiene los términos, y se listan los comentarios que coinciden.
+    """
+    st.subheader(f"📚 Todos los artículos y comentarios - {titulo_seccion}")
+
+    texto = st.text_input(
+        "🔎 Buscar en títulos y comentarios",
+        placeholder='p. ej. marin, "partido popular", socialis*',
+        key=f"{key}_busqueda"
+    ).strip()
+
+    if texto:
+        try:
+            coincidencias, total = buscar_comentarios(datos, texto, limite=100)
+            datos = filtrar_comentarios_por_termino(datos, texto, incluir_titulos=True)
+        except Exception as e:
+            st.error(f"💥 Error en la búsqueda: {e}")
+            return
+
+        st.caption(f"🔎 {datos['article_id'].nunique() if len(datos) else 0} artículos y {total} comentarios con \"{texto}\"")
+        if total > 0:
+            with st.expander(f"💬 Comentarios que coinciden (los {len(coincidencias)} más relevantes)"):
+                st.dataframe(
+                    coincidencias,
+                    column_config={
+                        "comment_text": "💬 Comentario",
+                        "comment_author": "👤 Autor",
+                        "net_score": st.column_config.NumberColumn("📊 Puntuación", format="%+d"),
+                        "comment_date": "📅 Fecha",
+                        "article_title": "📰 Artículo",
+                        "article_link": st.column_config.LinkColumn("🔗 Artículo", display_text="Ver")
+                    },
+                    column_order=["comment_text", "comment_author", "net_score", "comment_date", "article_title", "article_link"],
+                    use_container_width=True,
+                    hide_index=True
+                )
+
+    tab_articulos, tab_comentarios = pestanas_perezosas(["🔥 Artículos", "💬 Comentarios"], key=f"{key}_tabla")
+
+    if tab_articulos:
+        mostrar_tabla_paginada(
+            paginar_articulos,
+            datos,
+            COLUMNAS_ORDEN_ARTICULOS,
+            {
+                "title": "📰 Título",
+                "n_comments": st.column_config.NumberColumn("💬 Comentarios", format="%d"),
+                "total_comment_length": st.column_config.NumberColumn("📝 Longitud Total", format="%d"),
+                "date": "📅 Fecha",
+                "source": "🏢 Fuente",
+                "link": st.column_config.LinkColumn("URL", display_text="🔗 Ver artículo")
+            },
+            key=f"{key}_articulos"
+        )
+
+    if tab_comentarios:
+        mostrar_tabla_paginada(
+            paginar_comentarios,
+            datos,
+            COLUMNAS_ORDEN_COMENTARIOS,
+            {
+                "comment_text": "💬 Comentario",
+                "comment_author": "👤 Autor",
+                "comment_location": "📍 Ubicación",
+                "likes": st.column_config.NumberColumn("👍 Likes", format="%d"),
+                "dislikes": st.column_config.NumberColumn("👎 Dislikes", format="%d"),
+                "net_score": st.column_config.NumberColumn("📊 Puntuación", format="%+d"),
+                "comment_date": "📅 Fecha",
+                "article_title": "📰 Artículo",
+                "article_link": st.column_config.LinkColumn("🔗 Artículo", display_text="Ver")
+            },
+            key=f"{key}_comentarios"
+        )
+
 def mostrar_seccion_temporal(titulo, descripcion, datos, titulo_seccion, mostrar_sentimientos, analizador, es_articulos_populares=True):
     """Muestra una sección temporal (mayo, año, histórico) con título y descripción"""
     st.subheader(titulo)
@@ -1205,7 +1305,11 @@ def mostrar_seccion_comentarios_temporal(titulo, descripcion, datos, titulo_secc
     try:
         datos_procesados = procesador_func(datos)
         print(f"✅ Procesador funcionó: {len(datos_procesados)} filas")
-        mostrar_func(datos_procesados, titulo_seccion, key_suffix=key_suffix, table_height=table_height)
+        if mostrar_func is mostrar_tabla_articulos_polemicos:
+            # Los comentarios del artículo seleccionado se buscan en la tabla larga original
+            mostrar_func(datos_procesados, titulo_seccion, key_suffix=key_suffix, table_height=table_height, df_comentarios=datos)
+        else:
+            mostrar_func(datos_procesados, titulo_seccion, key_suffix=key_suffix, table_height=table_height)
     except Exception as e:
         st.error(f"💥 Error procesando datos: {e}")
         st.error(f"💥 Función que falló: {procesador_func.__name__}")
@@ -1252,96 +1356,112 @@ def mostrar_tabla_articulos_con_sentimientos(df, titulo, reporte=None):
     if reporte is not None:
         mostrar_analisis_sentimientos_compacto(df, reporte, titulo)
 
-def mostrar_tabla_articulos_agregados_con_sentimientos(df, titulo, df_comentarios_originales=None, reporte=None, table_height=600):
+def _columnas_mapeo_agregados(df):
+    """Columnas de la tabla agregada según venga del resumen por artículo o del análisis directo"""
+    return {
+        'titulo': 'title',
+        'tono': 'tono_comentarios' if 'tono_comentarios' in df.columns else 'tono_general',
+        'emocion': 'emocion_dominante' if 'emocion_dominante' in df.columns else 'emocion_principal',
+        'intensidad': 'intensidad_media' if 'intensidad_media' in df.columns else 'intensidad_emocional',
+        'confianza': 'confianza_media' if 'confianza_media' in df.columns else 'confianza_analisis',
+        'fecha': 'article_date' if 'article_date' in df.columns else 'date',
+        'enlace': 'article_link' if 'article_link' in df.columns else 'link',
+        'tematica_modal': 'tematica_modal'  # 🆕 NUEVA COLUMNA
+    }
+
+def _contar_comentarios_por_articulo(df_display, df_comentarios_originales, columnas_mapeo):
     """
-    🆕 MODIFICADO: Añadir columna de "Temática Modal" entre Intensidad y Confianza
+    Número de comentarios de cada fila: los que coinciden por enlace o por título
+
+    Se cuenta una sola vez por enlace, por título y por pareja (enlace, título)
+    en lugar de filtrar todos los comentarios para cada artículo.
     """
-    if len(df) == 0:
-        st.warning(f"🤷‍♂️ No hay datos para mostrar en: {titulo}")
-        return
+    por_enlace = df_comentarios_originales['link'].value_counts()
+    por_titulo = df_comentarios_originales['title_original'].value_counts()
+    por_ambos = df_comentarios_originales.groupby(['link', 'title_original']).size()
 
-    st.subheader(f"📋 {titulo}")
-    st.info("💡 Haz clic en la columna de la izquierda para ver comentarios del artículo")
-    
+    enlaces = df_display[columnas_mapeo['enlace']] if columnas_mapeo['enlace'] in df_display.columns else pd.Series('', index=df_display.index)
+    titulos = df_display[columnas_mapeo['titulo']] if columnas_mapeo['titulo'] in df_display.columns else pd.Series('', index=df_display.index)
+
+    comentarios_por_articulo = {}
+    for article_link, article_title in zip(enlaces, titulos):
+        num_comentarios = por_titulo.get(article_title, 0)
+        if article_link:
+            # Unión de ambos criterios sin contar dos veces los que cumplen los dos
+            num_comentarios += por_enlace.get(article_link, 0) - por_ambos.get((article_link, article_title), 0)
+        comentarios_por_articulo[article_title] = num_comentarios
+
+    return titulos.map(comentarios_por_articulo).fillna(0)
+
+def _preparar_tabla_agregados(df, df_comentarios_originales):
+    """
+    Tabla de artículos agregados con títulos truncados, emojis y número de
+    comentarios, junto al mapping a los títulos completos
+    """
     # CREAR MAPPING DESDE COMENTARIOS ORIGINALES (con títulos completos)
     if df_comentarios_originales is not None:
         mapping_titulos_originales = crear_mapping_titulos_articulos_comentarios(df_comentarios_originales)
     else:
         # Fallback al DataFrame actual (puede estar truncado)
         mapping_titulos_originales = crear_mapping_titulos_originales(df)
-    
-    # Preparar DataFrame con presentación bonita
+
+    columnas_mapeo = _columnas_mapeo_agregados(df)
     df_display = df.copy()
 
-    # GUARDAR TEXTO ORIGINAL ANTES DE TRUNCAR
     if 'title' in df_display.columns:
-        df_display['texto_original_completo'] = df_display['title'].copy()
+        # GUARDAR TEXTO ORIGINAL ANTES DE TRUNCAR y truncar títulos a 5 palabras
+        df_display['texto_original_completo'] = df_display['title']
+        df_display['title'] = truncar_titulos(df_display['title'], 5)
 
-    # Truncar títulos a 5 palabras
-    if 'title' in df_display.columns:
-        df_display['title'] = df_display['title'].apply(lambda x: truncar_titulo_palabras(x, 5))
-    
-    # MAPEO DE COLUMNAS: Detectar qué columnas usar
-    columnas_mapeo = {
-        'titulo': 'title',
-        'tono': 'tono_comentarios' if 'tono_comentarios' in df.columns else 'tono_general',
-        'emocion': 'emocion_dominante' if 'emocion_dominante' in df.columns else 'emocion_principal',
-        'intensidad': 'intensidad_media' if 'intensidad_media' in df.columns else 'intensidad_emocional',
-        'confianza': 'confianza_media' if 'confianza_media' in df.columns else 'confianza_analisis',
-        'fecha': 'article_date' if 'article_date' in df.columns else 'date',
-        'enlace': 'article_link' if 'article_link' in df.columns else 'link',
-        'tematica_modal': 'tematica_modal'  # 🆕 NUEVA COLUMNA
-    }
-    
     # PRESENTACIÓN VISUAL BONITA con emojis
-    df_display['tono_emoji'] = df_display[columnas_mapeo['tono']].map({
-        'positivo': '😊 Positivo',
-        'negativo': '😔 Negativo', 
-        'neutral': '😐 Neutral'
-    }).fillna('🤷‍♂️ Sin definir')
-    
-    # Emociones con emojis
-    emoji_emociones = {
-        'alegría': '😄', 'esperanza': '🌟', 'orgullo': '💪', 'satisfacción': '😌',
-        'tristeza': '😢', 'ira': '😠', 'miedo': '😨', 'decepción': '😞', 'desprecio': '🙄',
-        'sorpresa': '😲', 'nostalgia': '🥺', 'preocupación': '😟', 'neutral': '😐'
-    }
-    
-    df_display['emocion_emoji'] = df_display[columnas_mapeo['emocion']].apply(
-        lambda x: f"{emoji_emociones.get(x, '🤔')} {str(x).title()}" if pd.notna(x) else "🤷‍♂️ Ninguna"
-    )
-    
+    df_display['tono_emoji'] = etiquetar_categorias(df_display[columnas_mapeo['tono']], ETIQUETAS_TONO, '🤷‍♂️ Sin definir')
+    df_display['emocion_emoji'] = etiquetar_emociones(df_display[columnas_mapeo['emocion']])
+
     # 🆕 PROCESAR TEMÁTICA MODAL (si existe la columna)
-    tiene_tematica_modal = columnas_mapeo['tematica_modal'] in df_display.columns
-    if tiene_tematica_modal:
+    if columnas_mapeo['tematica_modal'] in df_display.columns:
         # La temática modal ya viene con emoji del analizador, solo limpiar si es necesario
         df_display['tematica_modal_display'] = df_display[columnas_mapeo['tematica_modal']].fillna("📄 No definida")
-    
+
     # CALCULAR NÚMERO DE COMENTARIOS
     if df_comentarios_originales is not None:
-        # Contar comentarios por artículo
-        comentarios_por_articulo = {}
-        for _, row in df_display.iterrows():
-            article_link = row.get(columnas_mapeo['enlace'], '')
-            article_title = row.get(columnas_mapeo['titulo'], '')
-            
-            if article_link:
-                num_comentarios = len(df_comentarios_originales[
-                    (df_comentarios_originales['link'] == article_link) | 
-                    (df_comentarios_originales['title_original'] == article_title)
-                ])
-            else:
-                num_comentarios = len(df_comentarios_originales[
-                    df_comentarios_originales['title_original'] == article_title
-                ])
-            
-            comentarios_por_articulo[article_title] = num_comentarios
-        
-        # Añadir columna de comentarios
-        df_display['num_comentarios'] = df_display[columnas_mapeo['titulo']].map(comentarios_por_articulo).fillna(0)
+        df_display['num_comentarios'] = _contar_comentarios_por_articulo(df_display, df_comentarios_originales, columnas_mapeo)
     else:
         # Fallback: usar columna n_comments si existe
         df_display['num_comentarios'] = df_display.get('n_comments', 0)
+
+    return df_display, mapping_titulos_originales
+
+@st.fragment
+def mostrar_tabla_articulos_agregados_con_sentimientos(df, titulo, df_comentarios_originales=None, reporte=None, table_height=600):
+    """
+    🆕 MODIFICADO: Añadir columna de "Temática Modal" entre Intensidad y Confianza
+    """
+    if len(df) == 0:
+        st.warning(f"🤷‍♂️ No hay datos para mostrar en: {titulo}")
+        return
+
+    st.subheader(f"📋 {titulo}")
+    st.info("💡 Haz clic en la columna de la izquierda para ver comentarios del artículo")
+    
+    # MAPEO DE COLUMNAS: Detectar qué columnas usar
+    columnas_mapeo = _columnas_mapeo_agregados(df)
+    
+    # Tabla con presentación bonita, precalculada una vez por tabla y comentarios
+    if df_comentarios_originales is None:
+        huella_comentarios = ('sin_comentarios',)
+    else:
+        huella_comentarios = huella_tabla(df_comentarios_originales)
+    
+    if huella_comentarios is None:
+        df_display, mapping_titulos_originales = _preparar_tabla_agregados(df, df_comentarios_originales)
+    else:
+        df_display, mapping_titulos_originales = preparar_tabla(
+            "tabla_articulos_agregados",
+            df,
+            lambda df_tabla, _: _preparar_tabla_agregados(df_tabla, df_comentarios_originales),
+            huella_comentarios
+        )
+    tiene_tematica_modal = 'tematica_modal_display' in df_display.columns
     
     # 🆕 CONFIGURACIÓN DE COLUMNAS ACTUALIZADA CON TEMÁTICA MODAL
     column_config = {
@@ -1435,8 +1555,7 @@ def mostrar_tabla_articulos_agregados_con_sentimientos(df, titulo, df_comentario
             if analizador is not None:
                 with st.spinner(f"🧠 Analizando {len(comentarios_artículo)} comentarios..."):
                     try:
-                        from .sentiment_integration import aplicar_analisis_sentimientos
-                        comentarios_analizados, _ = aplicar_analisis_sentimientos(comentarios_artículo, analizador)
+                        comentarios_analizados, _ = analizar_tabla_con_cache(comentarios_artículo, analizador, "analisis_comentarios_articulo")
                 
                         # Mostrar comentarios individuales con análisis
                         for idx, comment in comentarios_analizados.iterrows():